@@ -168,6 +168,10 @@ SPECTACULAR_SETTINGS = {
 
 TEMP_DIR = env('TEMP_DIR', default=None)
 
+# The source of the tag flags, which is either the base URL of the StackExchange API, or the path of a JSON file
+
+TAG_FLAGS_SOURCE = env('TAG_FLAGS_SOURCE', default=None)
+
 # Redis configuration
 
 REDIS_URL = env('REDIS_URL', default="redis://127.0.0.1:6379")
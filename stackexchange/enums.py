@@ -168,6 +168,22 @@ class PostHistoryType(BaseEnum):
         return self in (self.ROLLBACK_TITLE, self.ROLLBACK_BODY, self.ROLLBACK_TAGS)
 
 
+class LoadStatus(BaseEnum):
+    """Enumeration for the status of a table load.
+    """
+    STARTED = 1
+    COMPLETED = 2
+
+
+class StepStatus(BaseEnum):
+    """Enumeration for the status of a step of a load pipeline, or of the pipeline.
+    """
+    PENDING = 1
+    STARTED = 2
+    COMPLETED = 3
+    FAILED = 4
+
+
 class Privilege(enum.Enum):
     """Enumeration for user privileges
     """
@@ -0,0 +1,54 @@
+"""Command to generate a synthetic site data dump
+"""
+import logging
+import pathlib
+import sys
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from stackexchange import services
+
+
+class Command(BaseCommand):
+    """Command to generate a synthetic site data dump, in order to measure the loaders and the API at any scale.
+    """
+    help = 'Generate a synthetic site data dump'
+
+    def add_arguments(self, parser: CommandParser):
+        """Add the command arguments.
+
+        :param parser: The argument parser.
+        """
+        parser.add_argument(
+            "output", type=pathlib.Path,
+            help="The directory the files of the dump are written to, or the 7z archive, if it ends with .7z"
+        )
+        parser.add_argument("--users", type=int, default=10000, help="The number of users")
+        parser.add_argument("--posts", type=int, help="The number of posts, 3 per user by default")
+        parser.add_argument("--votes", type=int, help="The number of votes, 4 per post by default")
+        parser.add_argument("--comments", type=int, help="The number of comments, 1.5 per post by default")
+        parser.add_argument("--history", type=int, help="The number of post history rows, 2.6 per post by default")
+        parser.add_argument(
+            "--seed", type=int, default=0, help="The seed of the random numbers, so that the same dump is generated"
+        )
+
+    def handle(self, *args, **options):
+        """Implements the logic of the command.
+
+        :param args: The arguments.
+        :param options: The options.
+        """
+        logging.basicConfig(
+            stream=sys.stdout, level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+        try:
+            scale = services.syntheticdump.DumpScale.for_users(
+                options['users'], posts=options['posts'], votes=options['votes'], comments=options['comments'],
+                history=options['history']
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        generator = services.syntheticdump.DumpGenerator(scale, seed=options['seed'])
+        output = options['output']
+        rows = generator.write_archive(output) if output.suffix == '.7z' else generator.write(output)
+        for filename, count in rows.items():
+            self.stdout.write(f"{filename}: {count} rows")
@@ -3,9 +3,9 @@
 import logging
 import sys
 
-from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.base import BaseCommand, CommandError, CommandParser
 
-from stackexchange import models, services
+from stackexchange import models, services, tasks
 
 
 class Command(BaseCommand):
@@ -19,6 +19,64 @@ class Command(BaseCommand):
         :param parser: The argument parser.
         """
         parser.add_argument("site", help="The name of the site to download")
+        parser.add_argument(
+            "--csv", action='store_true',
+            help="Write the data of each table to a CSV file before loading it, instead of streaming it to the database"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="The number of worker processes that load independent tables concurrently. Background loads run on "
+                 "the Celery workers instead"
+        )
+        parser.add_argument(
+            "--shards", type=int, default=1,
+            help="The number of shards in which large input files are split, in order to be loaded in parallel"
+        )
+        parser.add_argument(
+            "--staging", action='store_true',
+            help="Copy the rows to staging tables, and resolve their references in the database"
+        )
+        parser.add_argument(
+            "--bulk", action='store_true',
+            help="Drop the indexes, constraints and triggers of each table before loading it, and create them after"
+        )
+        parser.add_argument(
+            "--shadow", action='store_true',
+            help="Load the tables to a shadow schema, and swap it with the live tables once the load completes"
+        )
+        parser.add_argument(
+            "--delta", action='store_true',
+            help="Only write the rows that changed since the previous load, instead of reloading the tables"
+        )
+        parser.add_argument(
+            "--snapshots", action='store_true',
+            help="Save the transformed rows of each table to a snapshot, and reuse them to load the same dump again"
+        )
+        parser.add_argument(
+            "--resume", action='store_true',
+            help="Resume an interrupted load, skipping the tables and shards it completed from the same input files"
+        )
+        parser.add_argument(
+            "--binary", action='store_true',
+            help="Stream the rows to the database in the binary format of COPY, instead of the text format"
+        )
+        parser.add_argument(
+            "--profile", choices=services.loader.LOAD_PROFILES, default='full',
+            help="The load profile, which selects the tables, rows and columns that are loaded"
+        )
+        parser.add_argument(
+            "--cluster", action='store_true',
+            help="Rewrite the posts, comments and history in the order they are most often read by once they are loaded"
+        )
+        parser.add_argument(
+            "--dump-dir",
+            help="Load the files of a dump directory, such as one written by generate_dump, instead of downloading the "
+                 "archives of the site"
+        )
+        parser.add_argument(
+            "--background", action='store_true',
+            help="Schedule the load as a pipeline of tasks that run on the Celery workers, instead of running it"
+        )
 
     def handle(self, *args, **options):
         """Implements the logic of the command.
@@ -28,8 +86,24 @@ class Command(BaseCommand):
         """
         logging.basicConfig(
             stream=sys.stdout, level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+        loader_options = {
+            'csv_files': options['csv'], 'shards': options['shards'], 'staging': options['staging'],
+            'bulk': options['bulk'], 'shadow_schema': options['shadow'], 'delta': options['delta'],
+            'snapshots': options['snapshots'], 'resume': options['resume'], 'binary': options['binary'],
+            'profile': options['profile'], 'cluster': options['cluster'], 'dump_dir': options['dump_dir']
+        }
+        if options['background'] and options['workers'] != 1:
+            raise CommandError("The workers of a background load are the Celery workers, so --workers cannot be set")
         try:
-            loader = services.loader.SiteDataLoader(site=options['site'])
+            if options['background']:
+                run = services.pipeline.create_run(options['site'], loader_options)
+                tasks.load_pipeline(run).delay()
+                self.stdout.write(f"Load {run.pk} scheduled, run load_status {run.pk} to follow its progress")
+                return
+            loader = services.loader.SiteDataLoader(
+                site=options['site'], workers=options['workers'], **loader_options)
             loader.load()
         except models.Site.DoesNotExist:
             self.stderr.write(f"Site {options['site']} does not exist.")
+        except ValueError as e:
+            raise CommandError(str(e)) from e
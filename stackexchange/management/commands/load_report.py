@@ -0,0 +1,80 @@
+"""Command to show the report of a site data load
+"""
+import json
+import pathlib
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from stackexchange import services
+
+# The number of bytes in a mebibyte
+MIB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    """Command to show the throughput and memory metrics of each table of a site data load.
+    """
+    help = 'Show the report of a site data load'
+
+    def add_arguments(self, parser: CommandParser):
+        """Add the command arguments.
+
+        :param parser: The argument parser.
+        """
+        parser.add_argument(
+            "path", nargs='?', type=pathlib.Path, help="The report file. If not set, the last written report is shown")
+        parser.add_argument("--json", action='store_true', help="Show the report as it is written, in JSON")
+
+    def handle(self, *args, **options):
+        """Implements the logic of the command.
+
+        :param args: The arguments.
+        :param options: The options.
+        """
+        try:
+            report = services.metrics.read_report(options['path'])
+        except FileNotFoundError as e:
+            raise CommandError(str(e)) from e
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Load of {report['site']} started at {report['started_at']}, completed at {report['completed_at']}")
+        options = ', '.join(option for option, value in report['options'].items() if value) or 'none'
+        self.stdout.write(
+            f"Profile: {report['profile']}, workers: {report['workers']}, shards: {report['shards']}, "
+            f"options: {options}"
+        )
+        for table, table_report in report['tables'].items():
+            self.stdout.write('')
+            if table_report['skipped']:
+                self.stdout.write(f"{table}: skipped")
+                continue
+            rows_per_second = table_report['rows_per_second']
+            self.stdout.write(
+                f"{table}: {table_report['rows_written']} rows written in {table_report['seconds']:.1f} seconds"
+                + (f" ({rows_per_second:.0f} rows/s)" if rows_per_second is not None else '')
+            )
+            self.stdout.write(
+                f"  rows read: {table_report['rows_read']}, copied: {table_report['rows_copied']}, "
+                f"dropped: {table_report['rows_dropped']}, input: {table_report['bytes_read'] / MIB:.1f} MiB"
+            )
+            self.stdout.write(
+                f"  parse: {table_report['parse_seconds']:.1f} s, transform: {table_report['transform_seconds']:.1f} s")
+            if table_report.get('cluster_key') is not None:
+                before, after = (
+                    f"{value:.2f}" if value is not None else 'unknown'
+                    for value in (table_report['correlation_before'], table_report['correlation_after'])
+                )
+                self.stdout.write(
+                    f"  clustered on {table_report['cluster_key']}, correlation: {before} before, {after} after")
+            for phase in table_report['phases']:
+                traced = ''
+                if phase['peak_traced'] is not None:
+                    traced = f", traced peak: {phase['peak_traced'] / MIB:.1f} MiB"
+                self.stdout.write(
+                    f"  {phase['name']}: {phase['seconds']:.1f} s, peak RSS: {phase['peak_rss'] / MIB:.1f} MiB{traced}")
+        self.stdout.write('')
+        for task, seconds in report['tasks'].items():
+            self.stdout.write(f"Task {task}: {seconds:.1f} s")
@@ -25,19 +25,22 @@ class Command(BaseCommand):
         sites_file = downloader.get_file()
 
         logging.info("Loading sites")
-        for site in services.xmlparser.XmlFileIterator(xml_file=sites_file):
-            models.Site.objects.update_or_create(pk=site['Id'], defaults={
-                'name': get_site_name(site['Url']), 'description': site['Name'], 'long_description': site['LongName'],
-                'tagline': site['Tagline'], 'url': site['Url'], 'icon_url': site['IconUrl'],
-                'badge_icon_url': site['BadgeIconUrl'], 'image_url': site['ImageUrl'], 'tag_css': site['TagCss'],
-                'total_questions': site['TotalQuestions'], 'total_answers': site['TotalAnswers'],
-                'total_users': site['TotalUsers'], 'total_comments': site['TotalComments'],
-                'total_tags': site['TotalTags'], 'last_post_date': site['LastPost'] + '+00:00'
-            })
-
-        for site in services.xmlparser.XmlFileIterator(xml_file=sites_file):
-            if 'ParentId' in site:
-                models.Site.objects.filter(pk=site['Id']).update(parent=site['ParentId'])
+        sites = [
+            models.Site(
+                pk=site['Id'], parent_id=site.get('ParentId'), name=get_site_name(site['Url']),
+                description=site['Name'], long_description=site['LongName'], tagline=site['Tagline'], url=site['Url'],
+                icon_url=site['IconUrl'], badge_icon_url=site['BadgeIconUrl'], image_url=site['ImageUrl'],
+                tag_css=site['TagCss'], total_questions=site['TotalQuestions'], total_answers=site['TotalAnswers'],
+                total_users=site['TotalUsers'], total_comments=site['TotalComments'], total_tags=site['TotalTags'],
+                last_post_date=site['LastPost'] + '+00:00'
+            )
+            for site in services.xmlparser.XmlFileIterator(xml_file=sites_file)
+        ]
+        # The sites are inserted or updated with a single statement, so the parent sites are written along with them
+        models.Site.objects.bulk_create(
+            sites, update_conflicts=True, unique_fields=['id'],
+            update_fields=[field.name for field in models.Site._meta.concrete_fields if not field.primary_key]
+        )
 
 
 def get_site_name(site_url: str) -> str:
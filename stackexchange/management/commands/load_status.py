@@ -0,0 +1,54 @@
+"""Command to show the progress of a site data load that runs in the background
+"""
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from stackexchange import enums, models
+
+
+class Command(BaseCommand):
+    """Command to show the status of each step of a site data load that runs as a pipeline of background tasks.
+    """
+    help = 'Show the progress of a site data load that runs in the background'
+
+    def add_arguments(self, parser: CommandParser):
+        """Add the command arguments.
+
+        :param parser: The argument parser.
+        """
+        parser.add_argument("run", nargs='?', type=int, help="The load identifier. If not set, the last load is shown")
+
+    def handle(self, *args, **options):
+        """Implements the logic of the command.
+
+        :param args: The arguments.
+        :param options: The options.
+        """
+        runs = models.LoadRun.objects.select_related('site').order_by('-created_at')
+        run = runs.filter(pk=options['run']).first() if options['run'] is not None else runs.first()
+        if run is None:
+            raise CommandError("The load does not exist")
+
+        steps = list(run.steps.all())
+        completed = sum(step.status == enums.StepStatus.COMPLETED for step in steps)
+        self.stdout.write(
+            f"Load {run.pk} of {run.site.name}: {enums.StepStatus(run.status).description.lower()}, "
+            f"{completed} of {len(steps)} steps completed"
+        )
+        # The shards completed by the tables that are being loaded
+        checkpoints = {
+            manifest.table_name: manifest.checkpoints.count()
+            for manifest in models.LoadManifest.objects.filter(
+                status=enums.LoadStatus.STARTED, started_at__gte=run.created_at)
+        }
+        now = timezone.now()
+        for step in steps:
+            status = enums.StepStatus(step.status).description.lower()
+            if step.started_at is not None:
+                status += f" in {((step.completed_at or now) - step.started_at).total_seconds():.1f} s"
+            table = step.name.split('.')[0]
+            if step.status == enums.StepStatus.STARTED and table in checkpoints:
+                status += f", {checkpoints[table]} shards completed"
+            self.stdout.write(f"  {step.stage:>3} {step.name}: {status}")
+            if step.error:
+                self.stdout.write(f"      {step.error.strip().splitlines()[-1]}")
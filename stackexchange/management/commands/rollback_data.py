@@ -0,0 +1,30 @@
+"""Command to roll back the last site data load
+"""
+import logging
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stackexchange import models, services
+
+
+class Command(BaseCommand):
+    """Command to swap the live site data with the data replaced by the last load to a shadow schema.
+    """
+    help = 'Swap the live site data with the data replaced by the last load'
+
+    def handle(self, *args, **options):
+        """Implements the logic of the command.
+
+        :param args: The arguments.
+        :param options: The options.
+        """
+        logging.basicConfig(
+            stream=sys.stdout, level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+        try:
+            services.shadow.ShadowSchema(services.loader.SiteDataLoader.table_names()).rollback()
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        # The tables are no longer the ones recorded by the load manifest, so none of them is skipped by the next load
+        models.LoadManifest.objects.all().delete()
+        services.siteinfo.set_site_info()
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stackexchange', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(help_text='The table name', max_length=255, unique=True)),
+                (
+                    'source_key',
+                    models.CharField(
+                        blank=True, max_length=255, null=True,
+                        help_text='The key of the snapshot the table was loaded from, or null if it was not loaded '
+                                  'with snapshots'
+                    )
+                ),
+                (
+                    'completed_at',
+                    models.DateTimeField(auto_now=True, help_text='The time the load of the table completed')
+                ),
+            ],
+            options={
+                'db_table': 'load_manifest',
+            },
+        ),
+    ]
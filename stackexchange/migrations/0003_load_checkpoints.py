@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-17 01:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stackexchange', '0002_load_manifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='status',
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, 'Started'), (2, 'Completed')], default=1, help_text='The load status'),
+        ),
+        # The tables recorded before the status was added were all completed
+        migrations.RunSQL('UPDATE load_manifest SET status = 2', migrations.RunSQL.noop),
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='source_fingerprint',
+            field=models.CharField(
+                blank=True, max_length=255, null=True,
+                help_text='The fingerprint of the input file the table was loaded from'
+            ),
+        ),
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='rows',
+            field=models.BigIntegerField(blank=True, help_text='The number of rows written by the load', null=True),
+        ),
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='table_objects',
+            field=models.JSONField(
+                blank=True, null=True,
+                help_text='The indexes, constraints and triggers of the table, while they are dropped by a bulk load'
+            ),
+        ),
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='started_at',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, help_text='The time the load of the table started'),
+        ),
+        migrations.AlterField(
+            model_name='loadmanifest',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, help_text='The time the load of the table completed', null=True),
+        ),
+        migrations.CreateModel(
+            name='LoadCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveIntegerField(help_text='The shard index, starting from zero')),
+                ('shard_count', models.PositiveIntegerField(help_text='The number of shards of the load')),
+                ('rows', models.BigIntegerField(help_text='The number of rows loaded from the shard')),
+                (
+                    'manifest',
+                    models.ForeignKey(
+                        help_text='The manifest entry of the table', on_delete=django.db.models.deletion.CASCADE,
+                        related_name='checkpoints', to='stackexchange.loadmanifest'
+                    )
+                ),
+            ],
+            options={
+                'db_table': 'load_checkpoints',
+                'unique_together': {('manifest', 'shard')},
+            },
+        ),
+    ]
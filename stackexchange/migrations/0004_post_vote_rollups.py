@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-17 01:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stackexchange', '0003_load_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='up_vote_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, help_text='The post up vote count'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='down_vote_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, help_text='The post down vote count'),
+        ),
+        migrations.CreateModel(
+            name='PostVoteRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'type',
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (1, 'Accepted by originator'), (2, 'Up mod'), (3, 'Down mod'), (4, 'Offensive'),
+                            (5, 'Favorite'), (6, 'Close'), (7, 'Reopen'), (8, 'Bounty start'), (9, 'Bounty close'),
+                            (10, 'Deletion'), (11, 'Un deletion'), (12, 'Spam'), (13, 'Inform moderator')
+                        ], help_text='The post vote type'
+                    )
+                ),
+                ('day', models.DateField(help_text='The day the votes were created')),
+                ('count', models.PositiveIntegerField(help_text='The number of votes')),
+                (
+                    'bounty_sum',
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text='The sum of the bounty amounts, if the post vote type is BOUNTY_START or BOUNTY_CLOSE'
+                    )
+                ),
+                (
+                    'post',
+                    models.ForeignKey(
+                        help_text='The post', on_delete=django.db.models.deletion.CASCADE,
+                        related_name='vote_rollups', to='stackexchange.post'
+                    )
+                ),
+            ],
+            options={
+                'db_table': 'post_vote_rollups',
+                'unique_together': {('post', 'type', 'day')},
+            },
+        ),
+    ]
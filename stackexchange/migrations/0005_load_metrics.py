@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stackexchange', '0004_post_vote_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loadmanifest',
+            name='metrics',
+            field=models.JSONField(
+                blank=True, null=True,
+                help_text='The metrics of the load, such as the rows read and the time of each phase'
+            ),
+        ),
+        migrations.AddField(
+            model_name='loadcheckpoint',
+            name='metrics',
+            field=models.JSONField(blank=True, help_text='The metrics of the load of the shard', null=True),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2 on 2026-10-17 02:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stackexchange', '0005_load_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'options',
+                    models.JSONField(
+                        default=dict, help_text='The options of the load, as passed to the site data loader'
+                    )
+                ),
+                (
+                    'status',
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, 'Pending'), (2, 'Started'), (3, 'Completed'), (4, 'Failed')], default=1,
+                        help_text='The status of the load'
+                    )
+                ),
+                (
+                    'created_at',
+                    models.DateTimeField(default=django.utils.timezone.now, help_text='The time the load was scheduled')
+                ),
+                (
+                    'completed_at',
+                    models.DateTimeField(blank=True, help_text='The time the load completed or failed', null=True)
+                ),
+                (
+                    'site',
+                    models.ForeignKey(
+                        help_text='The site', on_delete=django.db.models.deletion.CASCADE, related_name='load_runs',
+                        to='stackexchange.site'
+                    )
+                ),
+            ],
+            options={
+                'db_table': 'load_runs',
+            },
+        ),
+        migrations.CreateModel(
+            name='LoadStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The step name', max_length=255)),
+                (
+                    'stage',
+                    models.PositiveIntegerField(
+                        help_text='The stage of the pipeline in which the step runs, after all the steps of the '
+                                  'previous stages'
+                    )
+                ),
+                (
+                    'status',
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, 'Pending'), (2, 'Started'), (3, 'Completed'), (4, 'Failed')], default=1,
+                        help_text='The status of the step'
+                    )
+                ),
+                ('started_at', models.DateTimeField(blank=True, help_text='The time the step started', null=True)),
+                (
+                    'completed_at',
+                    models.DateTimeField(blank=True, help_text='The time the step completed or failed', null=True)
+                ),
+                ('error', models.TextField(blank=True, help_text='The error that made the step fail', null=True)),
+                (
+                    'run',
+                    models.ForeignKey(
+                        help_text='The load', on_delete=django.db.models.deletion.CASCADE, related_name='steps',
+                        to='stackexchange.loadrun'
+                    )
+                ),
+            ],
+            options={
+                'db_table': 'load_steps',
+                'ordering': ('stage', 'id'),
+                'unique_together': {('run', 'name')},
+            },
+        ),
+    ]
@@ -188,6 +188,8 @@ class Post(models.Model):
     answer_count = models.PositiveIntegerField(default=0, help_text="The post answer count")
     comment_count = models.PositiveIntegerField(default=0, help_text="The post comment count")
     favorite_count = models.PositiveIntegerField(default=0, help_text="The post favorite count")
+    up_vote_count = models.PositiveIntegerField(default=0, db_default=0, help_text="The post up vote count")
+    down_vote_count = models.PositiveIntegerField(default=0, db_default=0, help_text="The post down vote count")
     content_license = models.CharField(
         max_length=max(len(cl.value) for cl in enums.ContentLicense),
         choices=((cl.name, cl.value) for cl in enums.ContentLicense), default=enums.ContentLicense.CC_BY_SA_4_0.name,
@@ -283,6 +285,22 @@ class PostVote(models.Model):
         indexes = (models.Index(fields=('-creation_date', '-id')),)
 
 
+class PostVoteRollup(models.Model):
+    """The daily rollup of the votes of a post of a type, which replaces the raw votes when only their counts are needed
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='vote_rollups', help_text="The post")
+    type = models.PositiveSmallIntegerField(
+        choices=((pvt.value, pvt.description) for pvt in enums.PostVoteType), help_text="The post vote type")
+    day = models.DateField(help_text="The day the votes were created")
+    count = models.PositiveIntegerField(help_text="The number of votes")
+    bounty_sum = models.PositiveIntegerField(
+        default=0, help_text="The sum of the bounty amounts, if the post vote type is BOUNTY_START or BOUNTY_CLOSE")
+
+    class Meta:
+        db_table = 'post_vote_rollups'
+        unique_together = ('post', 'type', 'day')
+
+
 class PostComment(models.Model):
     """The post comment model
     """
@@ -349,3 +367,107 @@ class PostLink(models.Model):
 
     class Meta:
         db_table = 'post_links'
+
+
+class LoadManifest(models.Model):
+    """The manifest of the table loads, which records the progress of the last load of each table and the source it was
+    loaded from, so that an interrupted load can be resumed
+    """
+    table_name = models.CharField(max_length=255, unique=True, help_text="The table name")
+    status = models.PositiveSmallIntegerField(
+        choices=((ls.value, ls.description) for ls in enums.LoadStatus), default=enums.LoadStatus.STARTED.value,
+        help_text="The load status")
+    source_fingerprint = models.CharField(
+        max_length=255, null=True, blank=True, help_text="The fingerprint of the input file the table was loaded from")
+    source_key = models.CharField(
+        max_length=255, null=True, blank=True,
+        help_text="The key of the snapshot the table was loaded from, or null if it was not loaded with snapshots")
+    rows = models.BigIntegerField(null=True, blank=True, help_text="The number of rows written by the load")
+    table_objects = models.JSONField(
+        null=True, blank=True,
+        help_text="The indexes, constraints and triggers of the table, while they are dropped by a bulk load")
+    started_at = models.DateTimeField(default=timezone.now, help_text="The time the load of the table started")
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="The time the load of the table completed")
+    metrics = models.JSONField(
+        null=True, blank=True, help_text="The metrics of the load, such as the rows read and the time of each phase")
+
+    class Meta:
+        db_table = 'load_manifest'
+
+    def __str__(self) -> str:
+        """Return the string representation of the manifest entry.
+
+        :return: The table name.
+        """
+        return str(self.table_name)
+
+
+class LoadCheckpoint(models.Model):
+    """A checkpoint of a table that is loaded in shards, which records a completed shard
+    """
+    manifest = models.ForeignKey(
+        LoadManifest, on_delete=models.CASCADE, related_name='checkpoints', help_text="The manifest entry of the table")
+    shard = models.PositiveIntegerField(help_text="The shard index, starting from zero")
+    shard_count = models.PositiveIntegerField(help_text="The number of shards of the load")
+    rows = models.BigIntegerField(help_text="The number of rows loaded from the shard")
+    metrics = models.JSONField(null=True, blank=True, help_text="The metrics of the load of the shard")
+
+    class Meta:
+        db_table = 'load_checkpoints'
+        unique_together = ('manifest', 'shard')
+
+    def __str__(self) -> str:
+        """Return the string representation of the checkpoint.
+
+        :return: The table name and the shard.
+        """
+        return f"{self.manifest.table_name} {self.shard + 1}/{self.shard_count}"
+
+
+class LoadRun(models.Model):
+    """A load of the data of a site that runs as a pipeline of background tasks
+    """
+    site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name='load_runs', help_text="The site")
+    options = models.JSONField(default=dict, help_text="The options of the load, as passed to the site data loader")
+    status = models.PositiveSmallIntegerField(
+        choices=((ss.value, ss.description) for ss in enums.StepStatus), default=enums.StepStatus.PENDING.value,
+        help_text="The status of the load")
+    created_at = models.DateTimeField(default=timezone.now, help_text="The time the load was scheduled")
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="The time the load completed or failed")
+
+    class Meta:
+        db_table = 'load_runs'
+
+    def __str__(self) -> str:
+        """Return the string representation of the load.
+
+        :return: The load identifier and the site name.
+        """
+        return f"{self.pk} {self.site.name}"
+
+
+class LoadStep(models.Model):
+    """A step of a load pipeline, such as the download of an archive or the load of a table
+    """
+    run = models.ForeignKey(LoadRun, on_delete=models.CASCADE, related_name='steps', help_text="The load")
+    name = models.CharField(max_length=255, help_text="The step name")
+    stage = models.PositiveIntegerField(
+        help_text="The stage of the pipeline in which the step runs, after all the steps of the previous stages")
+    status = models.PositiveSmallIntegerField(
+        choices=((ss.value, ss.description) for ss in enums.StepStatus), default=enums.StepStatus.PENDING.value,
+        help_text="The status of the step")
+    started_at = models.DateTimeField(null=True, blank=True, help_text="The time the step started")
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="The time the step completed or failed")
+    error = models.TextField(null=True, blank=True, help_text="The error that made the step fail")
+
+    class Meta:
+        db_table = 'load_steps'
+        unique_together = ('run', 'name')
+        ordering = ('stage', 'id')
+
+    def __str__(self) -> str:
+        """Return the string representation of the step.
+
+        :return: The step name.
+        """
+        return str(self.name)
@@ -1,6 +1,18 @@
 """Services module
 """
+from . import archive
+from . import binarycopy
+from . import bulkload
+from . import clustering
 from . import dowloader
+from . import idindex
 from . import loader
+from . import metrics
+from . import pipeline
+from . import shadow
 from . import siteinfo
+from . import snapshot
+from . import syntheticdump
+from . import tablestats
+from . import tagflags
 from . import xmlparser
@@ -0,0 +1,111 @@
+"""Access to the files of a site data dump.
+"""
+from collections.abc import Generator
+import contextlib
+import logging
+import pathlib
+
+import py7zr
+
+from . import dowloader
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+
+class DumpArchive:
+    """A site data dump. The dump consists of one or more archives: most sites ship a single archive, while the largest
+    ones ship one archive per file. Instead of extracting the archives up front, each member file is extracted just
+    before it is needed and removed right after, so that decompression overlaps with loading, and the scratch disk
+    space needed is about the size of the files being loaded at the time.
+    """
+    def __init__(self, archive_files: dict[str, pathlib.Path], data_dir: pathlib.Path) -> None:
+        """Create the dump archive.
+
+        :param archive_files: The archive file that contains each member file, by member name. Member files that are
+            not in an archive must already exist in the data directory.
+        :param data_dir: The directory in which the member files are extracted.
+        """
+        self.archive_files = archive_files
+        self.data_dir = data_dir
+
+    def archives(self) -> list[pathlib.Path]:
+        """Get the archive files of the dump.
+
+        :return: The archive files, in the order of the members they contain.
+        """
+        return list(dict.fromkeys(self.archive_files.values()))
+
+    def download(self, archive_file: pathlib.Path) -> None:
+        """Download an archive file, unless the cached file is up to date.
+
+        :param archive_file: The archive file.
+        """
+        dowloader.Downloader(filename=archive_file.name, cache_dir=archive_file.parent).get_file()
+
+    def etag(self, archive_file: pathlib.Path) -> str | None:
+        """Get the ETag of a downloaded archive file, which identifies its version.
+
+        :param archive_file: The archive file.
+        :return: The ETag, or None if the archive is not downloaded.
+        """
+        return dowloader.Downloader(filename=archive_file.name, cache_dir=archive_file.parent).cached_etag()
+
+    def fingerprint(self, name: str) -> str | None:
+        """Get the fingerprint of a member file, which changes when the file changes. Members of an archive are
+        identified by the ETag of the archive, and other files, as well as archives without an ETag, by their size and
+        modification time.
+
+        :param name: The member name.
+        :return: The fingerprint, or None if the file does not exist.
+        """
+        path = self.archive_files.get(name, self.data_dir / name)
+        version = self.etag(path) if name in self.archive_files else None
+        if version is None:
+            if not path.exists():
+                return None
+            stat = path.stat()
+            version = f"{stat.st_size}-{stat.st_mtime_ns}"
+
+        return f"{path.name}:{version}:{name}"
+
+    @contextlib.contextmanager
+    def member(self, name: str) -> Generator[pathlib.Path]:
+        """Extract a member file for the duration of the context. Files that already exist in the data directory are
+        used as they are, and are not removed.
+
+        :param name: The member name.
+        :return: Yields the path to the extracted file.
+        """
+        path = self.data_dir / name
+        if path.exists():
+            yield path
+            return
+
+        self.extract(name)
+        try:
+            yield path
+        finally:
+            self.remove(name)
+
+    def extract(self, name: str) -> None:
+        """Extract a member file to the data directory.
+
+        :param name: The member name.
+        """
+        if name not in self.archive_files or (self.data_dir / name).exists():
+            return
+
+        archive_file = self.archive_files[name]
+        logger.info("Extracting %s from %s", name, archive_file.name)
+        with py7zr.SevenZipFile(archive_file, mode='r') as f:
+            f.extract(path=self.data_dir, targets=[name])
+
+    def remove(self, name: str) -> None:
+        """Remove an extracted member file. Files are only removed if they were extracted from an archive.
+
+        :param name: The member name.
+        """
+        if name in self.archive_files:
+            logger.info("Removing %s", name)
+            (self.data_dir / name).unlink(missing_ok=True)
@@ -0,0 +1,192 @@
+"""Encoding of rows in the binary format of the COPY command.
+"""
+from collections.abc import Callable, Iterable
+import datetime
+import io
+import struct
+import uuid
+
+# The signature, flags and header extension length that start the data
+HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+# The field count that ends the data
+TRAILER = struct.pack('!h', -1)
+# The length of null fields
+NULL_FIELD = struct.pack('!i', -1)
+# The start of the binary timestamps, which are the microseconds since then
+TIMESTAMP_EPOCH = datetime.datetime(2000, 1, 1)
+
+# The structures of the length prefixed fields of fixed size types
+_INT16 = struct.Struct('!ih')
+_INT32 = struct.Struct('!ii')
+_INT64 = struct.Struct('!iq')
+_LENGTH = struct.Struct('!i')
+
+
+def _smallint(value) -> bytes:
+    """Encode a smallint field.
+
+    :param value: The value, as an integer or as its text representation.
+    :return: The encoded field.
+    """
+    return _INT16.pack(2, int(value))
+
+
+def _integer(value) -> bytes:
+    """Encode an integer field.
+
+    :param value: The value, as an integer or as its text representation.
+    :return: The encoded field.
+    """
+    return _INT32.pack(4, int(value))
+
+
+def _bigint(value) -> bytes:
+    """Encode a bigint field.
+
+    :param value: The value, as an integer or as its text representation.
+    :return: The encoded field.
+    """
+    return _INT64.pack(8, int(value))
+
+
+def _boolean(value) -> bytes:
+    """Encode a boolean field.
+
+    :param value: The value, as a boolean or as its text representation.
+    :return: The encoded field.
+    """
+    if isinstance(value, str):
+        value = value.lower() in ('true', 't', '1')
+
+    return b'\x00\x00\x00\x01\x01' if value else b'\x00\x00\x00\x01\x00'
+
+
+def _text(value) -> bytes:
+    """Encode a text or varchar field. Values are sent as they are, so they do not need to be escaped.
+
+    :param value: The value.
+    :return: The encoded field.
+    """
+    data = str(value).encode()
+
+    return _LENGTH.pack(len(data)) + data
+
+
+def _timestamptz(value) -> bytes:
+    """Encode a timestamp with time zone field. Timestamps without a time zone are in UTC, as is the time zone of the
+    database connections.
+
+    :param value: The value, as a datetime or in ISO 8601 format, as in the dump files.
+    :return: The encoded field.
+    """
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.UTC).replace(tzinfo=None)
+    delta = value - TIMESTAMP_EPOCH
+
+    return _INT64.pack(8, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def _date(value) -> bytes:
+    """Encode a date field. Dates are encoded as the days since the start of the binary timestamps.
+
+    :param value: The value, as a date or in ISO 8601 format.
+    :return: The encoded field.
+    """
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+
+    return _INT32.pack(4, (value - TIMESTAMP_EPOCH.date()).days)
+
+
+def _uuid(value) -> bytes:
+    """Encode a uuid field.
+
+    :param value: The value, as a UUID or as its text representation.
+    :return: The encoded field.
+    """
+    if isinstance(value, str):
+        value = uuid.UUID(value)
+
+    return b'\x00\x00\x00\x10' + value.bytes
+
+
+# The field encoders, by column type
+ENCODERS: dict[str, Callable[[object], bytes]] = {
+    'smallint': _smallint,
+    'integer': _integer,
+    'bigint': _bigint,
+    'boolean': _boolean,
+    'text': _text,
+    'varchar': _text,
+    'timestamptz': _timestamptz,
+    'date': _date,
+    'uuid': _uuid,
+}
+
+
+class BinaryRowStream(io.RawIOBase):
+    """A file-like object that encodes rows in the binary format of the COPY command. The values are converted to the
+    binary representation of the column types, so the database does not have to parse them, and text values are sent
+    as they are, without escaping. As with the text format, rows are pulled from the iterable only when the database
+    reads from the stream.
+    """
+    def __init__(self, rows: Iterable[tuple], column_types: Iterable[str], null: object = '<NULL>') -> None:
+        """Create the row stream.
+
+        :param rows: The rows to stream.
+        :param column_types: The types of the columns of the rows, which must match the types of the table columns.
+        :param null: The value that stands for null, besides None.
+        :raises ValueError: If there is no encoder for a column type.
+        """
+        super().__init__()
+        column_types = tuple(column_types)
+        unknown = [column_type for column_type in column_types if column_type not in ENCODERS]
+        if unknown:
+            raise ValueError(f"Column types {', '.join(unknown)} cannot be encoded")
+        self._rows = iter(rows)
+        self._encoders = tuple(ENCODERS[column_type] for column_type in column_types)
+        self._field_count = struct.pack('!h', len(column_types))
+        self._null = null
+        self._buffer = bytearray(HEADER)
+
+    def readable(self) -> bool:
+        """Return True, as the stream can be read.
+
+        :return: True.
+        """
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the stream.
+
+        :param size: The maximum number of bytes to read. If negative, all the remaining rows are read.
+        :return: The data read, or empty bytes if all the rows have been read.
+        """
+        while self._rows is not None and (size < 0 or len(self._buffer) < size):
+            row = next(self._rows, None)
+            if row is None:
+                self._buffer += TRAILER
+                self._rows = None
+                break
+            self._buffer += self.encode(row)
+
+        size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+
+        return data
+
+    def encode(self, row: tuple) -> bytes:
+        """Encode a row.
+
+        :param row: The row.
+        :return: The encoded row.
+        """
+        null = self._null
+
+        return self._field_count + b''.join(
+            NULL_FIELD if value is None or value == null else encode(value)
+            for encode, value in zip(self._encoders, row, strict=True)
+        )
@@ -0,0 +1,150 @@
+"""Support for bulk loading tables without their indexes, constraints and triggers.
+"""
+import concurrent.futures
+import dataclasses
+import logging
+from typing import Self
+
+from django.db import connection
+
+from . import metrics
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The memory used by each index build
+MAINTENANCE_WORK_MEM = '512MB'
+# The maximum number of indexes and constraints that are built concurrently
+MAX_BUILDS = 4
+
+
+def check_deferred_constraints(cursor) -> None:
+    """Run the pending deferred constraint checks of the current transaction, as tables cannot be altered while they
+    have pending checks. The constraints are deferred again after, as all the foreign keys are initially deferred.
+
+    :param cursor: The database cursor.
+    """
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+@dataclasses.dataclass
+class TableObjects:
+    """The indexes, constraints and triggers of a table, which are dropped before the table is bulk loaded, and are
+    created again after, as building an index once is much faster than updating it for every row. The primary key is
+    kept, as the foreign keys of other tables depend on it, along with the unique constraints that foreign keys depend
+    on.
+    """
+    # The table name
+    table: str
+    # The definitions of the indexes that do not belong to a constraint, by name
+    indexes: dict[str, str]
+    # The definitions of the unique and foreign key constraints, by name
+    constraints: dict[str, str]
+    # The definitions of the triggers, by name
+    triggers: dict[str, str]
+
+    @classmethod
+    def capture(cls, cursor, table: str, keys: bool = False) -> Self:
+        """Capture the definitions of the indexes, constraints and triggers of a table.
+
+        :param cursor: The database cursor.
+        :param table: The table name.
+        :param keys: If True, the primary key and the unique constraints that foreign keys depend on are also captured.
+        :return: The table objects.
+        """
+        cursor.execute(
+            "SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid) FROM pg_index "
+            "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+            "WHERE pg_index.indrelid = %s::regclass AND NOT EXISTS ("
+            "SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid "
+            "AND pg_constraint.conrelid = pg_index.indrelid)", [table]
+        )
+        indexes = dict(cursor.fetchall())
+        # Unique constraints and primary keys are listed before foreign keys, which may depend on them
+        key_filter = "contype IN ('p', 'u')" if keys else (
+            "contype = 'u' AND NOT EXISTS (SELECT 1 FROM pg_constraint AS foreign_keys "
+            "WHERE foreign_keys.contype = 'f' AND foreign_keys.conindid = pg_constraint.conindid)"
+        )
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND ("
+            f"contype = 'f' OR {key_filter}) ORDER BY contype DESC, conname", [table]
+        )
+        constraints = dict(cursor.fetchall())
+        cursor.execute(
+            "SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+            [table]
+        )
+        triggers = dict(cursor.fetchall())
+
+        return cls(table, indexes, constraints, triggers)
+
+    def drop(self, cursor) -> None:
+        """Drop the indexes, constraints and triggers of the table.
+
+        :param cursor: The database cursor.
+        """
+        check_deferred_constraints(cursor)
+        table = connection.ops.quote_name(self.table)
+        for name in self.triggers:
+            cursor.execute(f"DROP TRIGGER {connection.ops.quote_name(name)} ON {table}")
+        for name in reversed(self.constraints):
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {connection.ops.quote_name(name)}")
+        for name in self.indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    def restore(self, table_metrics: metrics.TableMetrics | None = None) -> None:
+        """Create the indexes, constraints and triggers of the table again. The indexes and unique constraints are
+        built concurrently, each one with its own database connection, and then the foreign keys are validated
+        concurrently. When running inside a transaction, the other connections cannot see the loaded data, so they are
+        built one after the other with the current connection instead.
+
+        :param table_metrics: The metrics of the load of the table, to which the time of each phase is added.
+        """
+        table_metrics = table_metrics if table_metrics is not None else metrics.TableMetrics(self.table)
+        table = connection.ops.quote_name(self.table)
+        constraints = {
+            name: f"ALTER TABLE {table} ADD CONSTRAINT {connection.ops.quote_name(name)} {definition}"
+            for name, definition in self.constraints.items()
+        }
+        foreign_keys = [constraints.pop(name) for name, definition in self.constraints.items()
+                        if definition.startswith('FOREIGN KEY')]
+        with table_metrics.phase("index build"):
+            self._execute([*self.indexes.values(), *constraints.values()])
+        with table_metrics.phase("foreign key validation"):
+            self._execute(foreign_keys)
+        with table_metrics.phase("trigger creation"):
+            with connection.cursor() as cursor:
+                for definition in self.triggers.values():
+                    cursor.execute(definition)
+
+    @staticmethod
+    def _execute(statements: list[str]) -> None:
+        """Execute statements concurrently, each one with its own database connection.
+
+        :param statements: The statements.
+        """
+        if connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                check_deferred_constraints(cursor)
+                cursor.execute(f"SET LOCAL maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'")
+                for statement in statements:
+                    cursor.execute(statement)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_BUILDS) as executor:
+            for future in [executor.submit(_execute_statement, statement) for statement in statements]:
+                future.result()
+
+
+def _execute_statement(statement: str) -> None:
+    """Execute a statement with the database connection of the current thread, and close the connection.
+
+    :param statement: The statement.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'")
+            cursor.execute(statement)
+    finally:
+        connection.close()
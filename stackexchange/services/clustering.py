@@ -0,0 +1,114 @@
+"""The physical reorganization of the loaded tables, which are rewritten in the order of the key they are most often
+read by, so that the rows read together are stored in the same pages.
+"""
+import logging
+
+from django.db import connection
+
+from stackexchange import models
+from . import bulkload, metrics
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The column by which each table is clustered, which is the key of its most common access pattern: the posts of a user,
+# and the comments and the history of a post
+CLUSTER_KEYS = {
+    'posts': 'owner_id',
+    'post_comments': 'post_id',
+    'post_history': 'post_id',
+}
+
+
+def cluster_index(cursor, table: str, column: str) -> str:
+    """Return the name of the index of a table whose only key is a column.
+
+    :param cursor: The database cursor.
+    :param table: The table name.
+    :param column: The column name.
+    :return: The index name.
+    :raises ValueError: If the column is not indexed.
+    """
+    cursor.execute(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+        "JOIN pg_attribute ON pg_attribute.attrelid = pg_index.indrelid AND pg_attribute.attnum = pg_index.indkey[0] "
+        "WHERE pg_index.indrelid = %s::regclass AND pg_index.indnkeyatts = 1 AND pg_index.indpred IS NULL "
+        "AND pg_attribute.attname = %s ORDER BY index_class.relname", [table, column]
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Column {column} of table {table} is not indexed")
+
+    return row[0]
+
+
+def correlation(cursor, table: str, column: str) -> float | None:
+    """Return the correlation of the physical order of the rows of a table with the order of a column, as estimated by
+    the last analyze of the table. It is 1 when the rows are stored in the order of the column, and close to 0 when
+    they are scattered.
+
+    :param cursor: The database cursor.
+    :param table: The table name.
+    :param column: The column name.
+    :return: The correlation, or None if the column was not analyzed, or all its values are null.
+    """
+    cursor.execute(
+        "SELECT correlation FROM pg_stats JOIN pg_class ON pg_class.relname = pg_stats.tablename "
+        "AND pg_class.relnamespace = pg_stats.schemaname::regnamespace "
+        "WHERE pg_class.oid = %s::regclass AND pg_stats.attname = %s", [table, column]
+    )
+    row = cursor.fetchone()
+
+    return row[0] if row is not None else None
+
+
+def cluster(table: str) -> metrics.TableMetrics:
+    """Rewrite a table in the order of its cluster key, and vacuum it, freezing its rows, so that the visibility map
+    marks all its pages as visible and frozen. The correlation of the key is measured before and after, and is
+    recorded, along with the time taken, in the metrics of the table in the load manifest.
+
+    Tables cannot be vacuumed in a transaction, so a table that is clustered in a transaction is only analyzed.
+
+    :param table: The table name.
+    :return: The metrics of the table.
+    """
+    column = CLUSTER_KEYS[table]
+    manifest = models.LoadManifest.objects.get(table_name=table)
+    table_metrics = metrics.TableMetrics.from_dict(manifest.metrics)
+    with connection.cursor() as cursor:
+        bulkload.check_deferred_constraints(cursor)
+        cursor.execute(f"ANALYZE {table} ({column})")
+        table_metrics.cluster_key = column
+        table_metrics.correlation_before = correlation(cursor, table, column)
+        with table_metrics.phase("cluster"):
+            cursor.execute(
+                f"SET {'LOCAL ' if connection.in_atomic_block else ''}maintenance_work_mem = "
+                f"'{bulkload.MAINTENANCE_WORK_MEM}'"
+            )
+            cursor.execute(f"CLUSTER {table} USING {cluster_index(cursor, table, column)}")
+            if not connection.in_atomic_block:
+                cursor.execute("RESET maintenance_work_mem")
+        with table_metrics.phase("vacuum"):
+            if connection.in_atomic_block:
+                cursor.execute(f"ANALYZE {table}")
+            else:
+                cursor.execute(f"VACUUM (FREEZE, ANALYZE) {table}")
+        table_metrics.correlation_after = correlation(cursor, table, column)
+    manifest.metrics = table_metrics.to_dict()
+    manifest.save(update_fields=['metrics'])
+    logger.info(
+        "Table %s: clustered on %s, correlation %s before, %s after", table, column,
+        _format_correlation(table_metrics.correlation_before), _format_correlation(table_metrics.correlation_after)
+    )
+
+    return table_metrics
+
+
+def _format_correlation(value: float | None) -> str:
+    """Format a correlation for the log.
+
+    :param value: The correlation, or None if it is not known.
+    :return: The formatted correlation.
+    """
+    return f"{value:.2f}" if value is not None else "unknown"
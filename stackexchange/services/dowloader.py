@@ -1,8 +1,14 @@
 """Helper class that downloads files from the Stack Exchange Data Dump located in the Internet archive
 (https://archive.org/details/stackexchange).
 """
+import concurrent.futures
+import hashlib
+import json
 import logging
+import os
 import pathlib
+import re
+import threading
 
 import requests
 import tqdm
@@ -16,90 +22,241 @@ logger = logging.getLogger(__name__)
 class Downloader:
     """Helper class to files from the Exchange Data Dump. Uses caching in order not to download files when they are
     already downloaded.
+
+    When the server supports byte ranges, the file is downloaded in parts over parallel connections, into a file that
+    is allocated up front. The completed parts are recorded in a manifest, so that an interrupted download resumes
+    from where it stopped. The downloaded file is verified against its size and, when the ETag is an MD5 digest, as is
+    the case for the Internet archive, against its checksum.
     """
     # The base URL
     BASE_URL = 'https://archive.org/download/stackexchange'
     # Timeout in seconds
     TIMEOUT = 60
+    # The size of the buffers used to read the responses, in bytes
+    CHUNK_SIZE = 1024 * 1024
+    # The size of the parts downloaded over parallel connections, in bytes
+    PART_SIZE = 64 * 1024 * 1024
+    # The default number of parallel connections
+    CONNECTIONS = 4
 
-    def __init__(self, filename: str):
+    def __init__(
+            self, filename: str, base_url: str = BASE_URL, cache_dir: pathlib.Path | None = None,
+            connections: int = CONNECTIONS
+    ):
         """Create the file downloader.
 
         :param filename: The name of the file to download.
+        :param base_url: The URL from which the file is downloaded.
+        :param cache_dir: The directory in which the file is cached. Defaults to the var/cache directory.
+        :param connections: The number of parallel connections.
         """
         self.filename = filename
-        self._cache_dir = pathlib.Path(settings.BASE_DIR) / "var" / "cache"
+        self.base_url = base_url
+        self.connections = connections
+        self._cache_dir = cache_dir or pathlib.Path(settings.BASE_DIR) / "var" / "cache"
         self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
 
-    def get_file(self) -> pathlib.Path:
-        """Get the file, either by downloading it or by returning the cached version.
-
-        :return: The file.
+    @property
+    def url(self) -> str:
+        """The file URL.
         """
-        if self.should_download():
-            self.download()
-        else:
-            logger.info("File %s is up to date", self.filename)
+        return f"{self.base_url}/{self.filename}"
 
+    @property
+    def file(self) -> pathlib.Path:
+        """The cached file.
+        """
         return self._cache_dir / self.filename
 
-    def should_download(self) -> bool:
-        """Check if the file should be downloaded.
+    def get_file(self) -> pathlib.Path:
+        """Get the file, either by downloading it or by returning the cached version. A conditional request is made
+        with the ETag of the cached file, so that the file is only downloaded if it has changed.
 
-        :return: True if the file should be downloaded, false otherwise.
+        :return: The file.
         """
-        if not (self._cache_dir / self.filename).exists():
+        headers = {}
+        local_etag = self.cached_etag()
+        if local_etag is not None:
+            headers['If-None-Match'] = f'"{local_etag}"'
+        else:
             logger.info("File %s does not exist in cache", self.filename)
-            return True
-        if self.file_changed():
-            return True
 
-        return False
+        with requests.get(self.url, headers=headers, stream=True, timeout=self.TIMEOUT) as response:
+            if response.status_code == requests.codes.not_modified:
+                logger.info("File %s is up to date", self.filename)
+                return self.file
+            response.raise_for_status()
+            if local_etag is not None:
+                logger.info("File %s has changed from the cached version", self.filename)
+
+            etag = response.headers.get('ETag', '').strip('"')
+            size = int(response.headers.get('Content-Length', 0))
+            if response.headers.get('Accept-Ranges') == 'bytes' and etag and size:
+                # Download from the final URL, so that the redirects are not followed for each part
+                url = response.url
+                response.close()
+                self.download_parts(url, etag, size)
+            else:
+                self.download(response, etag, size)
 
-    def file_changed(self) -> bool:
-        """Check if the dump file has changed.
+        return self.file
 
-        :return: True if the dump file has changed, False otherwise.
-        """
-        # Get the latest file etag
-        response = requests.head(f"{self.BASE_URL}/{self.filename}", allow_redirects=True, timeout=self.TIMEOUT)
-        response.raise_for_status()
-        remote_etag = response.headers['Etag'].strip('"')
+    def cached_etag(self) -> str | None:
+        """Get the ETag of the cached file.
 
-        # Get the cached file etag
+        :return: The ETag, or None if the file is not cached.
+        """
         etag_file = self._cache_dir / f"{self.filename}.etag"
-        if not etag_file.exists():
-            logger.info("Cache info for file %s does not exist", self.filename)
-            return True
-
-        # Check if the file has changed
-        with etag_file.open('r') as f:
-            local_etag = f.read()
-            if remote_etag != local_etag:
-                logger.info("File %s has changed from the cached version", self.filename)
-                return True
+        if not self.file.exists() or not etag_file.exists():
+            return None
 
-        logger.info("Cache for file %s is up to date", self.filename)
+        return etag_file.read_text().strip()
 
-        return False
+    def download(self, response: requests.Response, etag: str, size: int) -> None:
+        """Download the dump file over a single connection.
 
-    def download(self) -> None:
-        """Download the dump file.
+        :param response: The response, whose body is the file.
+        :param etag: The file ETag.
+        :param size: The file size, or zero if not known.
         """
         logger.info("Downloading file %s", self.filename)
+        part_file = self._part_file()
+        with (
+            part_file.open('wb') as f,
+            tqdm.tqdm(desc=self.filename, total=size, unit='iB', unit_scale=True) as progress_bar
+        ):
+            for data in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                progress_bar.update(f.write(data))
+
+        self.complete(etag, size)
+
+    def download_parts(self, url: str, etag: str, size: int) -> None:
+        """Download the dump file in parts over parallel connections. The parts that were completed by a previous
+        download of the same file version are not downloaded again.
+
+        :param url: The file URL.
+        :param etag: The file ETag.
+        :param size: The file size.
+        """
+        part_file = self._part_file()
+        manifest = self._read_manifest()
+        if (
+                manifest.get('etag') != etag or manifest.get('size') != size or
+                manifest.get('part_size') != self.PART_SIZE or not part_file.exists()
+        ):
+            manifest = {'etag': etag, 'size': size, 'part_size': self.PART_SIZE, 'parts': []}
+            with part_file.open('wb') as f:
+                f.truncate(size)
+            self._write_manifest(manifest)
+
+        part_count = (size + self.PART_SIZE - 1) // self.PART_SIZE
+        pending = [index for index in range(part_count) if index not in manifest['parts']]
+        logger.info(
+            "Downloading file %s, %d of %d parts over %d connections", self.filename, len(pending), part_count,
+            self.connections
+        )
+        completed = sum(min(self.PART_SIZE, size - index * self.PART_SIZE) for index in manifest['parts'])
+        with (
+            tqdm.tqdm(desc=self.filename, total=size, initial=completed, unit='iB', unit_scale=True) as progress_bar,
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.connections) as executor
+        ):
+            futures = [
+                executor.submit(self.download_part, url, etag, manifest, index, progress_bar) for index in pending
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
 
-        # Download file
-        with requests.get(f"{self.BASE_URL}/{self.filename}", stream=True, timeout=self.TIMEOUT) as response:
+        self.complete(etag, size)
+
+    def download_part(self, url: str, etag: str, manifest: dict, index: int, progress_bar: tqdm.tqdm) -> None:
+        """Download a part of the dump file, and record it as completed in the manifest.
+
+        :param url: The file URL.
+        :param etag: The file ETag. The part is only downloaded if the file has not changed since.
+        :param manifest: The download manifest.
+        :param index: The part index.
+        :param progress_bar: The progress bar to update.
+        """
+        start = index * self.PART_SIZE
+        end = min(start + self.PART_SIZE, manifest['size'])
+        headers = {'Range': f"bytes={start}-{end - 1}", 'If-Range': f'"{etag}"'}
+        with requests.get(url, headers=headers, stream=True, timeout=self.TIMEOUT) as response:
             response.raise_for_status()
-            total = int(response.headers.get('content-length', 0))
-            with (
-                (self._cache_dir / f"{self.filename}").open('wb') as f,
-                tqdm.tqdm(desc=self.filename, total=total, unit='iB', unit_scale=True) as progress_bar
-            ):
-                for data in response.iter_content(chunk_size=1024):
+            if response.status_code != requests.codes.partial_content:
+                raise ValueError(f"File {self.filename} changed while it was being downloaded")
+            with self._part_file().open('r+b', buffering=self.CHUNK_SIZE) as f:
+                f.seek(start)
+                for data in response.iter_content(chunk_size=self.CHUNK_SIZE):
                     size = f.write(data)
-                    progress_bar.update(size)
+                    with self._lock:
+                        progress_bar.update(size)
+                if f.tell() != end:
+                    raise ValueError(f"Part {index} of file {self.filename} is incomplete")
+
+        with self._lock:
+            manifest['parts'].append(index)
+            self._write_manifest(manifest)
+
+    def complete(self, etag: str, size: int) -> None:
+        """Verify the downloaded file, and replace the cached file with it.
 
-        # Write the cache information
-        with (self._cache_dir / f"{self.filename}.etag").open('wt') as f:
-            f.write(response.headers['ETag'].strip('"'))
+        :param etag: The file ETag.
+        :param size: The file size, or zero if not known.
+        """
+        part_file = self._part_file()
+        try:
+            if size and part_file.stat().st_size != size:
+                raise ValueError(f"File {self.filename} size does not match the expected size {size}")
+            # The Internet archive ETag is the MD5 digest of the file
+            if re.fullmatch(r'[0-9a-f]{32}', etag):
+                with part_file.open('rb') as f:
+                    checksum = hashlib.file_digest(f, 'md5').hexdigest()
+                if checksum != etag:
+                    raise ValueError(f"File {self.filename} checksum {checksum} does not match the expected {etag}")
+        except ValueError:
+            part_file.unlink()
+            self._manifest_file().unlink(missing_ok=True)
+            raise
+
+        os.replace(part_file, self.file)
+        (self._cache_dir / f"{self.filename}.etag").write_text(etag)
+        self._manifest_file().unlink(missing_ok=True)
+        logger.info("File %s downloaded", self.filename)
+
+    def _part_file(self) -> pathlib.Path:
+        """Get the file to which the data are downloaded, until the download completes.
+
+        :return: The partially downloaded file.
+        """
+        return self._cache_dir / f"{self.filename}.part"
+
+    def _manifest_file(self) -> pathlib.Path:
+        """Get the file that records the completed parts of the download.
+
+        :return: The manifest file.
+        """
+        return self._cache_dir / f"{self.filename}.part.json"
+
+    def _read_manifest(self) -> dict:
+        """Read the download manifest.
+
+        :return: The manifest, or an empty dictionary if there is no download in progress.
+        """
+        try:
+            return json.loads(self._manifest_file().read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Write the download manifest. The manifest is replaced atomically, so that it is never left half written.
+
+        :param manifest: The manifest.
+        """
+        temp_file = self._manifest_file().with_suffix('.tmp')
+        temp_file.write_text(json.dumps(manifest))
+        os.replace(temp_file, self._manifest_file())
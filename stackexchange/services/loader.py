@@ -1,28 +1,257 @@
 """Class for loading site data.
 """
-import abc
-from collections.abc import Iterable
+import collections
+from collections.abc import Generator, Iterable, Sequence
+import contextlib
 import csv
+import dataclasses
 import datetime
+import hashlib
+import io
+import itertools
+import json
 import logging
 import pathlib
 import tempfile
 import time
 
 from django.conf import settings
-from django.db import connection
-import py7zr
-import requests
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
 
 from stackexchange import enums, models
-from . import dowloader, siteinfo, xmlparser
+from . import (
+    archive, binarycopy, bulkload, clustering, dowloader, idindex, metrics, scheduler, shadow, siteinfo, snapshot,
+    tablestats, tagflags, xmlparser
+)
 
 # The module logger
 logger = logging.getLogger(__name__)
 
 
-class BaseFileLoader(abc.ABC):
+class CopyDialect(csv.Dialect):  # pylint: disable=too-few-public-methods
+    """The format in which the rows are written for the COPY command. Values are not quoted, but special characters are
+    escaped with a backslash, as expected by the text format of COPY.
+    """
+    delimiter = ','
+    quotechar = '"'
+    escapechar = '\\'
+    doublequote = False
+    skipinitialspace = False
+    lineterminator = '\n'
+    quoting = csv.QUOTE_NONE
+
+
+class RowStream(io.TextIOBase):
+    """A file-like object that formats rows as data for the COPY command. Rows are pulled from the iterable only when
+    the database reads from the stream, so the input file is parsed at the pace at which the database consumes the data,
+    and only a few rows are held in memory at any time.
+    """
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        """Create the row stream.
+
+        :param rows: The rows to stream.
+        """
+        super().__init__()
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, dialect=CopyDialect)
+
+    def readable(self) -> bool:
+        """Return True, as the stream can be read.
+
+        :return: True.
+        """
+        return True
+
+    def read(self, size: int = -1) -> str:
+        """Read from the stream.
+
+        :param size: The maximum number of characters to read. If negative, all the remaining rows are read.
+        :return: The data read, or an empty string if all the rows have been read.
+        """
+        while size < 0 or self._buffer.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+
+        return self._consume(self._buffer.tell() if size < 0 else size)
+
+    def readline(self, size: int = -1) -> str:
+        """Read a line from the stream. Rows are written one at a time, so a line is at most a row.
+
+        :param size: The maximum number of characters to read. If negative, the whole line is read.
+        :return: The data read, or an empty string if all the rows have been read.
+        """
+        if self._buffer.tell() == 0:
+            row = next(self._rows, None)
+            if row is not None:
+                self._writer.writerow(row)
+        data = self._buffer.getvalue()
+        end = data.find(CopyDialect.lineterminator) + 1 or len(data)
+
+        return self._consume(end if size < 0 else min(end, size))
+
+    def _consume(self, size: int) -> str:
+        """Remove data from the start of the buffer.
+
+        :param size: The number of characters to remove.
+        :return: The removed data.
+        """
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(data[size:])
+
+        return data[:size]
+
+
+@dataclasses.dataclass(frozen=True)
+class Reference:
+    """A reference of a table column to another table.
+    """
+    # The referencing column
+    column: str
+    # The referenced table
+    table: str
+    # The column of the referenced table that matches the values of the input file. The column is loaded with the
+    # primary key of the matching row.
+    key: str = 'id'
+    # If True, rows that reference a row that does not exist are not loaded. Otherwise, the column is set to null.
+    required: bool = False
+    # The type of the referenced column, which is the type of the column in the staging table
+    key_type: str = 'bigint'
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadProfile:
+    """A load profile, which selects the tables that are loaded, and can thin out the rows and clear the large columns
+    of the tables that the deployment does not need. Tables that are not loaded are left empty, as they are truncated
+    along with the tables they reference.
+    """
+    # The profile name
+    name: str
+    # The names of the tables that are loaded, or None if all the tables are loaded. The tables that a loaded table
+    # depends on must also be loaded.
+    tables: tuple[str, ...] | None = None
+    # The attribute of the input rows that selects the rows that are loaded, and its selected values, by table name
+    rows: dict[str, tuple[str, tuple[str, ...]]] = dataclasses.field(default_factory=dict)
+    # The value to which each cleared column is set, by column name, by table name. Columns that can be null are set
+    # to null, and columns that cannot are set to an empty value.
+    cleared_columns: dict[str, dict[str, object]] = dataclasses.field(default_factory=dict)
+
+    def includes(self, table: str) -> bool:
+        """Check if a table is loaded.
+
+        :param table: The table name.
+        :return: True if the table is loaded.
+        """
+        return self.tables is None or table in self.tables
+
+    def signature(self, table: str) -> str:
+        """Return the signature of the rows that the profile loads to a table, which is the same for all the profiles
+        that load the same rows.
+
+        :param table: The table name.
+        :return: The signature, which is empty if all the rows are loaded as they are.
+        """
+        signature = []
+        if table in self.rows:
+            attribute, values = self.rows[table]
+            signature.append(f"{attribute}={'|'.join(values)}")
+        if table in self.cleared_columns:
+            signature.append(f"cleared={'|'.join(sorted(self.cleared_columns[table]))}")
+
+        return ';'.join(signature)
+
+
+# The load profiles, by name
+LOAD_PROFILES = {profile.name: profile for profile in (
+    # All the tables and columns are loaded
+    LoadProfile('full'),
+    # The votes that are not served by the API, and the texts of the post revisions are not loaded
+    LoadProfile(
+        'api-core', rows={'post_votes': ('VoteTypeId', (str(enums.PostVoteType.FAVORITE.value), ))},
+        cleared_columns={'post_history': {'text': '<NULL>'}}
+    ),
+    # The votes are only loaded as daily rollups
+    LoadProfile(
+        'vote-rollups', tables=(
+            'site_users', 'badges', 'user_badges', 'posts', 'tags', 'post_tags', 'post_vote_rollups', 'post_comments',
+            'post_history', 'post_links'
+        )
+    ),
+    # Only the users, badges, posts and tags are loaded, without the post bodies and the user profiles, and the votes
+    # are only loaded as daily rollups
+    LoadProfile(
+        'metadata-only',
+        tables=('site_users', 'badges', 'user_badges', 'posts', 'tags', 'post_tags', 'post_vote_rollups'),
+        cleared_columns={'site_users': {'about': '<NULL>'}, 'posts': {'body': ''}}
+    ),
+)}
+
+
+class Chunk:
+    """A chunk of consecutive rows of an input file, which is transformed at once. The values of each attribute of the
+    rows are collected in a column when they are first needed, so that the loaders can transform whole columns with a
+    single comprehension or builtin call, instead of looking up the attributes of every row.
+    """
+    # Stands for the default value of the attributes that every row has
+    REQUIRED = object()
+
+    def __init__(self, rows: list[dict]) -> None:
+        """Create the chunk.
+
+        :param rows: The rows, as parsed from the input file.
+        """
+        self.rows = rows
+        self._columns = {}
+
+    def __len__(self) -> int:
+        """Return the number of rows in the chunk.
+
+        :return: The number of rows.
+        """
+        return len(self.rows)
+
+    def column(self, name: str, default: object = REQUIRED) -> list:
+        """Get the values of an attribute of the rows.
+
+        :param name: The attribute name.
+        :param default: The value for the rows that do not have the attribute. If not set, every row must have it.
+        :return: The values, in the order of the rows.
+        :raises KeyError: If the default value is not set, and a row does not have the attribute.
+        """
+        key = (name, default)
+        if key not in self._columns:
+            if default is self.REQUIRED:
+                self._columns[key] = [row[name] for row in self.rows]
+            else:
+                self._columns[key] = [row.get(name, default) for row in self.rows]
+
+        return self._columns[key]
+
+
+class BaseFileLoader:
     """The base class for file loading.
+
+    The rows of the input file are transformed in chunks. Loaders either transform each row on its own, by implementing
+    transform, or transform the columns of a chunk at once, by implementing transform_batch, which avoids the cost of
+    calling Python code for every row of the large tables. Loader classes that implement neither cannot be defined.
+
+    The rows are either resolved by the loader, which checks their references against the identifier indexes and
+    copies them to the table, or are copied as they are to an unlogged staging table, and then inserted to the table
+    with a single query that resolves their references by joining with the referenced tables.
+
+    When loading a delta, the table is not truncated. The rows are copied to the staging table along with a fingerprint,
+    which is compared with the fingerprints of the previous load, so that only the rows that changed are written to the
+    table, and the rows that no longer exist are deleted.
+
+    When using snapshots, the rows copied to the staging table are saved to a snapshot, keyed by the ETag of the archive
+    and the loader version. Later loads of the same archive copy the snapshot to the staging table instead of parsing
+    the input file, and skip the table entirely when it was last loaded from the same snapshot.
     """
     # The filename from which to read the data. Subclasses must set this attribute.
     INPUT_FILENAME = None
@@ -30,24 +259,237 @@ class BaseFileLoader(abc.ABC):
     TABLE_NAME = None
     # The table columns. Subclasses must set this attribute.
     TABLE_COLUMNS = None
-
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
+    # The types of the table columns, in the same order, with which the rows are encoded in the binary format of COPY.
+    # Subclasses must set this attribute.
+    COLUMN_TYPES = None
+    # The names of the tables that must be loaded before this table
+    DEPENDENCIES = ()
+    # True if the input file can be split in shards that are loaded in parallel. This requires that rows are transformed
+    # independently of each other, or are combined when the staging table is merged, and that the table does not
+    # reference itself, as each shard is loaded in its own transaction.
+    SHARDABLE = False
+    # The references of the table columns to other tables
+    REFERENCES = ()
+    # True if the table is always loaded through a staging table, because the rows reference other tables by a key that
+    # is only resolved by the database
+    STAGING = False
+    # The columns that identify a row when loading a delta
+    KEY_COLUMNS = ('id', )
+    # The columns that change on every load, and are not part of the row fingerprints
+    VOLATILE_COLUMNS = ()
+    # The version of the transformed rows, which must be increased when the transformation changes, so that the
+    # snapshots saved by previous versions are not used
+    VERSION = 1
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Check that a loader class implements either transform or transform_batch.
+
+        :param kwargs: The keyword arguments of the class definition.
+        :raises TypeError: If the loader class implements neither method.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls.transform is BaseFileLoader.transform and cls.transform_batch is BaseFileLoader.transform_batch:
+            raise TypeError(f"Loader {cls.__name__} must implement either transform or transform_batch")
+
+    def __init__(
+            self, site_id: int, data_dir: pathlib.Path, staging: bool = False, bulk: bool = False, delta: bool = False,
+            snapshots: bool = False, resume: bool = False, binary: bool = False, profile: LoadProfile | None = None
+    ) -> None:
         """Create the file loader.
 
         :param site_id: The site identifier.
         :param data_dir: The data directory.
+        :param staging: If True, the table is loaded through a staging table.
+        :param bulk: If True, the indexes, constraints and triggers of the table are dropped before the table is loaded,
+            and are created again after.
+        :param delta: If True, only the differences from the previous load are written to the table. Deltas are always
+            loaded through a staging table, and are merged to the table by merge_delta.
+        :param snapshots: If True, the rows copied to the staging table are saved to a snapshot, or are copied from the
+            snapshot if it is already saved. Tables are always loaded through a staging table when using snapshots.
+        :param resume: If True, the table is skipped if the load manifest records that it was completed from the same
+            input file, and only the shards that were not completed are loaded if it was loaded in shards.
+        :param binary: If True, the streamed rows are copied in the binary format of COPY, encoded with the column
+            types, instead of the text format. Data files are always written in the text format.
+        :param profile: The load profile, which selects the rows that are loaded to the table, and the columns that
+            are cleared. If not set, all the rows and columns are loaded.
         """
         self.site_id = site_id
         self.data_dir = data_dir
-
-    @abc.abstractmethod
-    def transform(self, row: dict) -> tuple | list[tuple] | None:
+        self.staging = staging or delta or snapshots or self.STAGING
+        self.bulk = bulk
+        self.delta = delta
+        self.snapshots = snapshots
+        self.resume = resume
+        self.binary = binary
+        self.profile = profile if profile is not None else LOAD_PROFILES['full']
+        # The attribute and the values that select the loaded rows, and the values of the cleared columns, by position
+        attribute, values = self.profile.rows.get(self.TABLE_NAME, (None, ()))
+        self._selected_rows = (attribute, frozenset(values)) if attribute is not None else None
+        self._cleared_columns = {
+            self.TABLE_COLUMNS.index(column): value
+            for column, value in self.profile.cleared_columns.get(self.TABLE_NAME, {}).items()
+        }
+        # The metrics of the part of the load of the table that is done by the loader
+        self.metrics = metrics.TableMetrics(self.TABLE_NAME)
+        # The fingerprint of the input file and the snapshot of the table, set by prepare
+        self.source_fingerprint = None
+        self.snapshot = None
+        self._fingerprinted = [
+            position for position, column in enumerate(self.TABLE_COLUMNS) if column not in self.VOLATILE_COLUMNS
+        ]
+        # The indexes are read up front, as the database connection cannot be used while the rows are streamed
+        referenced = {reference.table for reference in self.REFERENCES if reference.table != self.TABLE_NAME}
+        if not self.staging:
+            self.users = self.user_index() if 'site_users' in referenced else None
+            self.posts = self.post_index() if 'posts' in referenced else None
+
+    def transform(self, row: dict) -> tuple | list[tuple] | None:  # pylint: disable=unused-argument
         """Transform the rows from the input file to a row that can be loaded to the database table. If an input row
-        cannot be loaded, this method must return None.
+        cannot be loaded, this method must return None. It is only called by the default transform_batch, so it is
+        implemented by the loaders that do not implement transform_batch, which is checked when they are defined.
 
-        :return: The transformed row.
+        :param row: The input row.
+        :return: The transformed row, or None, as the base loader loads no rows.
+        """
+        return None
+
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of rows from the input file to the rows that can be loaded to the database table, in
+        columnar form. By default, each row of the chunk is transformed by transform.
+
+        :param chunk: The chunk of input rows.
+        :return: The values of each table column for the transformed rows, in the order of the table columns.
+        """
+        rows = []
+        for row in chunk.rows:
+            transformed = self.transform(row)
+            if isinstance(transformed, tuple):
+                rows.append(transformed)
+            elif transformed is not None:
+                rows.extend(transformed)
+
+        return list(zip(*rows)) if rows else [() for _ in self.TABLE_COLUMNS]
+
+    def flush(self) -> Sequence[Sequence]:
+        """Return the rows that the loader holds back until all the rows of the input file, or of its shard, are
+        transformed, such as the rows that aggregate the input rows. By default, rows are not held back.
+
+        :return: The values of each table column for the remaining rows, in the order of the table columns.
+        """
+        return [() for _ in self.TABLE_COLUMNS]
+
+    def transformed_batch(self, chunk: Chunk) -> Iterable[tuple]:
+        """Transform a chunk of rows from the input file to the rows that should be loaded to the database table. Only
+        the rows selected by the load profile are transformed, and the columns it clears are set to their empty value.
+
+        :param chunk: The chunk of input rows.
+        :return: The transformed rows.
+        """
+        if self._selected_rows is not None:
+            attribute, values = self._selected_rows
+            chunk = Chunk([row for row in chunk.rows if row.get(attribute) in values])
+
+        return self.output_rows(self.transform_batch(chunk))
+
+    def flushed_rows(self) -> Iterable[tuple]:
+        """Return the rows that should be loaded to the database table once all the rows of the input file are
+        transformed.
+
+        :return: The remaining rows.
+        """
+        return self.output_rows(self.flush())
+
+    def output_rows(self, columns: Sequence[Sequence]) -> Iterable[tuple]:
+        """Convert the columns of transformed rows to the rows that are loaded, setting the columns cleared by the load
+        profile to their empty value, and adding the row fingerprints when loading a delta.
+
+        :param columns: The values of each table column for the transformed rows.
+        :return: The rows.
+        """
+        if self._cleared_columns:
+            columns = list(columns)
+            for position, value in self._cleared_columns.items():
+                columns[position] = [value] * len(columns[position])
+        rows = zip(*columns, strict=True)
+        if self.delta:
+            return [(*row, self.fingerprint(row)) for row in rows]
+
+        return rows
+
+    def select(self, columns: Sequence[Sequence], selected: list[bool] | None) -> Sequence[Sequence]:
+        """Select the transformed rows that are loaded. The rows that are not selected are counted as dropped.
+
+        :param columns: The values of each column of the transformed rows.
+        :param selected: True for each row that is loaded, or None if all the rows are loaded.
+        :return: The values of each column of the selected rows.
+        """
+        if selected is None or all(selected):
+            return columns
+        self.metrics.rows_dropped += selected.count(False)
+
+        return [list(itertools.compress(column, selected)) for column in columns]
+
+    def fingerprint(self, row: tuple) -> int:
+        """Calculate the fingerprint of a transformed row, which changes when any of the values of the row that are
+        not volatile changes.
+
+        :param row: The transformed row.
+        :return: The fingerprint, as a signed 64 bit integer.
+        """
+        data = '\x1f'.join(str(row[position]) for position in self._fingerprinted).encode()
+
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), signed=True)
+
+    def user_index(self) -> idindex.IdMap:
+        """Get the index of the site users, that maps the user identifiers of the dump to the site user primary keys.
+        The site users table must already be loaded. The index must be read before the rows are streamed, as the
+        database connection cannot be used while the data are copied.
+
+        :return: The index.
+        """
+        return idindex.IdMap.cached(self.data_dir / 'site_users.idx', lambda: idindex.IdMap.build(
+            models.SiteUser.objects.order_by('unique_id').values_list('unique_id', 'pk').iterator(chunk_size=10000)
+        ))
+
+    def post_index(self) -> idindex.IdSet:
+        """Get the index of the post identifiers. The posts table must already be loaded. The index must be read before
+        the rows are streamed, as the database connection cannot be used while the data are copied.
+
+        :return: The index.
+        """
+        return idindex.IdSet.cached(self.data_dir / 'posts.idx', lambda: idindex.IdSet.build(
+            models.Post.objects.values_list('pk', flat=True).iterator(chunk_size=10000),
+            models.Post.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+        ))
+
+    def resolve_users(self, user_ids: list[str | None]) -> list[int | str]:
+        """Resolve user identifiers of the dump to the site user primary keys. When loading through a staging table,
+        the identifiers are resolved by the database instead.
+
+        :param user_ids: The user identifiers, which are None for the rows that have no user.
+        :return: The site user primary keys, or the null value for the users that do not exist.
         """
-        raise NotImplementedError
+        if self.staging:
+            return ['<NULL>' if user_id is None else user_id for user_id in user_ids]
+
+        return self.users.get_many(
+            [None if user_id is None else int(user_id) for user_id in user_ids], default='<NULL>')
+
+    def has_posts(self, *post_ids: list[str]) -> list[bool] | None:
+        """Check if the posts referenced by the rows exist. When loading through a staging table, the rows of posts
+        that do not exist are dropped by the database instead.
+
+        :param post_ids: The post identifiers of each referencing column.
+        :return: True for each row whose referenced posts all exist, or None if all the rows are loaded.
+        """
+        if self.staging:
+            return None
+        exists = None
+        for column in post_ids:
+            column_exists = self.posts.contains_many(map(int, column))
+            exists = column_exists if exists is None else [a and b for a, b in zip(exists, column_exists)]
+
+        return exists
 
     def perform(self) -> None:
         """Load the data.
@@ -59,37 +501,633 @@ class BaseFileLoader(abc.ABC):
     def extract(self) -> None:
         """Extract the data from an input file.
         """
-        logger.info('Extracting data from %s', self.INPUT_FILENAME)
+        FileScanner(xmlparser.XmlFileIterator(self.data_dir / self.INPUT_FILENAME), (self, )).scan()
 
-        with self.data_filename().open('wt') as f:
-            writer = csv.writer(f, delimiter=',', quoting=csv.QUOTE_NONE, escapechar='\\')
-            for row in xmlparser.XmlFileIterator(self.data_dir / self.INPUT_FILENAME):
-                transformed = self.transform(row)
-                if transformed:
-                    if isinstance(transformed, tuple):
-                        writer.writerow(transformed)
-                    elif isinstance(transformed, list):
-                        for transformed_row in transformed:
-                            writer.writerow(transformed_row)
-
-    def load(self) -> None:
+    def load(self, rows: Iterable[tuple] | None = None) -> None:
         """Load data for a table.
+
+        :param rows: The transformed rows, which are streamed directly to the database. If not set, the rows are read
+            from the data file.
         """
         logger.info("Loading table %s", self.TABLE_NAME)
+        # The rows of a data file written by the first loader of a group were read and transformed by another process
+        if rows is None and self.metrics_filename().exists():
+            self.metrics.add(metrics.TableMetrics.from_dict(json.loads(self.metrics_filename().read_text())))
+            self.metrics_filename().unlink()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            table_objects = None
+            if self.bulk:
+                with self.metrics.phase("drop"):
+                    table_objects = self.drop_table_objects(cursor)
+            self.start_load(table_objects)
+            if not self.delta:
+                self.truncate(cursor)
+            if self.staging:
+                self.create_staging_table(cursor, self.delta)
+            # The table is truncated in the same transaction, so the rows can be frozen when bulk loading
+            with self.metrics.phase("copy"):
+                if self.snapshot is not None and self.snapshot.exists():
+                    loaded_rows = self.snapshot.restore(cursor, self.staging_table_name())
+                else:
+                    loaded_rows = self.copy_rows(cursor, rows, freeze=self.bulk)
+                    if self.snapshot is not None:
+                        self.snapshot.save(cursor, self.staging_table_name())
+            self.metrics.rows_copied += loaded_rows
+            # The rows of a delta are merged after all the tables are staged
+            if not self.delta:
+                if self.staging:
+                    with self.metrics.phase("merge"):
+                        loaded_rows = self.merge_staging_table(cursor)
+                    self.metrics.rows_dropped += self.dropped_rows(self.metrics.rows_copied, loaded_rows)
+                with self.metrics.phase("finalize"):
+                    self.finalize(cursor)
+        if self.bulk:
+            table_objects.restore(self.metrics)
+        if not self.delta:
+            self.complete_load(loaded_rows)
+        else:
+            self.save_metrics()
+
+    def load_shard(self, rows: Iterable[tuple], index: int, count: int) -> None:
+        """Load the data of a shard of the input file, without truncating the table. When loading through a staging
+        table, the data are copied to the staging table, which must already exist. The shard is recorded as completed
+        in the same transaction, along with the metrics of the shard.
+
+        :param rows: The transformed rows of the shard, which are streamed directly to the database. If not set, the
+            rows are read from the data file of the shard, which is removed once they are loaded.
+        :param index: The shard index, starting from zero.
+        :param count: The number of shards.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            with self.metrics.phase("copy"):
+                if rows is None:
+                    with self.data_filename(index).open('rt') as f:
+                        loaded_rows = self.copy(cursor, f)
+                else:
+                    loaded_rows = self.copy_rows(cursor, rows)
+            self.metrics.rows_copied += loaded_rows
+            models.LoadCheckpoint.objects.create(
+                manifest=models.LoadManifest.objects.get(table_name=self.TABLE_NAME), shard=index, shard_count=count,
+                rows=loaded_rows, metrics=self.metrics.to_dict()
+            )
+        if rows is None:
+            self.data_filename(index).unlink()
+
+    def prepare(self, dump: archive.DumpArchive) -> bool:
+        """Prepare the load of the table from a dump, finding the fingerprint of its input file and, when using
+        snapshots, its snapshot. Deltas are always merged, as the tables they depend on may change in the same
+        transaction.
+
+        :param dump: The dump archive.
+        :return: True if the table is skipped, as it is already loaded from its snapshot, or it was completed from the
+            same input file by the load that is resumed.
+        """
+        self.source_fingerprint = dump.fingerprint(self.INPUT_FILENAME)
+        # Tables whose rows are thinned out or cleared by the profile are only resumed with the same profile
+        signature = self.profile.signature(self.TABLE_NAME)
+        if self.source_fingerprint is not None and signature:
+            self.source_fingerprint = f"{self.source_fingerprint}:{signature}"
+        if self.snapshots:
+            self.snapshot = self.table_snapshot(dump, self.delta, self.profile)
+        last_load = None if self.delta else self.last_load()
+        if last_load is None:
+            return False
+        if self.snapshot is not None and last_load.source_key == self.snapshot.key and self.has_rows():
+            logger.info("Table %s is already loaded from snapshot %s", self.TABLE_NAME, self.snapshot.key)
+            return True
+        if self.resume and last_load.source_fingerprint == self.source_fingerprint:
+            logger.info("Table %s was completed by the resumed load", self.TABLE_NAME)
+            return True
+
+        return False
+
+    @classmethod
+    def table_snapshot(
+            cls, dump: archive.DumpArchive, delta: bool = False, profile: LoadProfile | None = None
+    ) -> snapshot.Snapshot | None:
+        """Get the snapshot of the table. The snapshot key is derived from the ETag of the archive that contains the
+        input file, the loader version, the columns of the staging table and the rows that the load profile loads.
+
+        :param dump: The dump archive.
+        :param delta: If True, the staging table also has a column for the row fingerprints.
+        :param profile: The load profile. If not set, all the rows and columns are loaded.
+        :return: The snapshot, or None if the input file is not in a downloaded archive.
+        """
+        archive_file = dump.archive_files.get(cls.INPUT_FILENAME)
+        etag = dump.etag(archive_file) if archive_file is not None else None
+        if etag is None:
+            return None
+        columns = (*cls.TABLE_COLUMNS, 'fingerprint') if delta else cls.TABLE_COLUMNS
+        signature = profile.signature(cls.TABLE_NAME) if profile is not None else ''
+        source = f"{etag}:{cls.INPUT_FILENAME}:{cls.VERSION}:{','.join(columns)}"
+        if signature:
+            source = f"{source}:{signature}"
+        key = hashlib.sha256(source.encode()).hexdigest()[:16]
+
+        # The snapshots of deltas are kept separately, as they also have the row fingerprints
+        name = f"{archive_file.name}.{cls.TABLE_NAME}{'-delta' if delta else ''}"
+
+        return snapshot.Snapshot(archive_file.parent / 'snapshots', name, key)
+
+    @classmethod
+    def last_load(cls) -> models.LoadManifest | None:
+        """Get the manifest entry of the last load of the table, if it was completed after the loads of all the tables
+        it depends on. A table whose dependencies were loaded again since must be loaded again too, as truncating them
+        truncates it, and its references are resolved to their new rows.
+
+        :return: The manifest entry, or None if the table must be loaded.
+        """
+        manifests = {
+            manifest.table_name: manifest
+            for manifest in models.LoadManifest.objects.filter(table_name__in=(cls.TABLE_NAME, *cls.DEPENDENCIES))
+        }
+        if any(
+                table not in manifests or manifests[table].status != enums.LoadStatus.COMPLETED
+                for table in (cls.TABLE_NAME, *cls.DEPENDENCIES)
+        ):
+            return None
+        manifest = manifests[cls.TABLE_NAME]
+        if any(manifests[table].completed_at > manifest.completed_at for table in cls.DEPENDENCIES):
+            return None
+
+        return manifest
+
+    @classmethod
+    def has_rows(cls) -> bool:
+        """Check if the table has rows.
 
+        :return: True if the table has at least one row.
+        """
         with connection.cursor() as cursor:
-            cursor.execute(f"TRUNCATE TABLE {self.TABLE_NAME} CASCADE")
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {cls.TABLE_NAME})")
+            return cursor.fetchone()[0]
+
+    def drop_table_objects(self, cursor) -> bulkload.TableObjects:
+        """Drop the indexes, constraints and triggers of the table before it is bulk loaded. When resuming a load that
+        dropped them, and was interrupted before it created them again, the table no longer has them, so the
+        definitions saved to the load manifest by that load are returned instead of the ones captured from the table.
+
+        :param cursor: The database cursor.
+        :return: The dropped table objects, which are saved to the load manifest until they are created again.
+        """
+        table_objects = bulkload.TableObjects.capture(cursor, self.TABLE_NAME)
+        table_objects.drop(cursor)
+        if self.resume:
+            manifest = models.LoadManifest.objects.filter(
+                table_name=self.TABLE_NAME, status=enums.LoadStatus.STARTED.value, table_objects__isnull=False
+            ).first()
+            if manifest is not None:
+                logger.info("Table %s: restoring the objects dropped by the resumed load", self.TABLE_NAME)
+                return bulkload.TableObjects(**manifest.table_objects)
+
+        return table_objects
+
+    def start_load(self, table_objects: bulkload.TableObjects | None = None) -> None:
+        """Record the start of the load of the table in the load manifest, removing the checkpoints of a previous load.
+
+        :param table_objects: The indexes, constraints and triggers that are dropped until the table is loaded, when
+            they are created again by another task.
+        """
+        manifest, _ = models.LoadManifest.objects.update_or_create(table_name=self.TABLE_NAME, defaults={
+            'status': enums.LoadStatus.STARTED.value, 'source_fingerprint': self.source_fingerprint,
+            'source_key': None, 'rows': None, 'started_at': timezone.now(), 'completed_at': None,
+            'table_objects': dataclasses.asdict(table_objects) if table_objects is not None else None, 'metrics': None
+        })
+        manifest.checkpoints.all().delete()
+
+    def complete_load(self, rows: int) -> None:
+        """Record the completion of the load of the table in the load manifest, along with the metrics of the load,
+        which must already include the metrics recorded by the other tasks that loaded the table.
+
+        :param rows: The number of rows written to the table.
+        """
+        self.metrics.rows_written = rows
+        manifest, _ = models.LoadManifest.objects.update_or_create(table_name=self.TABLE_NAME, defaults={
+            'status': enums.LoadStatus.COMPLETED.value, 'source_fingerprint': self.source_fingerprint,
+            'source_key': self.snapshot.key if self.snapshot is not None else None, 'rows': rows,
+            'completed_at': timezone.now(), 'table_objects': None, 'metrics': self.metrics.to_dict()
+        })
+        manifest.checkpoints.all().delete()
+        logger.info("Table %s: %d rows loaded", self.TABLE_NAME, rows)
+
+    def save_metrics(self) -> None:
+        """Record the metrics of the loader in the load manifest, so that they are added to the metrics of the tasks
+        that load the table after, in other processes. The metrics of the checkpoints must already be included, and are
+        cleared, so that they are not added twice.
+        """
+        manifest = models.LoadManifest.objects.get(table_name=self.TABLE_NAME)
+        manifest.metrics = self.metrics.to_dict()
+        manifest.save(update_fields=['metrics'])
+        manifest.checkpoints.update(metrics=None)
+
+    def collect_metrics(self) -> None:
+        """Add the metrics recorded in the load manifest by the tasks that loaded the table before, such as the metrics
+        of its shards, to the metrics of the loader.
+        """
+        manifest = models.LoadManifest.objects.filter(table_name=self.TABLE_NAME).first()
+        if manifest is None:
+            return
+        for data in (manifest.metrics, *manifest.checkpoints.values_list('metrics', flat=True)):
+            if data is not None:
+                self.metrics.add(metrics.TableMetrics.from_dict(data))
+
+    def dropped_rows(self, copied: int, merged: int) -> int:
+        """Return the number of rows of the staging table that were not merged to the table, as they reference rows
+        that do not exist.
+
+        :param copied: The number of rows copied to the staging table.
+        :param merged: The number of rows merged to the table.
+        :return: The number of dropped rows.
+        """
+        return copied - merged
+
+    def completed_shards(self, count: int) -> dict[int, int] | None:
+        """Get the shards that were completed by the load of the table that is resumed. The shards can only be reused
+        if the load started from the same input file and was split in the same number of shards, and the copied rows are
+        all still there, as the staging tables are unlogged, and are emptied if the database server crashes.
+
+        :param count: The number of shards.
+        :return: The number of rows of each completed shard, by shard index, or None if the load cannot be resumed.
+        """
+        manifest = models.LoadManifest.objects.filter(table_name=self.TABLE_NAME).first()
+        if (
+                manifest is None or manifest.status != enums.LoadStatus.STARTED or
+                manifest.source_fingerprint != self.source_fingerprint
+        ):
+            return None
+        checkpoints = dict(manifest.checkpoints.values_list('shard', 'rows'))
+        if manifest.checkpoints.exclude(shard_count=count).exists():
+            return None
+        table = self.staging_table_name() if self.staging else self.TABLE_NAME
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [table])
+            if cursor.fetchone()[0] is None:
+                return None
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            if cursor.fetchone()[0] != sum(checkpoints.values()):
+                return None
+
+        return checkpoints
+
+    @classmethod
+    def truncate(cls, cursor) -> None:
+        """Truncate the table, and all the tables that reference it. The fingerprints of the previous delta no longer
+        match the table, so they are dropped. The pending deferred constraint checks of the transaction are run first,
+        as tables with pending checks cannot be truncated.
+
+        :param cursor: The database cursor.
+        """
+        bulkload.check_deferred_constraints(cursor)
+        cursor.execute(f"TRUNCATE TABLE {cls.TABLE_NAME} CASCADE")
+        cursor.execute(f"DROP TABLE IF EXISTS {cls.fingerprint_table_name()}")
+
+    @classmethod
+    def staging_table_name(cls) -> str:
+        """Return the name of the staging table.
+
+        :return: The staging table name.
+        """
+        return f"{cls.TABLE_NAME}_staging"
+
+    @classmethod
+    def fingerprint_table_name(cls) -> str:
+        """Return the name of the table that keeps the row fingerprints of the last delta.
+
+        :return: The fingerprint table name.
+        """
+        return f"{cls.TABLE_NAME}_fingerprints"
+
+    @classmethod
+    def create_staging_table(cls, cursor, delta: bool = False) -> None:
+        """Create the staging table. The staging table is unlogged and has no constraints, and its columns have the
+        type of the table columns, except for the referencing columns, which have the type of the referenced key.
+
+        :param cursor: The database cursor.
+        :param delta: If True, the staging table also has a column for the row fingerprints.
+        """
+        references = {reference.column: reference for reference in cls.REFERENCES}
+        columns = [
+            f"{references[column].table}.{references[column].key} AS {column}" if column in references
+            else f"{cls.TABLE_NAME}.{column}"
+            for column in cls.TABLE_COLUMNS
+        ]
+        if delta:
+            columns.append("NULL::bigint AS fingerprint")
+        tables = dict.fromkeys([cls.TABLE_NAME, *(reference.table for reference in cls.REFERENCES)])
+        cursor.execute(f"DROP TABLE IF EXISTS {cls.staging_table_name()}")
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE {cls.staging_table_name()} AS SELECT {', '.join(columns)} "
+            f"FROM {', '.join(tables)} WITH NO DATA"
+        )
+
+    @classmethod
+    def staging_rows(cls) -> str:
+        """Return the query that selects the rows of the staging table with their references resolved, by joining with
+        the referenced tables. Rows with required references to rows that do not exist are not selected.
+
+        :return: The query.
+        """
+        staging_table = cls.staging_table_name()
+        references = {reference.column: reference for reference in cls.REFERENCES}
+        columns, joins = [], []
+        for column in cls.TABLE_COLUMNS:
+            if column not in references:
+                columns.append(f"{staging_table}.{column}")
+                continue
+            # References of the table to itself are resolved against the staging table
+            reference = references[column]
+            table = staging_table if reference.table == cls.TABLE_NAME else reference.table
+            alias = f"{column}_reference"
+            joins.append(
+                f"{'JOIN' if reference.required else 'LEFT JOIN'} {table} AS {alias} "
+                f"ON {alias}.{reference.key} = {staging_table}.{column}"
+            )
+            columns.append(f"{alias}.id AS {column}")
+
+        return f"SELECT {', '.join(columns)} FROM {staging_table} {' '.join(joins)}"
+
+    @classmethod
+    def merge_staging_table(cls, cursor) -> int:
+        """Insert the rows of the staging table to the table, resolving their references by joining with the
+        referenced tables, and drop the staging table.
+
+        :param cursor: The database cursor.
+        :return: The number of inserted rows.
+        """
+        staging_table = cls.staging_table_name()
+        logger.info("Merging staging table %s", staging_table)
+        cursor.execute(f"ANALYZE {staging_table}")
+        cursor.execute(f"INSERT INTO {cls.TABLE_NAME} ({', '.join(cls.TABLE_COLUMNS)}) {cls.staging_rows()}")
+        inserted = cursor.rowcount
+        cursor.execute(f"DROP TABLE {staging_table}")
+
+        return inserted
+
+    def merge_delta(self, cursor, deleted_tables: set[str]) -> int:
+        """Merge the delta in the staging table to the table, and drop the staging table. The rows of the table that
+        are not in the staging table are deleted, and the rows of the staging table whose fingerprint differs from the
+        previous load are inserted, or update the rows with the same key. The deltas of all tables are merged in the
+        same transaction, in loading order, so that the deferred foreign keys are only checked once all of them are.
+        The load is recorded as completed in the load manifest, with the number of inserted or updated rows.
+
+        :param cursor: The database cursor.
+        :param deleted_tables: The tables whose rows were deleted by the deltas merged before, in the same transaction.
+            References to rows that no longer exist in them are set to null.
+        :return: The number of deleted rows.
+        """
+        self.collect_metrics()
+        with self.metrics.phase("merge"):
+            deleted, changed = self._merge_delta(cursor, deleted_tables)
+        self.complete_load(changed)
+
+        return deleted
+
+    def _merge_delta(self, cursor, deleted_tables: set[str]) -> tuple[int, int]:
+        """Merge the delta in the staging table to the table, and drop the staging table.
+
+        :param cursor: The database cursor.
+        :param deleted_tables: The tables whose rows were deleted by the deltas merged before.
+        :return: The number of deleted rows, and the number of inserted or updated rows.
+        """
+        table, staging_table = self.TABLE_NAME, self.staging_table_name()
+        fingerprint_table = self.fingerprint_table_name()
+        key = ', '.join(self.KEY_COLUMNS)
+        logger.info("Merging delta of table %s", table)
+        cursor.execute(f"ANALYZE {staging_table}")
+        cursor.execute(
+            f"DELETE FROM {table} WHERE NOT EXISTS (SELECT 1 FROM ({self.staging_rows()}) AS dump_rows "
+            f"WHERE {_match('dump_rows', table, self.KEY_COLUMNS)})"
+        )
+        deleted = cursor.rowcount
+
+        # The rows whose fingerprint has not changed are removed from the staging table, which is left with the
+        # inserted and updated rows
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {fingerprint_table} AS SELECT {key}, fingerprint FROM {staging_table} "
+            "WITH NO DATA"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {fingerprint_table}_key ON {fingerprint_table} ({key})")
+        cursor.execute(
+            f"DELETE FROM {fingerprint_table} WHERE NOT EXISTS (SELECT 1 FROM {staging_table} "
+            f"WHERE {_match(staging_table, fingerprint_table, self.KEY_COLUMNS)})"
+        )
+        cursor.execute(
+            f"DELETE FROM {staging_table} USING {fingerprint_table} "
+            f"WHERE {_match(staging_table, fingerprint_table, self.KEY_COLUMNS)} "
+            f"AND {staging_table}.fingerprint = {fingerprint_table}.fingerprint"
+        )
+        # When all the columns are part of the key, rows are either inserted or already exist
+        updated_columns = [column for column in self.TABLE_COLUMNS if column not in self.KEY_COLUMNS]
+        if updated_columns:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(self.TABLE_COLUMNS)}) {self.staging_rows()} "
+                f"ON CONFLICT ({key}) DO UPDATE SET "
+                f"{', '.join(f'{column} = EXCLUDED.{column}' for column in updated_columns)}"
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(self.TABLE_COLUMNS)}) SELECT * FROM ({self.staging_rows()}) "
+                f"AS dump_rows WHERE NOT EXISTS ("
+                f"SELECT 1 FROM {table} WHERE {_match('dump_rows', table, self.KEY_COLUMNS)})"
+            )
+        changed = cursor.rowcount
+        cursor.execute(
+            f"DELETE FROM {fingerprint_table} USING {staging_table} "
+            f"WHERE {_match(staging_table, fingerprint_table, self.KEY_COLUMNS)}"
+        )
+        cursor.execute(f"INSERT INTO {fingerprint_table} SELECT {key}, fingerprint FROM {staging_table}")
+        cursor.execute(f"DROP TABLE {staging_table}")
+
+        # References to the deleted rows of the tables that were merged before, or of this table, are set to null
+        if deleted:
+            deleted_tables = deleted_tables | {table}
+        for reference in self.REFERENCES:
+            if not reference.required and reference.table in deleted_tables:
+                cursor.execute(
+                    f"UPDATE {table} SET {reference.column} = NULL WHERE {reference.column} IS NOT NULL AND NOT EXISTS "
+                    f"(SELECT 1 FROM {reference.table} AS referenced WHERE referenced.id = {table}.{reference.column})"
+                )
+        logger.info("Table %s: %d rows deleted, %d rows inserted or updated", table, deleted, changed)
+
+        return deleted, changed
+
+    def copy_rows(self, cursor, rows: Iterable[tuple] | None, freeze: bool = False) -> int:
+        """Copy the rows to the table.
+
+        :param cursor: The database cursor.
+        :param rows: The transformed rows, which are streamed directly to the database. If not set, the rows are read
+            from the data file.
+        :param freeze: If True, the rows are copied frozen.
+        :return: The number of copied rows.
+        """
+        if rows is None:
             with self.data_filename().open('rt') as f:
-                cursor.copy_from(f, table=self.TABLE_NAME, columns=self.TABLE_COLUMNS, sep=',', null='<NULL>')
+                return self.copy(cursor, f, freeze)
+        if self.binary:
+            return self.copy(cursor, binarycopy.BinaryRowStream(rows, self.column_types()), freeze, binary=True)
+
+        return self.copy(cursor, RowStream(rows), freeze)
+
+    def copy(self, cursor, f: io.IOBase, freeze: bool = False, binary: bool = False) -> int:
+        """Copy data to the table, or to the staging table when loading through a staging table.
+
+        :param cursor: The database cursor.
+        :param f: The file-like object from which the data are read.
+        :param freeze: If True, the rows are copied frozen, so that they do not have to be vacuumed later. The table
+            must have been created or truncated in the current transaction.
+        :param binary: If True, the data are in the binary format of COPY. Otherwise, they are in the text format.
+        :return: The number of copied rows.
+        """
+        table = self.staging_table_name() if self.staging else self.TABLE_NAME
+        columns = (*self.TABLE_COLUMNS, 'fingerprint') if self.delta else self.TABLE_COLUMNS
+        if binary:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary{', FREEZE' if freeze else ''})", f
+            )
+        elif freeze:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+                f"WITH (FORMAT text, DELIMITER '{CopyDialect.delimiter}', NULL '<NULL>', FREEZE)", f
+            )
+        else:
+            cursor.copy_from(f, table=table, columns=columns, sep=CopyDialect.delimiter, null='<NULL>')
+
+        return cursor.rowcount
+
+    def column_types(self) -> tuple[str, ...]:
+        """Return the types of the columns to which the rows are copied. The referencing columns of the staging table
+        have the type of the referenced column, and the staging table of a delta also has the row fingerprints.
+
+        :return: The column types, in the order of the copied columns.
+        """
+        references = {reference.column: reference for reference in self.REFERENCES} if self.staging else {}
+        column_types = tuple(
+            references[column].key_type if column in references else column_type
+            for column, column_type in zip(self.TABLE_COLUMNS, self.COLUMN_TYPES, strict=True)
+        )
+
+        return (*column_types, 'bigint') if self.delta else column_types
 
-    def data_filename(self) -> pathlib.Path:
+    def finalize(self, cursor) -> None:
+        """Called after the data are copied to the table, in the same transaction. Foreign key constraints are deferred
+        until the end of the transaction, so subclasses can use it to fix references to rows that do not exist.
+
+        :param cursor: The database cursor.
+        """
+
+    def metrics_filename(self) -> pathlib.Path:
+        """Return the file name to which the metrics of the rows written to the data file are saved, when the data file
+        is written by another loader of the group.
+
+        :return: The file name of the metrics.
+        """
+        return self.data_dir / f"{self.TABLE_NAME}.metrics.json"
+
+    def data_filename(self, shard: int | None = None) -> pathlib.Path:
         """Return the file name from which to load the data.
 
+        :param shard: The shard index, if the data of a shard of the input file are loaded.
         :return: The file name from which to load the data.
         """
+        if shard is not None:
+            return self.data_dir / f"{self.TABLE_NAME}.{shard}.csv"
+
         return self.data_dir / f"{self.TABLE_NAME}.csv"
 
 
+def _match(left: str, right: str, columns: Iterable[str]) -> str:
+    """Return the condition that matches the rows of two tables with the same values in some columns.
+
+    :param left: The first table.
+    :param right: The second table.
+    :param columns: The columns.
+    :return: The condition.
+    """
+    return ' AND '.join(f"{left}.{column} = {right}.{column}" for column in columns)
+
+
+class FileScanner:
+    """Scans an input file once, and sends every row to all the loaders that read their data from it. Each loader
+    writes its transformed rows to its own data file.
+    """
+    # The number of rows in the chunks that are transformed at once
+    CHUNK_SIZE = 1000
+
+    def __init__(
+            self, rows: xmlparser.XmlFileIterator, loaders: Iterable[BaseFileLoader], shard: int | None = None
+    ) -> None:
+        """Create the file scanner.
+
+        :param rows: The iterator over the rows of the input file, or of a shard of it.
+        :param loaders: The loaders that read their data from the input file.
+        :param shard: The index of the shard that is scanned, whose data are written to the data files of the shard.
+        """
+        self.rows = rows
+        self.loaders = tuple(loaders)
+        self.shard = shard
+
+    def scan(self) -> None:
+        """Scan the input file and write the data files for all loaders.
+        """
+        for _ in self.stream():
+            pass
+
+    def stream(self, streamed: BaseFileLoader | None = None) -> Generator[tuple]:
+        """Scan the input file. The transformed rows of one loader are yielded, so that they can be streamed to the
+        database, while the rows of all other loaders are written to their data files.
+
+        :param streamed: The loader whose rows are yielded.
+        :return: Yields the transformed rows of the streamed loader.
+        """
+        logger.info(
+            'Extracting data from %s for %s', self.rows.xml_file.name,
+            ', '.join(loader.TABLE_NAME for loader in self.loaders)
+        )
+        with contextlib.ExitStack() as stack:
+            sinks = [
+                (
+                    loader,
+                    csv.writer(stack.enter_context(loader.data_filename(self.shard).open('wt')), dialect=CopyDialect)
+                )
+                for loader in self.loaders if loader is not streamed
+            ]
+            # The input file is parsed once, so its parse time and bytes are counted for the first loader
+            first = self.loaders[0].metrics
+            batches = self.rows.batches(self.CHUNK_SIZE)
+            while True:
+                start = time.perf_counter()
+                rows = next(batches, None)
+                first.parse_seconds += time.perf_counter() - start
+                if rows is None:
+                    break
+                chunk = Chunk(rows)
+                for loader, writer in sinks:
+                    writer.writerows(self.transform(loader, chunk))
+                if streamed is not None:
+                    yield from self.transform(streamed, chunk)
+            first.bytes_read += self.rows.bytes_read
+            for loader, writer in sinks:
+                writer.writerows(loader.flushed_rows())
+            if streamed is not None:
+                yield from streamed.flushed_rows()
+
+    @staticmethod
+    def transform(loader: BaseFileLoader, chunk: Chunk) -> Iterable[tuple]:
+        """Transform a chunk of input rows with a loader, counting the rows read and the time taken in its metrics.
+
+        :param loader: The loader.
+        :param chunk: The chunk of input rows.
+        :return: The transformed rows.
+        """
+        start = time.perf_counter()
+        rows = loader.transformed_batch(chunk)
+        loader.metrics.transform_seconds += time.perf_counter() - start
+        loader.metrics.rows_read += len(chunk)
+
+        return rows
+
+
 class SiteUserLoader(BaseFileLoader):
     """The site user loader.
     """
@@ -99,17 +1137,25 @@ class SiteUserLoader(BaseFileLoader):
         'unique_id', 'site_id', 'display_name', 'website_url', 'location', 'about', 'creation_date',
         'last_modified_date', 'last_access_date', 'reputation', 'views', 'up_votes', 'down_votes'
     )
+    COLUMN_TYPES = (
+        'integer', 'bigint', 'varchar', 'varchar', 'varchar', 'text', 'timestamptz', 'timestamptz', 'timestamptz',
+        'integer', 'integer', 'integer', 'integer'
+    )
+    SHARDABLE = True
+    KEY_COLUMNS = ('unique_id', )
+    VOLATILE_COLUMNS = ('last_modified_date', )
 
-    def transform(self, row) -> tuple | list[tuple] | None:
-        """Transform the input row so that it can be loaded to the users table.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the users table.
 
-        :param row: The input row.
-        :return: The transformed row.
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
         return (
-            row['Id'], self.site_id, row['DisplayName'], row.get('WebsiteUrl', '<NULL>'), row.get('Location', '<NULL>'),
-            row.get('AboutMe', '<NULL>'), row['CreationDate'], datetime.datetime.now(), row['LastAccessDate'],
-            row['Reputation'], row['Views'], row['UpVotes'], row['DownVotes']
+            chunk.column('Id'), [self.site_id] * len(chunk), chunk.column('DisplayName'),
+            chunk.column('WebsiteUrl', '<NULL>'), chunk.column('Location', '<NULL>'), chunk.column('AboutMe', '<NULL>'),
+            chunk.column('CreationDate'), [datetime.datetime.now()] * len(chunk), chunk.column('LastAccessDate'),
+            chunk.column('Reputation'), chunk.column('Views'), chunk.column('UpVotes'), chunk.column('DownVotes')
         )
 
 
@@ -119,14 +1165,25 @@ class BadgeLoader(BaseFileLoader):
     INPUT_FILENAME = 'Badges.xml'
     TABLE_NAME = 'badges'
     TABLE_COLUMNS = 'id', 'name', 'badge_class', 'badge_type'
+    COLUMN_TYPES = 'bigint', 'varchar', 'smallint', 'smallint'
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
+    def __init__(
+            self, site_id: int, data_dir: pathlib.Path, staging: bool = False, bulk: bool = False, delta: bool = False,
+            snapshots: bool = False, resume: bool = False, binary: bool = False, profile: LoadProfile | None = None
+    ) -> None:
         """Initialize the badge loader.
 
         :param site_id: The site identifier.
         :param data_dir: The data directory
+        :param staging: If True, the table is loaded through a staging table.
+        :param bulk: If True, the table is bulk loaded.
+        :param delta: If True, only the differences from the previous load are written to the table.
+        :param snapshots: If True, the transformed rows are saved to a snapshot, or copied from it.
+        :param resume: If True, the table is skipped if it was completed by the load that is resumed.
+        :param binary: If True, the streamed rows are copied in the binary format.
+        :param profile: The load profile.
         """
-        super().__init__(site_id, data_dir)
+        super().__init__(site_id, data_dir, staging, bulk, delta, snapshots, resume, binary, profile)
         self.processed_badges = set()
 
     def transform(self, row: dict) -> tuple | list[tuple] | None:
@@ -151,27 +1208,48 @@ class UserBadgeLoader(BaseFileLoader):
     INPUT_FILENAME = 'Badges.xml'
     TABLE_NAME = 'user_badges'
     TABLE_COLUMNS = 'user_id', 'badge_id', 'date_awarded'
-
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
+    COLUMN_TYPES = 'bigint', 'bigint', 'timestamptz'
+    DEPENDENCIES = ('site_users', 'badges')
+    REFERENCES = (Reference('user_id', 'site_users', key='unique_id', required=True, key_type='integer'), )
+    STAGING = True
+    KEY_COLUMNS = TABLE_COLUMNS
+
+    def __init__(
+            self, site_id: int, data_dir: pathlib.Path, staging: bool = False, bulk: bool = False, delta: bool = False,
+            snapshots: bool = False, resume: bool = False, binary: bool = False, profile: LoadProfile | None = None
+    ) -> None:
         """Initialize the badge loader.
 
         :param site_id: The site identifier.
         :param data_dir: The data directory
+        :param staging: If True, the table is loaded through a staging table.
+        :param bulk: If True, the table is bulk loaded.
+        :param delta: If True, only the differences from the previous load are written to the table.
+        :param snapshots: If True, the transformed rows are saved to a snapshot, or copied from it.
+        :param resume: If True, the table is skipped if it was completed by the load that is resumed.
+        :param binary: If True, the streamed rows are copied in the binary format.
+        :param profile: The load profile.
         """
-        super().__init__(site_id, data_dir)
-        self.users = set(models.SiteUser.objects.values_list('pk', flat=True))
-        self.badges = {b['name']: b['pk'] for b in models.Badge.objects.values('pk', 'name')}
-
-    def transform(self, row: dict) -> tuple | list[tuple] | None:
-        """Transform the input row so that it can be loaded to the user_badges table.
-
-        :param row: The input row.
-        :return: The transformed row.
+        super().__init__(site_id, data_dir, staging, bulk, delta, snapshots, resume, binary, profile)
+        # The badges are loaded with the identifier of the first row for each badge name, so they can be resolved
+        # from the rows already seen, without waiting for the badges table to be loaded.
+        self.badges = {}
+
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the user_badges table. The rows contain the
+        user identifiers of the dump, which are resolved by the database, as the badges are scanned together with the
+        badges table, which does not wait for the site users to be loaded.
+
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        if int(row['UserId']) in self.users:
-            return row['UserId'], self.badges[row['Name']], row['Date']
+        badges = self.badges
 
-        return None
+        return (
+            chunk.column('UserId'),
+            [badges.setdefault(name, badge_id) for name, badge_id in zip(chunk.column('Name'), chunk.column('Id'))],
+            chunk.column('Date')
+        )
 
 
 class PostLoader(BaseFileLoader):
@@ -184,34 +1262,52 @@ class PostLoader(BaseFileLoader):
         'last_editor_display_name', 'creation_date', 'last_edit_date', 'last_activity_date', 'community_owned_date',
         'closed_date', 'score', 'view_count', 'answer_count', 'comment_count', 'favorite_count', 'content_license'
     )
+    COLUMN_TYPES = (
+        'bigint', 'bigint', 'bigint', 'bigint', 'bigint', 'smallint', 'varchar', 'text', 'varchar', 'timestamptz',
+        'timestamptz', 'timestamptz', 'timestamptz', 'timestamptz', 'integer', 'integer', 'integer', 'integer',
+        'integer', 'varchar'
+    )
+    DEPENDENCIES = ('site_users', )
+    REFERENCES = (
+        Reference('accepted_answer_id', 'posts'),
+        Reference('owner_id', 'site_users', key='unique_id', key_type='integer'),
+        Reference('last_editor_id', 'site_users', key='unique_id', key_type='integer')
+    )
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post loader.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the posts table. Accepted answers that do not
+        exist are set to null when the table is finalized.
 
-        :param site_id: The site identifier.
-        :param data_dir: The data directory
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        super().__init__(site_id, data_dir)
-        self.users = {str(user['unique_id']): user['pk'] for user in models.SiteUser.objects.values('pk', 'unique_id')}
-        self.posts = {row['Id'] for row in xmlparser.XmlFileIterator(self.data_dir / 'Posts.xml')}
+        return (
+            chunk.column('Id'), chunk.column('ParentId', '<NULL>'), chunk.column('AcceptedAnswerId', '<NULL>'),
+            self.resolve_users(chunk.column('OwnerUserId', None)),
+            self.resolve_users(chunk.column('LastEditorUserId', None)), chunk.column('PostTypeId'),
+            chunk.column('Title', '<NULL>'), chunk.column('Body'), chunk.column('LastEditorDisplayName', '<NULL>'),
+            chunk.column('CreationDate'), chunk.column('LastEditDate', '<NULL>'), chunk.column('LastActivityDate'),
+            chunk.column('CommunityOwnedDate', '<NULL>'), chunk.column('ClosedDate', '<NULL>'), chunk.column('Score'),
+            chunk.column('ViewCount', 0), chunk.column('AnswerCount', 0), chunk.column('CommentCount', 0),
+            chunk.column('FavoriteCount', 0),
+            chunk.column('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value)
+        )
 
-    def transform(self, row: dict) -> tuple | list[tuple] | None:
-        """Transform the input row so that it can be loaded to the posts table.
+    def finalize(self, cursor) -> None:
+        """Set the accepted answers that do not exist in the dump to null. When loading through a staging table, they
+        are already set to null when the rows are merged. When bulk loading, the title search trigger is dropped, so the
+        title search vectors are also set.
 
-        :param row: The input row.
-        :return: The transformed row.
+        :param cursor: The database cursor.
         """
-        return (
-            row['Id'], row.get('ParentId', '<NULL>'),
-            row['AcceptedAnswerId'] if row.get('AcceptedAnswerId') in self.posts else '<NULL>',
-            self.users[row['OwnerUserId']] if row.get('OwnerUserId') in self.users else '<NULL>',
-            self.users[row['LastEditorUserId']] if row.get('LastEditorUserId') in self.users else '<NULL>',
-            row['PostTypeId'], row.get('Title', '<NULL>'), row['Body'],
-            row.get('LastEditorDisplayName', '<NULL>'), row['CreationDate'], row.get('LastEditDate', '<NULL>'),
-            row['LastActivityDate'], row.get('CommunityOwnedDate', '<NULL>'), row.get('ClosedDate', '<NULL>'),
-            row['Score'], row.get('ViewCount', 0), row.get('AnswerCount', 0), row.get('CommentCount', 0),
-            row.get('FavoriteCount', 0), row.get('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value)
-        )
+        if not self.staging:
+            cursor.execute(
+                "UPDATE posts SET accepted_answer_id = NULL WHERE accepted_answer_id IS NOT NULL AND NOT EXISTS ("
+                "SELECT 1 FROM posts AS answers WHERE answers.id = posts.accepted_answer_id)"
+            )
+        if self.bulk:
+            cursor.execute(
+                "UPDATE posts SET title_search = to_tsvector('pg_catalog.english', title) WHERE title IS NOT NULL")
 
 
 class TagLoader(BaseFileLoader):
@@ -220,16 +1316,33 @@ class TagLoader(BaseFileLoader):
     INPUT_FILENAME = 'Tags.xml'
     TABLE_NAME = 'tags'
     TABLE_COLUMNS = 'id', 'name', 'award_count', 'excerpt_id', 'wiki_id', 'required', 'moderator_only'
-    # The base URL of the official StackExchange API
-    STACKEXCHANGE_API_BASE_URL = 'https://api.stackexchange.com/2.3'
+    COLUMN_TYPES = 'bigint', 'varchar', 'integer', 'bigint', 'bigint', 'boolean', 'boolean'
+    DEPENDENCIES = ('posts', )
 
-    def perform(self) -> None:
+    def load(self, rows: Iterable[tuple] | None = None) -> None:
         """Load the tags.
+
+        :param rows: The transformed rows, which are streamed directly to the database. If not set, the rows are read
+            from the data file.
         """
-        super().perform()
+        super().load(rows)
 
+        # The tags of a delta are not merged yet, so the flags are updated when they are
+        if not self.delta:
+            self.update_tag_flags()
+
+    def merge_delta(self, cursor, deleted_tables: set[str]) -> int:
+        """Merge the delta in the staging table to the tags table, and update the tag flags.
+
+        :param cursor: The database cursor.
+        :param deleted_tables: The tables whose rows were deleted by the deltas merged before.
+        :return: The number of deleted rows.
+        """
+        deleted = super().merge_delta(cursor, deleted_tables)
         self.update_tag_flags()
 
+        return deleted
+
     def transform(self, row: dict) -> tuple | list[tuple] | None:
         """Transform the input row so that it can be loaded to the tags table.
 
@@ -242,41 +1355,23 @@ class TagLoader(BaseFileLoader):
         )
 
     def update_tag_flags(self) -> None:
-        """Update the flags (required and moderator only) from the stack exchange API.
+        """Update the flags (required and moderator only) from the tag flag source, with a query that clears each flag
+        from the tags that no longer have it, as the rows of a delta whose tags did not change are not written again,
+        and a query that sets it for the tags of the source.
         """
         logger.info("Updating tag flags")
+        source = tagflags.tag_flag_source()
+        site_name = models.Site.objects.values_list('name', flat=True).get(pk=self.site_id)
         for tag_flag in enums.TagFlag:
-            tag_names = self.get_tag_names(tag_flag)
-            for tag_name in tag_names:
-                tag = models.Tag.objects.filter(name=tag_name).first()
-                if tag is not None:
-                    setattr(tag, tag_flag.attribute_name, True)
-                    tag.save()
-
-    def get_tag_names(self, tag_flag: enums.TagFlag) -> Iterable[str]:
-        """Returns the names of the tags that have the given flag.
-
-        :param tag_flag: The tag flag.
-        :return: An iterable of tag names that have the given flag set.
-        """
-        page = 1
-        tags = []
-
-        site = models.Site.objects.get(pk=self.site_id)
-        while True:
-            response = requests.get(
-                f"{self.STACKEXCHANGE_API_BASE_URL}/tags/{tag_flag.api_path}",
-                params={'page': page, 'pagesize': 100, 'site': site.name}, timeout=60
+            tag_names = source.get_tag_names(site_name, tag_flag)
+            cleared = models.Tag.objects.filter(**{tag_flag.attribute_name: True}).exclude(
+                name__in=tag_names).update(**{tag_flag.attribute_name: False})
+            tags = models.Tag.objects.filter(name__in=tag_names).exclude(**{tag_flag.attribute_name: True})
+            updated = tags.update(**{tag_flag.attribute_name: True})
+            logger.info(
+                "Tag flag %s set for %d of %d tags, and cleared for %d tags", tag_flag.api_path, updated,
+                len(tag_names), cleared
             )
-            response.raise_for_status()
-            response_data = response.json()
-            tags += [item['name'] for item in response_data['items']]
-            if not response_data['has_more']:
-                break
-            page += 1
-            time.sleep(1)
-
-        return tags
 
 
 class PostTagLoader(BaseFileLoader):
@@ -285,28 +1380,28 @@ class PostTagLoader(BaseFileLoader):
     INPUT_FILENAME = 'Posts.xml'
     TABLE_NAME = 'post_tags'
     TABLE_COLUMNS = 'post_id', 'tag_id'
-
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post loader.
-
-        :param site_id: The site identifier.
-        :param data_dir: The data directory
+    COLUMN_TYPES = 'bigint', 'bigint'
+    DEPENDENCIES = ('posts', 'tags')
+    REFERENCES = (Reference('tag_id', 'tags', key='name', required=True, key_type='varchar'), )
+    STAGING = True
+    KEY_COLUMNS = TABLE_COLUMNS
+
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the post tags table, with a row for each tag
+        of each post. The rows contain the tag names, which are resolved by the database, as the tags are not loaded
+        yet when the posts are scanned.
+
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        super().__init__(site_id, data_dir)
-        self.tags = {t['name']: t['pk'] for t in models.Tag.objects.values('pk', 'name')}
+        post_ids, tag_names = [], []
+        for post_id, tags in zip(chunk.column('Id'), chunk.column('Tags', '')):
+            for tag_name in tags.split('|'):
+                if tag_name:
+                    post_ids.append(post_id)
+                    tag_names.append(tag_name)
 
-    def transform(self, row: dict) -> tuple | list[tuple] | None:
-        """Transform the input row so that it can be loaded to the post tags table.
-
-        :param row: The input row.
-        :return: The transformed row.
-        """
-        post_tags = []
-        for tag_name in row.get('Tags', '').split('|'):
-            if tag_name and tag_name in self.tags:
-                post_tags.append((row['Id'], self.tags[tag_name]))
-
-        return post_tags
+        return post_ids, tag_names
 
 
 class PostVoteLoader(BaseFileLoader):
@@ -315,31 +1410,176 @@ class PostVoteLoader(BaseFileLoader):
     INPUT_FILENAME = 'Votes.xml'
     TABLE_NAME = 'post_votes'
     TABLE_COLUMNS = 'id', 'post_id', 'type', 'creation_date', 'user_id', 'bounty_amount'
+    COLUMN_TYPES = 'bigint', 'bigint', 'smallint', 'timestamptz', 'bigint', 'smallint'
+    DEPENDENCIES = ('site_users', 'posts')
+    REFERENCES = (
+        Reference('post_id', 'posts', required=True),
+        Reference('user_id', 'site_users', key='unique_id', key_type='integer')
+    )
+    SHARDABLE = True
+
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the post votes table.
+
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
+        """
+        ids, post_ids, types, creation_dates, user_ids, bounty_amounts = self.select((
+            chunk.column('Id'), chunk.column('PostId'), chunk.column('VoteTypeId'), chunk.column('CreationDate'),
+            chunk.column('UserId', None), chunk.column('BountyAmount', '<NULL>')
+        ), self.has_posts(chunk.column('PostId')))
+
+        return ids, post_ids, types, creation_dates, self.resolve_users(user_ids), bounty_amounts
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post vote loader.
+
+class PostVoteRollupLoader(BaseFileLoader):
+    """The post vote rollup loader, which aggregates the votes of each post by type and day, and sets the up and down
+    vote counts of the posts.
+
+    The votes are counted in memory until the loader holds a number of rollups, when they are flushed, so the rows
+    copied to the staging table are partial rollups of the votes that were counted together. As the input file is
+    ordered by vote identifier, which follows the creation date, the votes of a day are mostly counted together, and
+    the partial rollups are summed when they are merged to the table. This also lets the input file be split in shards.
+    """
+    INPUT_FILENAME = 'Votes.xml'
+    TABLE_NAME = 'post_vote_rollups'
+    TABLE_COLUMNS = 'post_id', 'type', 'day', 'count', 'bounty_sum'
+    COLUMN_TYPES = 'bigint', 'smallint', 'date', 'integer', 'integer'
+    DEPENDENCIES = ('posts', )
+    REFERENCES = (Reference('post_id', 'posts', required=True), )
+    SHARDABLE = True
+    STAGING = True
+    KEY_COLUMNS = ('post_id', 'type', 'day')
+    # The number of rollups counted in memory before they are flushed
+    MAX_ROLLUPS = 1000000
+
+    def __init__(
+            self, site_id: int, data_dir: pathlib.Path, staging: bool = False, bulk: bool = False, delta: bool = False,
+            snapshots: bool = False, resume: bool = False, binary: bool = False, profile: LoadProfile | None = None
+    ) -> None:
+        """Initialize the post vote rollup loader.
 
         :param site_id: The site identifier.
         :param data_dir: The data directory
+        :param staging: If True, the table is loaded through a staging table.
+        :param bulk: If True, the table is bulk loaded.
+        :param delta: If True, only the differences from the previous load are written to the table.
+        :param snapshots: If True, the transformed rows are saved to a snapshot, or copied from it.
+        :param resume: If True, the table is skipped if it was completed by the load that is resumed.
+        :param binary: If True, the streamed rows are copied in the binary format.
+        :param profile: The load profile.
         """
-        super().__init__(site_id, data_dir)
-        self.posts = set(models.Post.objects.values_list('pk', flat=True))
-        self.users = {user['unique_id']: user['pk'] for user in models.SiteUser.objects.values('pk', 'unique_id')}
+        super().__init__(site_id, data_dir, staging, bulk, delta, snapshots, resume, binary, profile)
+        # The vote counts and the bounty amount sums, by post, type and day
+        self.counts = collections.Counter()
+        self.bounty_sums = collections.Counter()
 
-    def transform(self, row: dict) -> Iterable[str] | None:
-        """Transform the input row so that it can be loaded to the post votes table.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Count the votes of a chunk of input rows. The rollups are only returned when they are flushed.
 
-        :param row: The input row.
-        :return: The transformed row.
+        :param chunk: The chunk of input rows.
+        :return: The columns of the flushed rollups.
         """
-        if int(row['PostId']) in self.posts:
-            return (
-                row['Id'], row['PostId'], row['VoteTypeId'], row['CreationDate'],
-                self.users[row['UserId']] if row.get('UserId') in self.users else '<NULL>',
-                row.get('BountyAmount', '<NULL>')
-            )
+        keys = list(zip(
+            chunk.column('PostId'), chunk.column('VoteTypeId'),
+            [creation_date[:10] for creation_date in chunk.column('CreationDate')]
+        ))
+        self.counts.update(keys)
+        for key, bounty_amount in zip(keys, chunk.column('BountyAmount', None)):
+            if bounty_amount is not None:
+                self.bounty_sums[key] += int(bounty_amount)
+        if len(self.counts) < self.MAX_ROLLUPS:
+            return [() for _ in self.TABLE_COLUMNS]
+
+        return self.flush()
+
+    def flush(self) -> Sequence[Sequence]:
+        """Return the rollups counted since they were last flushed.
+
+        :return: The columns of the rollups.
+        """
+        counts, bounty_sums = self.counts, self.bounty_sums
+        self.counts, self.bounty_sums = collections.Counter(), collections.Counter()
+        if not counts:
+            return [() for _ in self.TABLE_COLUMNS]
+        post_ids, types, days = zip(*counts)
 
-        return None
+        return post_ids, types, days, list(counts.values()), [bounty_sums[key] for key in counts]
+
+    @classmethod
+    def staging_rows(cls) -> str:
+        """Return the query that selects the rollups of the staging table, summing the partial rollups of each post,
+        type and day.
+
+        :return: The query.
+        """
+        return (
+            f"SELECT post_id, type, day, sum(count) AS count, sum(bounty_sum) AS bounty_sum "
+            f"FROM ({super().staging_rows()}) AS partial_rollups GROUP BY post_id, type, day"
+        )
+
+    def _merge_delta(self, cursor, deleted_tables: set[str]) -> tuple[int, int]:
+        """Merge the delta in the staging table to the rollups table, and update the vote counts of the posts. The rows
+        of the staging table are partial rollups, so they are summed before they are compared with the rollups of the
+        table, instead of comparing their fingerprints.
+
+        :param cursor: The database cursor.
+        :param deleted_tables: The tables whose rows were deleted by the deltas merged before.
+        :return: The number of deleted rows, and the number of inserted or updated rows.
+        """
+        table, staging_table = self.TABLE_NAME, self.staging_table_name()
+        logger.info("Merging delta of table %s", table)
+        cursor.execute(f"ANALYZE {staging_table}")
+        cursor.execute(
+            f"DELETE FROM {table} WHERE NOT EXISTS (SELECT 1 FROM {staging_table} "
+            f"WHERE {_match(staging_table, table, self.KEY_COLUMNS)})"
+        )
+        deleted = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(self.TABLE_COLUMNS)}) {self.staging_rows()} "
+            f"ON CONFLICT ({', '.join(self.KEY_COLUMNS)}) DO UPDATE SET count = EXCLUDED.count, "
+            f"bounty_sum = EXCLUDED.bounty_sum WHERE ({table}.count, {table}.bounty_sum) "
+            f"IS DISTINCT FROM (EXCLUDED.count, EXCLUDED.bounty_sum)"
+        )
+        changed = cursor.rowcount
+        cursor.execute(f"DROP TABLE {staging_table}")
+        self.finalize(cursor)
+        logger.info("Table %s: %d rows deleted, %d rows inserted or updated", table, deleted, changed)
+
+        return deleted, changed
+
+    def dropped_rows(self, copied: int, merged: int) -> int:
+        """Return the number of rows dropped when the staging table was merged. The partial rollups are summed when
+        they are merged, so the rows copied to the staging table are not comparable to the merged rows, and the votes of
+        posts that do not exist are not counted.
+
+        :param copied: The number of rows copied to the staging table.
+        :param merged: The number of rows merged to the table.
+        :return: The number of dropped rows.
+        """
+        return 0
+
+    def finalize(self, cursor) -> None:
+        """Set the up and down vote counts of the posts from their rollups.
+
+        :param cursor: The database cursor.
+        """
+        up, down = enums.PostVoteType.UP_MOD.value, enums.PostVoteType.DOWN_MOD.value
+        cursor.execute(
+            "UPDATE posts SET up_vote_count = totals.up_vote_count, down_vote_count = totals.down_vote_count FROM ("
+            f"SELECT post_id, coalesce(sum(count) FILTER (WHERE type = {up}), 0) AS up_vote_count, "
+            f"coalesce(sum(count) FILTER (WHERE type = {down}), 0) AS down_vote_count "
+            f"FROM {self.TABLE_NAME} WHERE type IN ({up}, {down}) GROUP BY post_id) AS totals "
+            "WHERE posts.id = totals.post_id AND (posts.up_vote_count, posts.down_vote_count) "
+            "IS DISTINCT FROM (totals.up_vote_count, totals.down_vote_count)"
+        )
+        # The posts whose votes were all removed since the previous load
+        cursor.execute(
+            "UPDATE posts SET up_vote_count = 0, down_vote_count = 0 "
+            "WHERE (up_vote_count > 0 OR down_vote_count > 0) AND NOT EXISTS ("
+            f"SELECT 1 FROM {self.TABLE_NAME} AS rollups WHERE rollups.post_id = posts.id "
+            f"AND rollups.type IN ({up}, {down}))"
+        )
 
 
 class PostCommentLoader(BaseFileLoader):
@@ -348,28 +1588,27 @@ class PostCommentLoader(BaseFileLoader):
     INPUT_FILENAME = 'Comments.xml'
     TABLE_NAME = 'post_comments'
     TABLE_COLUMNS = 'id', 'post_id', 'score', 'text', 'creation_date', 'content_license', 'user_id', 'user_display_name'
+    COLUMN_TYPES = 'bigint', 'bigint', 'integer', 'text', 'timestamptz', 'varchar', 'bigint', 'varchar'
+    DEPENDENCIES = ('site_users', 'posts')
+    REFERENCES = (
+        Reference('post_id', 'posts', required=True),
+        Reference('user_id', 'site_users', key='unique_id', key_type='integer')
+    )
+    SHARDABLE = True
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post comment loader.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the post comments table.
 
-        :param site_id: The site identifier.
-        :param data_dir: The data directory
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        super().__init__(site_id, data_dir)
-        self.users = {user['unique_id']: user['pk'] for user in models.SiteUser.objects.values('pk', 'unique_id')}
+        *columns, user_ids, user_display_names = self.select((
+            chunk.column('Id'), chunk.column('PostId'), chunk.column('Score'), chunk.column('Text'),
+            chunk.column('CreationDate'), chunk.column('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value),
+            chunk.column('UserId', None), chunk.column('UserDisplayName', '<NULL>')
+        ), self.has_posts(chunk.column('PostId')))
 
-    def transform(self, row: dict) -> Iterable[str] | None:
-        """Transform the input row so that it can be loaded to the post comments table.
-
-        :param row: The input row.
-        :return: The transformed row.
-        """
-        return (
-            row['Id'], row['PostId'], row['Score'], row['Text'], row['CreationDate'],
-            row.get('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value),
-            self.users[row['UserId']] if row.get('UserId') in self.users else '<NULL>',
-            row.get('UserDisplayName', '<NULL>')
-        )
+        return *columns, self.resolve_users(user_ids), user_display_names
 
 
 class PostHistoryLoader(BaseFileLoader):
@@ -381,32 +1620,30 @@ class PostHistoryLoader(BaseFileLoader):
         'id', 'type', 'post_id', 'revision_guid', 'creation_date', 'user_id', 'user_display_name', 'comment', 'text',
         'content_license'
     )
+    COLUMN_TYPES = (
+        'bigint', 'smallint', 'bigint', 'uuid', 'timestamptz', 'bigint', 'varchar', 'text', 'text', 'varchar'
+    )
+    DEPENDENCIES = ('site_users', 'posts')
+    REFERENCES = (
+        Reference('post_id', 'posts', required=True),
+        Reference('user_id', 'site_users', key='unique_id', key_type='integer')
+    )
+    SHARDABLE = True
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post history loader.
-
-        :param site_id: The site identifier.
-        :param data_dir: The data directory
-        """
-        super().__init__(site_id, data_dir)
-        self.posts = set(models.Post.objects.values_list('pk', flat=True))
-        self.users = {user['unique_id']: user['pk'] for user in models.SiteUser.objects.values('pk', 'unique_id')}
-
-    def transform(self, row: dict) -> Iterable[str] | None:
-        """Transform the input row so that it can be loaded to the tags table.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the post history table.
 
-        :param row: The input row.
-        :return: The transformed row.
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        if int(row['PostId']) in self.posts:
-            return (
-                row['Id'], row['PostHistoryTypeId'], row['PostId'], row['RevisionGUID'], row['CreationDate'],
-                self.users[row['UserId']] if row.get('UserId') in self.users else '<NULL>',
-                row.get('UserDisplayName', '<NULL>'), row.get('Comment', '<NULL>'),
-                row.get('Text', '<NULL>'), row.get('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value)
-            )
+        ids, types, post_ids, revision_guids, creation_dates, user_ids, *columns = self.select((
+            chunk.column('Id'), chunk.column('PostHistoryTypeId'), chunk.column('PostId'),
+            chunk.column('RevisionGUID'), chunk.column('CreationDate'), chunk.column('UserId', None),
+            chunk.column('UserDisplayName', '<NULL>'), chunk.column('Comment', '<NULL>'),
+            chunk.column('Text', '<NULL>'), chunk.column('ContentLicense', enums.ContentLicense.CC_BY_SA_4_0.value)
+        ), self.has_posts(chunk.column('PostId')))
 
-        return None
+        return ids, types, post_ids, revision_guids, creation_dates, self.resolve_users(user_ids), *columns
 
 
 class PostLinkLoader(BaseFileLoader):
@@ -415,26 +1652,221 @@ class PostLinkLoader(BaseFileLoader):
     INPUT_FILENAME = 'PostLinks.xml'
     TABLE_NAME = 'post_links'
     TABLE_COLUMNS = 'id', 'post_id', 'related_post_id', 'type'
+    COLUMN_TYPES = 'bigint', 'bigint', 'bigint', 'smallint'
+    DEPENDENCIES = ('posts', )
+    REFERENCES = (
+        Reference('post_id', 'posts', required=True), Reference('related_post_id', 'posts', required=True)
+    )
+    SHARDABLE = True
 
-    def __init__(self, site_id: int, data_dir: pathlib.Path) -> None:
-        """Initialize the post link loader.
+    def transform_batch(self, chunk: Chunk) -> Sequence[Sequence]:
+        """Transform a chunk of input rows so that they can be loaded to the post links table. Links are only loaded
+        if both posts exist.
 
-        :param site_id: The site identifier.
-        :param data_dir: The data directory
+        :param chunk: The chunk of input rows.
+        :return: The columns of the transformed rows.
         """
-        super().__init__(site_id, data_dir)
-        self.posts = set(models.Post.objects.values_list('pk', flat=True))
-
-    def transform(self, row: dict) -> Iterable[str] | None:
-        """Transform the input row so that it can be loaded to the post links table.
+        return self.select(
+            (chunk.column('Id'), chunk.column('PostId'), chunk.column('RelatedPostId'), chunk.column('LinkTypeId')),
+            self.has_posts(chunk.column('PostId'), chunk.column('RelatedPostId'))
+        )
 
-        :param row: The input row.
-        :return: The transformed row.
-        """
-        if int(row['PostId']) in self.posts and int(row['RelatedPostId']) in self.posts:
-            return row['Id'], row['PostId'], row['RelatedPostId'], row['LinkTypeId']
 
-        return None
+def load_table(
+        loader_class: type[BaseFileLoader], group: tuple[type[BaseFileLoader], ...], site_id: int,
+        dump: archive.DumpArchive, csv_files: bool, options: dict
+) -> None:
+    """Load a table. The first loader of a group of loaders that read from the same input file extracts the file from
+    the archive and scans it, loading its own table and extracting the data of the other loaders of the group, which
+    then load their tables from the extracted data. When using snapshots, tables that have a snapshot are copied from it
+    instead, and the loaders of the group whose data are not extracted scan the input file themselves.
+
+    :param loader_class: The loader class.
+    :param group: The loaders that read from the same input file, in loading order.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param csv_files: If True, the data of the loader are written to a data file before being loaded, instead of being
+        streamed to the database.
+    :param options: The options with which the loaders are created.
+    """
+    loader = loader_class(site_id=site_id, data_dir=dump.data_dir, **options)
+    if loader.prepare(dump):
+        return
+    if (loader.snapshot is not None and loader.snapshot.exists()) or (
+            loader_class is not group[0] and loader.data_filename().exists()):
+        loader.load()
+        return
+
+    with dump.member(loader_class.INPUT_FILENAME) as xml_file:
+        others = []
+        for other_class in group[group.index(loader_class) + 1:]:
+            other = other_class(site_id=site_id, data_dir=dump.data_dir, **options)
+            if not other.prepare(dump) and (other.snapshot is None or not other.snapshot.exists()):
+                others.append(other)
+        scanner = FileScanner(xmlparser.XmlFileIterator(xml_file), (loader, *others))
+        if csv_files:
+            scanner.scan()
+            loader.load()
+        else:
+            loader.load(scanner.stream(loader))
+    # The other loaders of the group load their data files in other tasks, which add the metrics of the scan
+    for other in others:
+        other.metrics_filename().write_text(json.dumps(other.metrics.to_dict()))
+
+
+def extract_table(
+        group: tuple[type[BaseFileLoader], ...], site_id: int, dump: archive.DumpArchive, options: dict
+) -> None:
+    """Extract the input file of a group of loaders whose tables are loaded in shards, unless all the tables are
+    skipped, or their rows are copied from their snapshots instead.
+
+    :param group: The loaders that read from the same input file, in loading order.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param options: The options with which the loaders are created.
+    """
+    for loader_class in group:
+        loader = loader_class(site_id=site_id, data_dir=dump.data_dir, **options)
+        if not loader.prepare(dump) and (loader.snapshot is None or not loader.snapshot.exists()):
+            dump.extract(loader_class.INPUT_FILENAME)
+            return
+
+
+def truncate_table(
+        loader_class: type[BaseFileLoader], site_id: int, dump: archive.DumpArchive, count: int, options: dict
+) -> None:
+    """Truncate the table of a loader, before its shards are loaded, and record the start of its load in the load
+    manifest. When bulk loading, the indexes, constraints and triggers of the table are dropped, and their definitions
+    are saved to the load manifest. When loading a delta, the table is not truncated, and only the staging table is
+    created. When using snapshots, the snapshot is copied to the staging table if it is saved. When resuming a load
+    whose completed shards can be reused, the table is left as it is.
+
+    :param loader_class: The loader class.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param count: The number of shards.
+    :param options: The options with which the loaders are created.
+    """
+    loader = loader_class(site_id=site_id, data_dir=dump.data_dir, **options)
+    if loader.prepare(dump):
+        return
+    if loader.resume:
+        completed_shards = loader.completed_shards(count)
+        if completed_shards is not None:
+            logger.info(
+                "Resuming table %s from %d of %d completed shards", loader.TABLE_NAME, len(completed_shards), count)
+            return
+    with transaction.atomic(), connection.cursor() as cursor:
+        table_objects = None
+        if loader.bulk:
+            with loader.metrics.phase("drop"):
+                table_objects = loader.drop_table_objects(cursor)
+        loader.start_load(table_objects)
+        if not loader.delta:
+            loader.truncate(cursor)
+        if loader.staging:
+            loader.create_staging_table(cursor, loader.delta)
+        if loader.snapshot is not None and loader.snapshot.exists():
+            with loader.metrics.phase("copy"):
+                loader.metrics.rows_copied += loader.snapshot.restore(cursor, loader.staging_table_name())
+        loader.save_metrics()
+
+
+def load_table_shard(
+        group: tuple[type[BaseFileLoader], ...], site_id: int, dump: archive.DumpArchive, index: int, count: int,
+        options: dict
+) -> None:
+    """Load a shard of the input file of a group of loaders to their tables. The shard is scanned once, the rows of the
+    first loader are streamed to the database, and the rows of the other loaders are written to the data files of the
+    shard, from which they are loaded after. The input file must already be extracted from the archive. Nothing is
+    loaded to a table that has a saved snapshot, which is copied when the table is truncated instead, or whose shard was
+    completed by the load that is resumed.
+
+    :param group: The loaders that read from the same input file, in loading order.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param index: The shard index, starting from zero.
+    :param count: The number of shards.
+    :param options: The options with which the loaders are created.
+    """
+    loaders = []
+    for loader_class in group:
+        loader = loader_class(site_id=site_id, data_dir=dump.data_dir, **options)
+        if loader.prepare(dump) or (loader.snapshot is not None and loader.snapshot.exists()):
+            continue
+        if loader.resume and models.LoadCheckpoint.objects.filter(
+                manifest__table_name=loader.TABLE_NAME, shard=index, shard_count=count).exists():
+            logger.info(
+                "Shard %d of %d for table %s was completed by the resumed load", index + 1, count, loader.TABLE_NAME)
+            continue
+        loaders.append(loader)
+    if not loaders:
+        return
+
+    logger.info(
+        "Loading shard %d of %d for tables %s", index + 1, count, ', '.join(loader.TABLE_NAME for loader in loaders))
+    shard = xmlparser.XmlFileIterator(dump.data_dir / group[0].INPUT_FILENAME).shard(index, count)
+    streamed, *others = loaders
+    streamed.load_shard(FileScanner(shard, loaders, shard=index).stream(streamed), index, count)
+    for other in others:
+        other.load_shard(None, index, count)
+
+
+def finish_table(loader_class: type[BaseFileLoader], site_id: int, dump: archive.DumpArchive, options: dict) -> None:
+    """Finish loading a table after all its shards are loaded, and remove its input file. The rows of the staging table
+    are saved to the snapshot of the table, when using snapshots and it is not saved yet, and are merged to the table,
+    the table is finalized, the dropped indexes, constraints and triggers are created again, and the load is recorded as
+    completed.
+
+    :param loader_class: The loader class.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param options: The options with which the loaders are created.
+    """
+    dump.remove(loader_class.INPUT_FILENAME)
+    loader = loader_class(site_id=site_id, data_dir=dump.data_dir, **options)
+    if loader.prepare(dump):
+        return
+    manifest = models.LoadManifest.objects.get(table_name=loader.TABLE_NAME)
+    loader.collect_metrics()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if loader.snapshot is not None and not loader.snapshot.exists():
+            with loader.metrics.phase("snapshot"):
+                loader.snapshot.save(cursor, loader.staging_table_name())
+        if loader.staging and not loader.delta:
+            with loader.metrics.phase("merge"):
+                loaded_rows = loader.merge_staging_table(cursor)
+            loader.metrics.rows_dropped += loader.dropped_rows(loader.metrics.rows_copied, loaded_rows)
+        else:
+            loaded_rows = sum(manifest.checkpoints.values_list('rows', flat=True))
+        if not loader.delta:
+            with loader.metrics.phase("finalize"):
+                loader.finalize(cursor)
+    if loader.bulk:
+        bulkload.TableObjects(**manifest.table_objects).restore(loader.metrics)
+    if not loader.delta:
+        loader.complete_load(loaded_rows)
+    else:
+        loader.save_metrics()
+
+
+def merge_deltas(
+        loader_classes: Iterable[type[BaseFileLoader]], site_id: int, dump: archive.DumpArchive, options: dict
+) -> None:
+    """Merge the deltas of all the tables, in a single transaction, once all of them are staged.
+
+    :param loader_classes: The loader classes, in loading order.
+    :param site_id: The site identifier.
+    :param dump: The dump archive.
+    :param options: The options with which the loaders are created.
+    """
+    loaders = [loader_class(site_id=site_id, data_dir=dump.data_dir, **options) for loader_class in loader_classes]
+    deleted_tables = set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for loader in loaders:
+            loader.prepare(dump)
+            if loader.merge_delta(cursor, deleted_tables):
+                deleted_tables.add(loader.TABLE_NAME)
 
 
 class SiteDataLoader:
@@ -442,42 +1874,295 @@ class SiteDataLoader:
     """
     LOADERS = (
         SiteUserLoader, BadgeLoader, UserBadgeLoader, PostLoader, TagLoader, PostTagLoader, PostVoteLoader,
-        PostCommentLoader, PostHistoryLoader, PostLinkLoader
+        PostVoteRollupLoader, PostCommentLoader, PostHistoryLoader, PostLinkLoader
     )
-
-    def __init__(self, site: str):
+    # The sites whose data dump is split in one archive per input file
+    SPLIT_SITES = ('stackoverflow.com', )
+
+    def __init__(
+            self, site: str, csv_files: bool = False, workers: int = 1, shards: int = 1, staging: bool = False,
+            bulk: bool = False, shadow_schema: bool = False, delta: bool = False, snapshots: bool = False,
+            resume: bool = False, binary: bool = False, profile: str = 'full', cluster: bool = False,
+            dump_dir: str | None = None
+    ):
         """Create the importer.
 
         :param site: The site name.
+        :param csv_files: If True, the data for each table are written to a CSV file in the temporary directory before
+            being loaded, which is useful for debugging. Otherwise, the rows are streamed directly to the database, and
+            only the data of tables that are loaded after their input file is scanned are written to disk.
+        :param workers: The number of worker processes that load tables concurrently.
+        :param shards: The number of shards in which the input files of the tables that support it are split, so that
+            they are parsed and loaded in parallel by the workers. The data of sharded tables are always streamed.
+        :param staging: If True, the rows are copied as they are to unlogged staging tables, and their references are
+            resolved by the database when they are inserted to the tables. Otherwise, they are resolved by the loaders.
+        :param bulk: If True, the indexes, constraints and triggers of each table are dropped before the table is
+            loaded, and are created again after, building the indexes concurrently.
+        :param shadow_schema: If True, the tables are loaded to a shadow schema, which replaces the live tables once
+            the load completes, so that the live tables keep serving requests while the data are loaded.
+        :param delta: If True, the tables are not truncated, and only the rows that changed since the previous load are
+            written to them. The deltas of all tables are merged in a single transaction once they are staged.
+        :param snapshots: If True, the rows of each table are saved to a snapshot, keyed by the ETag of the archive and
+            the loader version, and later loads of the same archive copy the snapshot instead of parsing the input file.
+            Tables that were last loaded from the same snapshot are skipped.
+        :param resume: If True, the tables that the load manifest records as completed from the same input files are
+            skipped, and only the shards that were not completed are loaded for the tables that are loaded in shards.
+        :param binary: If True, the rows are streamed to the database in the binary format of COPY, encoded with the
+            column types declared by the loaders, so that the database does not parse the values from text.
+        :param profile: The name of the load profile, which selects the tables that are loaded, and the rows and the
+            columns of the tables that are not.
+        :param cluster: If True, the tables that are most often read by a key other than their primary key are
+            rewritten in the order of that key once they are loaded and analyzed, and are vacuumed.
+        :param dump_dir: The directory of the files of a dump, such as a generated one, which are loaded instead of the
+            archives of the site, so that nothing is downloaded.
+        :raises ValueError: If a delta is loaded in bulk or to a shadow schema, which both start from empty tables, if
+            a delta or a load to a shadow schema is resumed, as their tables are only completed once all of them are, if
+            the load profile does not exist, if a delta is loaded with a profile other than the full one, as the rows of
+            the tables it does not load would keep referencing the deleted rows, or if a file of the dump directory does
+            not exist.
         """
+        if delta and (bulk or shadow_schema):
+            raise ValueError("Deltas cannot be bulk loaded or loaded to a shadow schema")
+        if resume and (delta or shadow_schema):
+            raise ValueError("Deltas and loads to a shadow schema cannot be resumed")
+        if profile not in LOAD_PROFILES:
+            raise ValueError(f"Load profile {profile} does not exist")
+        if delta and profile != 'full':
+            raise ValueError("Deltas can only be loaded with the full load profile")
         site = models.Site.objects.get(name=site)
         self.site_id = site.pk
-        downloader = dowloader.Downloader(filename=f"{site.url.replace('https://', '')}.7z")
-        self.site_data_file = downloader.get_file()
+        self.site_name = site.name
+        self.csv_files = csv_files
+        self.workers = workers
+        self.shards = shards
+        self.shadow_schema = shadow_schema
+        self.cluster = cluster
+        # The options with which the loaders are created
+        self.options = {
+            'staging': staging, 'bulk': bulk, 'delta': delta, 'snapshots': snapshots, 'resume': resume,
+            'binary': binary, 'profile': LOAD_PROFILES[profile]
+        }
+        # The loaders of the tables that are loaded by the profile
+        self.loaders = tuple(
+            loader_class for loader_class in self.LOADERS if LOAD_PROFILES[profile].includes(loader_class.TABLE_NAME))
+        self.dump_dir = pathlib.Path(dump_dir).resolve() if dump_dir else None
+        if self.dump_dir is not None:
+            for loader_class in self.loaders:
+                if not (self.dump_dir / loader_class.INPUT_FILENAME).exists():
+                    raise ValueError(f"File {loader_class.INPUT_FILENAME} does not exist in {self.dump_dir}")
+        domain = site.url.replace('https://', '')
+        self.archive_files = {
+            loader_class.INPUT_FILENAME: dowloader.Downloader(
+                filename=self.archive_name(domain, loader_class.INPUT_FILENAME)).file
+            for loader_class in self.loaders
+        } if self.dump_dir is None else {}
+
+    @classmethod
+    def archive_name(cls, domain: str, input_filename: str) -> str:
+        """Get the name of the archive that contains an input file.
+
+        :param domain: The site domain.
+        :param input_filename: The input file name.
+        :return: The archive name.
+        """
+        if domain in cls.SPLIT_SITES:
+            return f"{domain}-{pathlib.Path(input_filename).stem}.7z"
+
+        return f"{domain}.7z"
 
     def load(self):
-        """Load the site data.
+        """Load the site data, and write the load report, with the time taken by each task and the metrics of each
+        table.
         """
-        # Extract the data from the archive
-        with tempfile.TemporaryDirectory(dir=settings.TEMP_DIR) as temp_dir:
-            logger.info("Extracting data file %s", self.site_data_file)
-            with py7zr.SevenZipFile(self.site_data_file, mode='r') as dump_file:
-                dump_file.extractall(path=temp_dir)
-            logger.info("Data file extracted")
-
-            for loader_class in self.LOADERS:
-                loader = loader_class(site_id=self.site_id, data_dir=pathlib.Path(temp_dir))
-                loader.perform()
+        started_at = timezone.now()
+        schema = shadow.ShadowSchema(self.table_names())
+        with schema.loading() if self.shadow_schema else contextlib.nullcontext():
+            # The archives are downloaded, and the files are extracted from them to the temporary directory, when
+            # needed
+            with tempfile.TemporaryDirectory(dir=settings.TEMP_DIR) as temp_dir:
+                self.link_dump_files(pathlib.Path(temp_dir))
+                timings = self.load_tables(dump=archive.DumpArchive(self.archive_files, pathlib.Path(temp_dir)))
+            start = time.perf_counter()
+            self.analyze(started_at)
+            timings['analyze'] = time.perf_counter() - start
+            if self.cluster:
+                start = time.perf_counter()
+                self.reorganize(started_at)
+                timings['cluster'] = time.perf_counter() - start
+        if self.shadow_schema:
+            schema.swap()
 
         # Post load actions
-        self.analyze()
         siteinfo.set_site_info()
+        metrics.write_report(self.report(started_at, timings), f"load-{self.site_name}-{started_at:%Y%m%dT%H%M%S}")
 
-    @staticmethod
-    def analyze():
-        """Analyze the tables.
+    def report(self, started_at: datetime.datetime, timings: dict[str, float]) -> dict:
+        """Return the report of the load, with the metrics of each table recorded in the load manifest. The tables that
+        were not completed by the load, as they were skipped by a resumed load or already loaded from their snapshot,
+        are marked as skipped.
+
+        :param started_at: The time at which the load started.
+        :param timings: The wall time, in seconds, of each task of the load.
+        :return: The load report.
         """
-        logger.info("Analyzing the database")
-        with connection.cursor() as cursor:
-            cursor.execute("ANALYZE")
-        logger.info("Analyze completed")
+        manifests = self.completed_manifests(started_at)
+        tables = {}
+        for loader_class in self.loaders:
+            manifest = manifests.get(loader_class.TABLE_NAME)
+            if manifest is None:
+                tables[loader_class.TABLE_NAME] = {'skipped': True}
+            else:
+                tables[loader_class.TABLE_NAME] = {
+                    'skipped': False, **metrics.TableMetrics.from_dict(manifest.metrics).report()
+                }
+
+        return {
+            'site': self.site_name, 'started_at': started_at.isoformat(), 'completed_at': timezone.now().isoformat(),
+            'workers': self.workers, 'shards': self.shards, 'profile': self.options['profile'].name,
+            'options': {
+                'csv': self.csv_files, 'shadow': self.shadow_schema, 'cluster': self.cluster,
+                'dump_dir': str(self.dump_dir) if self.dump_dir is not None else None,
+                **{option: value for option, value in self.options.items() if option != 'profile'}
+            },
+            'tasks': timings, 'tables': tables
+        }
+
+    def completed_manifests(self, started_at: datetime.datetime) -> dict[str, models.LoadManifest]:
+        """Return the load manifests of the tables that were completed by the load.
+
+        :param started_at: The time at which the load started.
+        :return: The load manifests, by table name.
+        """
+        return {
+            manifest.table_name: manifest
+            for manifest in models.LoadManifest.objects.filter(
+                table_name__in=[loader_class.TABLE_NAME for loader_class in self.loaders], completed_at__gte=started_at)
+        }
+
+    def link_dump_files(self, data_dir: pathlib.Path) -> None:
+        """Link the files of the dump directory, if it is set, to the data directory of a load, so that the loaders use
+        them as they are, and do not remove them. The files that the loaders write to the data directory, such as the
+        identifier indexes, are not written to the dump directory, so they are not reused by the next load.
+
+        :param data_dir: The data directory.
+        """
+        if self.dump_dir is None:
+            return
+        for loader_class in self.loaders:
+            path = data_dir / loader_class.INPUT_FILENAME
+            if not path.exists(follow_symlinks=False):
+                path.symlink_to(self.dump_dir / loader_class.INPUT_FILENAME)
+
+    @classmethod
+    def table_names(cls) -> list[str]:
+        """Return the names of the tables that are loaded.
+
+        :return: The table names, in loading order.
+        """
+        return [loader_class.TABLE_NAME for loader_class in cls.LOADERS]
+
+    def load_tables(self, dump: archive.DumpArchive) -> dict[str, float]:
+        """Load the tables. The archives of the dump are downloaded first, and a table is loaded as soon as the archive
+        that contains its input file is downloaded and the tables it depends on are loaded, concurrently with other
+        tables and downloads if more than one worker is used.
+
+        :param dump: The dump archive.
+        :return: The wall time, in seconds, for downloading each archive and loading each table.
+        """
+        return self.plan(dump).run()
+
+    def plan(self, dump: archive.DumpArchive) -> scheduler.Scheduler:
+        """Plan the tasks that download the archives of the dump and load the tables. The tasks only depend on the
+        loaders and the dump archive, so the same plan can be built again by another process, in order to run some of
+        its tasks.
+
+        :param dump: The dump archive.
+        :return: The scheduler of the tasks, with the number of workers of the loader.
+        """
+        table_scheduler = scheduler.Scheduler(workers=self.workers)
+        for archive_file in dump.archives():
+            table_scheduler.add(archive_file.name, dump.download, archive_file)
+        for loader_class in self.loaders:
+            group = self.group(loader_class)
+            sharded = self.shards > 1 and all(other.SHARDABLE for other in group)
+            if sharded and group[0] is not loader_class:
+                # The tasks of all the loaders of a sharded group are added with the first loader
+                continue
+            archive_dependencies = set()
+            if loader_class.INPUT_FILENAME in dump.archive_files:
+                archive_dependencies.add(dump.archive_files[loader_class.INPUT_FILENAME].name)
+            dependencies = set(loader_class.DEPENDENCIES) | archive_dependencies
+            # The loaders that read from the same file as a previous loader, load the data extracted by it
+            if group[0] is not loader_class:
+                dependencies.add(group[0].TABLE_NAME)
+            dependencies = tuple(sorted(dependencies))
+
+            if sharded:
+                # The input file is extracted before the shards are loaded, and each table is loaded when all the
+                # shards are loaded and the table is finished. The shards of a group are scanned once for all its
+                # tables, once all of them are truncated.
+                table_name = loader_class.TABLE_NAME
+                table_scheduler.add(
+                    f"{table_name}.extract", extract_table, group, self.site_id, dump, self.options,
+                    dependencies=dependencies
+                )
+                for other in group:
+                    table_scheduler.add(
+                        f"{other.TABLE_NAME}.truncate", truncate_table, other, self.site_id, dump, self.shards,
+                        self.options, dependencies=tuple(sorted(set(other.DEPENDENCIES) | archive_dependencies))
+                    )
+                for index in range(self.shards):
+                    table_scheduler.add(
+                        f"{table_name}.{index}", load_table_shard, group, self.site_id, dump, index, self.shards,
+                        self.options, dependencies=(
+                            f"{table_name}.extract", *(f"{other.TABLE_NAME}.truncate" for other in group)
+                        )
+                    )
+                for other in group:
+                    table_scheduler.add(
+                        other.TABLE_NAME, finish_table, other, self.site_id, dump, self.options,
+                        dependencies=tuple(f"{table_name}.{index}" for index in range(self.shards))
+                    )
+            else:
+                table_scheduler.add(
+                    loader_class.TABLE_NAME, load_table, loader_class, group, self.site_id, dump, self.csv_files,
+                    self.options, dependencies=dependencies
+                )
+        if self.options['delta']:
+            table_scheduler.add(
+                'deltas', merge_deltas, self.loaders, self.site_id, dump, self.options,
+                dependencies=tuple(loader_class.TABLE_NAME for loader_class in self.loaders)
+            )
+
+        return table_scheduler
+
+    def group(self, loader_class: type[BaseFileLoader]) -> tuple[type[BaseFileLoader], ...]:
+        """Return the loaders that read from the same input file as a loader.
+
+        :param loader_class: The loader class.
+        :return: The loader classes, in loading order.
+        """
+        return tuple(other for other in self.loaders if other.INPUT_FILENAME == loader_class.INPUT_FILENAME)
+
+    def analyze(self, started_at: datetime.datetime) -> None:
+        """Collect the statistics of the tables that were completed by the load, as the tables that were skipped keep
+        their statistics. All the tables of a shadow schema are new, so they are all analyzed.
+
+        :param started_at: The time at which the load started.
+        """
+        if self.shadow_schema:
+            tables = self.table_names()
+        else:
+            completed = self.completed_manifests(started_at)
+            tables = [loader_class.TABLE_NAME for loader_class in self.loaders if loader_class.TABLE_NAME in completed]
+        tablestats.analyze(tables)
+
+    def reorganize(self, started_at: datetime.datetime) -> None:
+        """Cluster the tables that were completed by the load on the key they are most often read by, and vacuum them.
+
+        :param started_at: The time at which the load started.
+        """
+        completed = self.completed_manifests(started_at)
+        for loader_class in self.loaders:
+            if loader_class.TABLE_NAME in completed and loader_class.TABLE_NAME in clustering.CLUSTER_KEYS:
+                clustering.cluster(loader_class.TABLE_NAME)
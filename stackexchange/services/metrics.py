@@ -0,0 +1,220 @@
+"""Metrics of the table loads, and the reports in which they are written.
+"""
+from collections.abc import Generator
+import contextlib
+import dataclasses
+import json
+import logging
+import pathlib
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Self
+
+from django.conf import settings
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The file whose writes reset the peak resident set size of the process, on Linux
+CLEAR_REFS = pathlib.Path('/proc/self/clear_refs')
+
+
+def reports_dir() -> pathlib.Path:
+    """Return the directory in which the load reports are written.
+
+    :return: The var/reports directory.
+    """
+    return pathlib.Path(settings.BASE_DIR) / 'var' / 'reports'
+
+
+def _reset_peak_rss() -> None:
+    """Reset the peak resident set size of the process to its current size, where the operating system supports it, so
+    that the peak of each phase can be measured.
+    """
+    with contextlib.suppress(OSError):
+        CLEAR_REFS.write_text('5', encoding='utf-8')
+
+
+def _peak_rss() -> int:
+    """Return the peak resident set size of the process.
+
+    :return: The peak resident set size, in bytes.
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # The size is in kilobytes, except on macOS
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+@dataclasses.dataclass
+class PhaseMetrics:
+    """The metrics of a phase of the load of a table. The times of a phase that runs more than once, such as the copy of
+    each shard, are added, and the peak memory is the highest of its runs.
+    """
+    # The time taken by the phase, in seconds
+    seconds: float = 0.0
+    # The peak resident set size of the process that ran the phase, in bytes
+    peak_rss: int = 0
+    # The peak size of the memory blocks traced by tracemalloc, in bytes, or None if memory was not traced
+    peak_traced: int | None = None
+
+
+@dataclasses.dataclass
+class TableMetrics:
+    """The metrics of the load of a table. The rows are parsed and transformed while they are copied, so the parse and
+    transform times are part of the copy phase, and are measured apart in order to tell where its time goes. The input
+    file of the tables that are loaded from the same file is parsed once, and its parse time and bytes are counted for
+    the first of them.
+
+    Memory blocks are only traced when tracemalloc is started, for example with the PYTHONTRACEMALLOC environment
+    variable, as tracing slows the load down.
+    """
+    # The table name
+    table: str
+    # The number of rows read from the input file
+    rows_read: int = 0
+    # The number of rows copied to the table, or to its staging table
+    rows_copied: int = 0
+    # The number of rows written to the table, or the number of inserted or updated rows for a delta
+    rows_written: int = 0
+    # The number of rows that were not loaded, as they reference rows that do not exist. The rows dropped when the
+    # staging table of a delta is merged are not counted.
+    rows_dropped: int = 0
+    # The number of bytes of the input file that were parsed
+    bytes_read: int = 0
+    # The time taken to parse the input file, in seconds
+    parse_seconds: float = 0.0
+    # The time taken to transform the parsed rows, in seconds
+    transform_seconds: float = 0.0
+    # The column by which the table was clustered after it was loaded, or None if it was not clustered
+    cluster_key: str | None = None
+    # The correlation of the physical order of the rows with the order of the cluster key, before the table was
+    # clustered
+    correlation_before: float | None = None
+    # The correlation of the physical order of the rows with the order of the cluster key, after the table was clustered
+    correlation_after: float | None = None
+    # The metrics of each phase, by phase name, in the order in which the phases first ran
+    phases: dict[str, PhaseMetrics] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        """Create the metrics from their dictionary, as stored in the load manifest.
+
+        :param data: The metrics dictionary.
+        :return: The metrics.
+        """
+        phases = {
+            phase['name']: PhaseMetrics(phase['seconds'], phase['peak_rss'], phase['peak_traced'])
+            for phase in data['phases']
+        }
+
+        return cls(**{**data, 'phases': phases})
+
+    def to_dict(self) -> dict:
+        """Convert the metrics to a dictionary that can be serialized to JSON. The phases are converted to a list, as
+        the keys of the JSON objects stored in the database are not kept in order.
+
+        :return: The metrics dictionary.
+        """
+        return {
+            **dataclasses.asdict(self),
+            'phases': [{'name': name, **dataclasses.asdict(phase)} for name, phase in self.phases.items()]
+        }
+
+    @property
+    def seconds(self) -> float:
+        """The total time taken by the phases, in seconds.
+        """
+        return sum(phase.seconds for phase in self.phases.values())
+
+    @property
+    def rows_per_second(self) -> float | None:
+        """The number of rows written per second of the phases, or None if no phase took any time.
+        """
+        seconds = self.seconds
+
+        return self.rows_written / seconds if seconds else None
+
+    def add(self, other: 'TableMetrics') -> None:
+        """Add the metrics of another part of the load of the table, such as a shard loaded by another process.
+
+        :param other: The other metrics.
+        """
+        self.rows_read += other.rows_read
+        self.rows_copied += other.rows_copied
+        self.rows_written += other.rows_written
+        self.rows_dropped += other.rows_dropped
+        self.bytes_read += other.bytes_read
+        self.parse_seconds += other.parse_seconds
+        self.transform_seconds += other.transform_seconds
+        for name, other_phase in other.phases.items():
+            phase = self.phases.setdefault(name, PhaseMetrics())
+            phase.seconds += other_phase.seconds
+            phase.peak_rss = max(phase.peak_rss, other_phase.peak_rss)
+            if other_phase.peak_traced is not None:
+                phase.peak_traced = max(phase.peak_traced or 0, other_phase.peak_traced)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        """Measure a phase of the load of the table, and log the time it took. Phases must not be nested, as the
+        peak memory is reset when each phase starts.
+
+        :param name: The phase name.
+        """
+        _reset_peak_rss()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+        phase = self.phases.setdefault(name, PhaseMetrics())
+        phase.seconds += elapsed
+        phase.peak_rss = max(phase.peak_rss, _peak_rss())
+        if tracing:
+            phase.peak_traced = max(phase.peak_traced or 0, tracemalloc.get_traced_memory()[1])
+        logger.info("Table %s: %s completed in %.1f seconds", self.table, name, elapsed)
+
+    def report(self) -> dict:
+        """Return the metrics as they are written to the load report, along with the total time and the throughput.
+
+        :return: The report of the table.
+        """
+        return {**self.to_dict(), 'seconds': self.seconds, 'rows_per_second': self.rows_per_second}
+
+
+def write_report(report: dict, name: str, directory: pathlib.Path | None = None) -> pathlib.Path:
+    """Write a load report.
+
+    :param report: The report.
+    :param name: The report name, which must be unique for each load.
+    :param directory: The directory in which the report is written. Defaults to the var/reports directory.
+    :return: The report file.
+    """
+    directory = directory or reports_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+    logger.info("Load report written to %s", path)
+
+    return path
+
+
+def read_report(path: pathlib.Path | None = None, directory: pathlib.Path | None = None) -> dict:
+    """Read a load report.
+
+    :param path: The report file. If not set, the last written report is read.
+    :param directory: The directory in which the last report is looked for. Defaults to the var/reports directory.
+    :return: The report.
+    :raises FileNotFoundError: If the report does not exist, or no report was written.
+    """
+    if path is None:
+        reports = sorted((directory or reports_dir()).glob('*.json'), key=lambda report: report.stat().st_mtime)
+        if not reports:
+            raise FileNotFoundError("No load report was written")
+        path = reports[-1]
+
+    return json.loads(path.read_text(encoding='utf-8'))
@@ -0,0 +1,175 @@
+"""The load of the data of a site as a pipeline of steps, which run as background tasks on any worker.
+"""
+from collections.abc import Callable
+import contextlib
+import logging
+import pathlib
+import shutil
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from stackexchange import enums, models
+from . import archive, loader, metrics, scheduler, shadow, siteinfo
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+
+def create_run(site: str, options: dict) -> models.LoadRun:
+    """Create a load of the data of a site, with its steps, which are planned in stages. Each step runs once all the
+    steps of the previous stage have completed, so that the steps of a stage can run concurrently.
+
+    :param site: The site name.
+    :param options: The options of the site data loader, except the number of workers, as the steps are run by the
+        workers of the task queue.
+    :return: The load.
+    :raises ValueError: If the options of the loader are not valid.
+    :raises models.Site.DoesNotExist: If the site does not exist.
+    """
+    # The loader checks the options
+    loader.SiteDataLoader(site=site, **options)
+    with transaction.atomic():
+        run = models.LoadRun.objects.create(site=models.Site.objects.get(name=site), options=options)
+        step_stages = {}
+        for name, (_, _, dependencies) in plan(run).tasks.items():
+            step_stages[name] = max((step_stages[dependency] + 1 for dependency in dependencies), default=0)
+        models.LoadStep.objects.bulk_create(
+            models.LoadStep(run=run, name=name, stage=stage) for name, stage in step_stages.items())
+
+    return run
+
+
+def stages(run: models.LoadRun) -> list[list[str]]:
+    """Return the names of the steps of a load, by stage.
+
+    :param run: The load.
+    :return: The step names of each stage, in order.
+    """
+    step_stages = {}
+    for name, stage in run.steps.values_list('name', 'stage'):
+        step_stages.setdefault(stage, []).append(name)
+
+    return [step_stages[stage] for stage in sorted(step_stages)]
+
+
+def data_dir(run: models.LoadRun) -> pathlib.Path:
+    """Return the directory in which the files of a load are extracted. It must be shared by all the workers, as are
+    the downloaded archives.
+
+    :param run: The load.
+    :return: The data directory, in the temporary directory if it is set, or in the var/tmp directory.
+    """
+    temp_dir = pathlib.Path(settings.TEMP_DIR) if settings.TEMP_DIR else pathlib.Path(settings.BASE_DIR) / 'var' / 'tmp'
+
+    return temp_dir / f"load-{run.pk}"
+
+
+def plan(run: models.LoadRun) -> scheduler.Scheduler:
+    """Plan the steps of a load. The archives are downloaded and the tables are loaded with the tasks of the site data
+    loader, and the tables are then analyzed, and clustered if requested, the site information is computed and cached
+    again, and the load report is written. When loading to a shadow schema, it is created first, and swapped with the
+    live tables once the tables are analyzed.
+
+    :param run: The load.
+    :return: The scheduler of the steps, which can also be run one by one.
+    """
+    data_loader = loader.SiteDataLoader(site=run.site.name, **run.options)
+    dump = archive.DumpArchive(data_loader.archive_files, data_dir(run))
+    schema = shadow.ShadowSchema(data_loader.table_names()) if data_loader.shadow_schema else None
+    steps = scheduler.Scheduler()
+    steps.add('prepare', _prepare, data_loader, dump.data_dir, schema)
+    tables = data_loader.plan(dump)
+    for name, (function, args, dependencies) in tables.tasks.items():
+        steps.add(name, _in_schema, schema, function, *args, dependencies=('prepare', *dependencies))
+    steps.add('analyze', _in_schema, schema, data_loader.analyze, run.created_at, dependencies=tuple(tables.tasks))
+    last_step = 'analyze'
+    if data_loader.cluster:
+        steps.add('cluster', _in_schema, schema, data_loader.reorganize, run.created_at, dependencies=(last_step, ))
+        last_step = 'cluster'
+    if schema is not None:
+        steps.add('swap', schema.swap, dependencies=(last_step, ))
+        last_step = 'swap'
+    steps.add('site_info', siteinfo.set_site_info, dependencies=(last_step, ))
+    steps.add('report', _report, run.pk, data_loader, dump.data_dir, dependencies=('site_info', ))
+
+    return steps
+
+
+def run_step(run_id: int, name: str) -> None:
+    """Run a step of a load, and record its status. A step that already completed is not run again, in case its task is
+    delivered again. When the step fails, the load fails too.
+
+    :param run_id: The load identifier.
+    :param name: The step name.
+    """
+    run = models.LoadRun.objects.select_related('site').get(pk=run_id)
+    step = run.steps.get(name=name)
+    if step.status == enums.StepStatus.COMPLETED:
+        logger.info("Step %s of load %d is already completed", name, run_id)
+        return
+    step.status, step.started_at, step.completed_at, step.error = enums.StepStatus.STARTED, timezone.now(), None, None
+    step.save()
+    models.LoadRun.objects.filter(pk=run_id, status=enums.StepStatus.PENDING).update(
+        status=enums.StepStatus.STARTED)
+
+    logger.info("Starting step %s of load %d", name, run_id)
+    try:
+        function, args, _ = plan(run).tasks[name]
+        function(*args)
+    except Exception:
+        step.status, step.completed_at, step.error = enums.StepStatus.FAILED, timezone.now(), traceback.format_exc()
+        step.save()
+        models.LoadRun.objects.filter(pk=run_id).update(status=enums.StepStatus.FAILED, completed_at=timezone.now())
+        raise
+    step.status, step.completed_at = enums.StepStatus.COMPLETED, timezone.now()
+    step.save()
+    elapsed = (step.completed_at - step.started_at).total_seconds()
+    logger.info("Step %s of load %d completed in %.1f seconds", name, run_id, elapsed)
+
+
+def _prepare(data_loader: loader.SiteDataLoader, path: pathlib.Path, schema: shadow.ShadowSchema | None) -> None:
+    """Prepare a load, creating its data directory, with the files of the dump directory when it is set, and, when
+    loading to a shadow schema, the schema.
+
+    :param data_loader: The site data loader.
+    :param path: The data directory.
+    :param schema: The shadow schema, or None if the tables are loaded to the live schema.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    data_loader.link_dump_files(path)
+    if schema is not None:
+        schema.create()
+
+
+def _in_schema(schema: shadow.ShadowSchema | None, function: Callable | None, *args) -> None:
+    """Run the function of a step with the tables of the shadow schema, when loading to it.
+
+    :param schema: The shadow schema, or None if the tables are loaded to the live schema.
+    :param function: The function, or None if the step only waits for the steps it depends on.
+    :param args: The function arguments.
+    """
+    if function is None:
+        return
+    with shadow.search_path(shadow.SHADOW_SCHEMA) if schema is not None else contextlib.nullcontext():
+        function(*args)
+
+
+def _report(run_id: int, data_loader: loader.SiteDataLoader, path: pathlib.Path) -> None:
+    """Complete a load, writing its report with the time taken by each step, and removing its data directory.
+
+    :param run_id: The load identifier.
+    :param data_loader: The site data loader.
+    :param path: The data directory.
+    """
+    run = models.LoadRun.objects.get(pk=run_id)
+    timings = {
+        step.name: (step.completed_at - step.started_at).total_seconds()
+        for step in run.steps.filter(status=enums.StepStatus.COMPLETED)
+    }
+    metrics.write_report(
+        data_loader.report(run.created_at, timings), f"load-{data_loader.site_name}-{run.created_at:%Y%m%dT%H%M%S}")
+    shutil.rmtree(path, ignore_errors=True)
+    models.LoadRun.objects.filter(pk=run_id).update(status=enums.StepStatus.COMPLETED, completed_at=timezone.now())
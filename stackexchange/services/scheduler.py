@@ -0,0 +1,127 @@
+"""Runs tasks that depend on each other, concurrently when possible.
+"""
+from collections.abc import Callable
+import concurrent.futures
+import logging
+import multiprocessing
+import sys
+import time
+
+import django
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Runs a directed acyclic graph of tasks. A task is started as soon as all the tasks it depends on have completed.
+    When more than one worker is requested, the tasks run in a pool of worker processes, each one with its own database
+    connection. Otherwise, they run one after the other in the current process, in the order in which they were added.
+    """
+    def __init__(self, workers: int = 1) -> None:
+        """Create the scheduler.
+
+        :param workers: The number of worker processes.
+        """
+        self.workers = workers
+        self.tasks = {}
+
+    def add(self, name: str, function: Callable | None, *args, dependencies: tuple[str, ...] = ()) -> None:
+        """Add a task. Tasks must be added after the tasks they depend on.
+
+        :param name: The task name.
+        :param function: The function to run. When running in worker processes, the function and its arguments must be
+            picklable. If None, the task completes as soon as its dependencies complete, which is useful in order to
+            wait for a group of tasks.
+        :param args: The function arguments.
+        :param dependencies: The names of the tasks that must complete before this task starts.
+        """
+        for dependency in dependencies:
+            if dependency not in self.tasks:
+                raise ValueError(f"Task {name} depends on unknown task {dependency}")
+        self.tasks[name] = function, args, tuple(dependencies)
+
+    def run(self) -> dict[str, float]:
+        """Run all the tasks.
+
+        :return: The wall time, in seconds, of each task.
+        """
+        start = time.perf_counter()
+        if self.workers > 1:
+            timings = self._run_concurrently()
+        else:
+            timings = {name: _run_task(name, function, *args) for name, (function, args, _) in self.tasks.items()}
+        logger.info(
+            "Completed %d tasks in %.1f seconds (%s)", len(timings), time.perf_counter() - start,
+            ', '.join(f"{name}: {elapsed:.1f}s" for name, elapsed in timings.items())
+        )
+
+        return timings
+
+    def _run_concurrently(self) -> dict[str, float]:
+        """Run the tasks in a pool of worker processes.
+
+        :return: The wall time, in seconds, of each task.
+        """
+        timings = {}
+        pending = dict(self.tasks)
+        running = {}
+        log_level = logging.getLogger().getEffectiveLevel()
+        # Django must be set up before any task is unpickled, as the tasks may import the application models
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        ) as executor:
+            while pending or running:
+                for name, (function, args, dependencies) in list(pending.items()):
+                    if all(dependency in timings for dependency in dependencies):
+                        del pending[name]
+                        if function is None:
+                            timings[name] = 0.0
+                        else:
+                            running[executor.submit(_run_worker_task, log_level, name, function, *args)] = name
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        timings[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+
+        return timings
+
+
+def _run_worker_task(log_level: int, name: str, function: Callable, *args) -> float:
+    """Run a task in a worker process.
+
+    :param log_level: The logging level of the parent process.
+    :param name: The task name.
+    :param function: The function to run.
+    :param args: The function arguments.
+    :return: The wall time of the task, in seconds.
+    """
+    logging.basicConfig(
+        stream=sys.stdout, level=log_level, format='%(asctime)s %(processName)s %(name)s %(levelname)s %(message)s')
+
+    return _run_task(name, function, *args)
+
+
+def _run_task(name: str, function: Callable | None, *args) -> float:
+    """Run a task.
+
+    :param name: The task name.
+    :param function: The function to run, or None if the task only waits for its dependencies.
+    :param args: The function arguments.
+    :return: The wall time of the task, in seconds.
+    """
+    if function is None:
+        return 0.0
+
+    logger.info("Starting task %s", name)
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    logger.info("Task %s completed in %.1f seconds", name, elapsed)
+
+    return elapsed
@@ -0,0 +1,149 @@
+"""Loading of site data to a shadow schema, which replaces the live tables once the load completes.
+"""
+from collections.abc import Generator, Iterable
+import contextlib
+import logging
+import os
+
+from django.db import connection, transaction
+
+from . import bulkload
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The schema of the live tables
+LIVE_SCHEMA = 'public'
+# The schema to which the tables are loaded
+SHADOW_SCHEMA = 'shadow'
+# The schema that keeps the tables replaced by the last swap, so that they can be swapped back
+PREVIOUS_SCHEMA = 'previous'
+
+
+@contextlib.contextmanager
+def search_path(schema: str) -> Generator[None]:
+    """Resolve the table names to a schema before the live schema, for the duration of the context. The search path is
+    set for the current database connection, as well as for the connections that are opened by the current process
+    and the worker processes it starts, which read it from the PGOPTIONS environment variable.
+
+    :param schema: The schema.
+    """
+    options = os.environ.get('PGOPTIONS')
+    os.environ['PGOPTIONS'] = f"{options or ''} -c search_path={schema},{LIVE_SCHEMA}".strip()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT current_setting('search_path'), set_config('search_path', %s, false)", [f"{schema}, {LIVE_SCHEMA}"])
+        current_path, _ = cursor.fetchone()
+    try:
+        yield
+    finally:
+        if options is None:
+            del os.environ['PGOPTIONS']
+        else:
+            os.environ['PGOPTIONS'] = options
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('search_path', %s, false)", [current_path])
+
+
+class ShadowSchema:
+    """The tables of a site are loaded to a shadow schema, while the live tables keep serving requests. The shadow
+    schema is created with the same tables, indexes, constraints and triggers as the live tables, with the same names.
+    Once the load completes, the tables are swapped in a single transaction, so that requests see either the previous
+    or the new data. The previous tables are moved to another schema, and are kept until the next swap, so that they
+    can be swapped back.
+    """
+    def __init__(self, tables: Iterable[str]) -> None:
+        """Create the shadow schema.
+
+        :param tables: The names of the tables that are loaded, in loading order.
+        """
+        self.tables = tuple(tables)
+
+    @contextlib.contextmanager
+    def loading(self) -> Generator[None]:
+        """Create the shadow schema, and load the tables to it for the duration of the context. If loading fails, the
+        shadow schema is left as it is, and is dropped by the next load.
+        """
+        self.create()
+        with search_path(SHADOW_SCHEMA):
+            yield
+
+    def create(self) -> None:
+        """Create the shadow schema, with empty copies of the live tables.
+        """
+        logger.info("Creating schema %s", SHADOW_SCHEMA)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # The definitions are captured before the search path is changed, so that the foreign keys to the live
+            # tables that are not loaded keep referencing them
+            table_objects = [bulkload.TableObjects.capture(cursor, table, keys=True) for table in self.tables]
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {SHADOW_SCHEMA}")
+            for table in self.tables:
+                cursor.execute(
+                    f"CREATE TABLE {SHADOW_SCHEMA}.{table} (LIKE {LIVE_SCHEMA}.{table} INCLUDING DEFAULTS "
+                    "INCLUDING CONSTRAINTS INCLUDING IDENTITY INCLUDING GENERATED INCLUDING STORAGE "
+                    "INCLUDING COMPRESSION INCLUDING STATISTICS INCLUDING COMMENTS)"
+                )
+        with search_path(SHADOW_SCHEMA):
+            for objects in table_objects:
+                # Indexes and triggers reference their table by qualified name
+                live_table = f" ON {LIVE_SCHEMA}.{objects.table} "
+                shadow_table = f" ON {SHADOW_SCHEMA}.{objects.table} "
+                objects.indexes = {
+                    name: definition.replace(live_table, shadow_table, 1)
+                    for name, definition in objects.indexes.items()
+                }
+                objects.triggers = {
+                    name: definition.replace(live_table, shadow_table, 1)
+                    for name, definition in objects.triggers.items()
+                }
+                objects.restore()
+
+    def swap(self) -> None:
+        """Replace the live tables with the tables of the shadow schema, and keep the live tables in the previous
+        schema. The tables that were kept by the previous swap are dropped.
+        """
+        logger.info("Swapping schema %s with the live tables", SHADOW_SCHEMA)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {PREVIOUS_SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {PREVIOUS_SCHEMA}")
+            self._move(cursor, LIVE_SCHEMA, PREVIOUS_SCHEMA)
+            self._move(cursor, SHADOW_SCHEMA, LIVE_SCHEMA)
+            cursor.execute(f"DROP SCHEMA {SHADOW_SCHEMA} CASCADE")
+
+    def rollback(self) -> None:
+        """Swap the live tables with the tables kept by the last swap. Rolling back again restores the replaced
+        tables.
+
+        :raises ValueError: If there are no previous tables.
+        """
+        logger.info("Swapping schema %s with the live tables", PREVIOUS_SCHEMA)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", [PREVIOUS_SCHEMA])
+            if cursor.fetchone() is None:
+                raise ValueError("There are no previous tables to roll back to")
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SHADOW_SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {SHADOW_SCHEMA}")
+            self._move(cursor, LIVE_SCHEMA, SHADOW_SCHEMA)
+            self._move(cursor, PREVIOUS_SCHEMA, LIVE_SCHEMA)
+            self._move(cursor, SHADOW_SCHEMA, PREVIOUS_SCHEMA)
+            cursor.execute(f"DROP SCHEMA {SHADOW_SCHEMA}")
+
+    def _move(self, cursor, source: str, target: str) -> None:
+        """Move the tables from a schema to another. Their indexes, constraints, triggers and sequences are moved along
+        with them, and their foreign keys keep referencing the same tables. Their extended statistics are not, and are
+        moved after them, as they would otherwise be dropped with the schema.
+
+        :param cursor: The database cursor.
+        :param source: The schema of the tables.
+        :param target: The schema to which the tables are moved.
+        """
+        for table in self.tables:
+            cursor.execute(
+                "SELECT stxname FROM pg_statistic_ext "
+                "WHERE stxrelid = %s::regclass AND stxnamespace = %s::regnamespace", [f"{source}.{table}", source]
+            )
+            statistics = [name for name, in cursor.fetchall()]
+            cursor.execute(f"ALTER TABLE {source}.{table} SET SCHEMA {target}")
+            for name in statistics:
+                cursor.execute(f"ALTER STATISTICS {source}.{name} SET SCHEMA {target}")
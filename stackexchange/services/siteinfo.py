@@ -3,7 +3,8 @@
 import logging
 
 from django.core.cache import cache
-from django.db.models import Count, Max, Min, Q
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
 
 from stackexchange import enums, models
 
@@ -53,26 +54,18 @@ def _calculate_site_info() -> dict:
         **models.Post.objects.filter(type=enums.PostType.ANSWER).aggregate(
             total_answers=Count('*'), first_answer_date=Min('creation_date'), last_answer_date=Max('creation_date')
         ),
+        # The votes are counted from their rollups, as the raw votes may not all be loaded
+        **models.PostVoteRollup.objects.aggregate(total_votes=Coalesce(Sum('count'), 0)),
         **{
             'total_users': models.User.objects.count(),
-            'total_votes': models.PostVote.objects.count(),
             'total_comments': models.PostComment.objects.count(),
         }
     }
-    if site_info.get('total_badges') and site_info.get('first_badge_date') and site_info.get('last_badge_date'):
-        site_info['badges_per_minute'] = site_info['total_badges'] / (
-                (site_info['last_badge_date'] - site_info['first_badge_date']).total_seconds() / 60
-        )
-    if (
-            site_info.get('total_questions') and site_info.get('first_question_date') and
-            site_info.get('last_question_date')
-    ):
-        site_info['questions_per_minute'] = site_info['total_questions'] / (
-                (site_info['last_question_date'] - site_info['first_question_date']).total_seconds() / 60
-        )
-    if site_info.get('total_answers') and site_info.get('first_answer_date') and site_info.get('last_answer_date'):
-        site_info['answers_per_minute'] = site_info['total_answers'] / (
-                (site_info['last_answer_date'] - site_info['first_answer_date']).total_seconds() / 60
-        )
+    # The rates are only computed over time spans, so not when the first and the last dates are the same
+    for name in ('badge', 'question', 'answer'):
+        total, first, last = (
+            site_info.get(f'total_{name}s'), site_info.get(f'first_{name}_date'), site_info.get(f'last_{name}_date'))
+        if total and first and last and last > first:
+            site_info[f'{name}s_per_minute'] = total / ((last - first).total_seconds() / 60)
 
     return site_info
@@ -0,0 +1,72 @@
+"""Snapshots of the transformed rows of the tables, which are reused by later loads of the same dump.
+"""
+import logging
+import os
+import pathlib
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """The transformed rows of a table, as they are copied to its staging table, saved in the binary format of the COPY
+    command. The snapshot is keyed by the ETag of the archive the rows were read from and by the version of the loader
+    that transformed them, so that a later load of the same dump copies the snapshot to the staging table instead of
+    extracting and parsing the input file again. The rows of the staging table do not depend on the rest of the
+    database, as their references are only resolved when they are merged, so the snapshot can be loaded to any database.
+    """
+    # The extension of the snapshot files
+    EXTENSION = '.copy'
+
+    def __init__(self, directory: pathlib.Path, name: str, key: str) -> None:
+        """Create the snapshot.
+
+        :param directory: The directory in which the snapshots are saved.
+        :param name: The snapshot name, unique for each table of each archive.
+        :param key: The snapshot key, which changes when the archive or the loader change.
+        """
+        self.directory = directory
+        self.name = name
+        self.key = key
+
+    @property
+    def path(self) -> pathlib.Path:
+        """The snapshot file.
+        """
+        return self.directory / f"{self.name}.{self.key}{self.EXTENSION}"
+
+    def exists(self) -> bool:
+        """Check if the snapshot is saved.
+
+        :return: True if the snapshot file exists.
+        """
+        return self.path.exists()
+
+    def save(self, cursor, table: str) -> None:
+        """Save the rows of a table to the snapshot, and remove the previous snapshots with the same name.
+
+        :param cursor: The database cursor.
+        :param table: The table whose rows are saved.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with temp_file.open('wb') as f:
+            cursor.copy_expert(f"COPY {table} TO STDOUT WITH (FORMAT binary)", f)
+        os.replace(temp_file, self.path)
+        for path in self.directory.glob(f"{self.name}.*{self.EXTENSION}"):
+            if path != self.path:
+                path.unlink(missing_ok=True)
+        logger.info("Snapshot %s saved, %.1f MiB", self.path.name, self.path.stat().st_size / 1024 ** 2)
+
+    def restore(self, cursor, table: str) -> int:
+        """Copy the rows of the snapshot to a table, which must have the columns of the table it was saved from.
+
+        :param cursor: The database cursor.
+        :param table: The table to which the rows are copied.
+        :return: The number of copied rows.
+        """
+        logger.info("Copying snapshot %s to %s", self.path.name, table)
+        with self.path.open('rb') as f:
+            cursor.copy_expert(f"COPY {table} FROM STDIN WITH (FORMAT binary)", f)
+
+        return cursor.rowcount
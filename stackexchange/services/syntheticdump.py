@@ -0,0 +1,634 @@
+"""Generation of synthetic site data dumps, in the format of the Stack Exchange data dump, so that the loaders and the
+API can be measured at any scale without downloading a dump.
+"""
+import dataclasses
+import datetime
+import logging
+import math
+import pathlib
+import random
+import tempfile
+import uuid
+from typing import IO, Self
+from xml.sax import saxutils
+
+import py7zr
+
+from stackexchange import enums
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The root element of each file of the dump, by file name, in the order in which the files are generated
+ROOT_ELEMENTS = {
+    'Users.xml': 'users', 'Badges.xml': 'badges', 'Posts.xml': 'posts', 'Votes.xml': 'votes',
+    'Comments.xml': 'comments', 'PostHistory.xml': 'posthistory', 'PostLinks.xml': 'postlinks', 'Tags.xml': 'tags'
+}
+# The time at which the first users join and the first posts are created
+START_DATE = datetime.datetime(2010, 1, 1)
+# The time after which no rows are created
+END_DATE = datetime.datetime(2024, 1, 1)
+# The content license of the generated rows, as it is written in the dump
+CONTENT_LICENSE = 'CC BY-SA 4.0'
+# The entities that are escaped in attribute values, in addition to &, < and >
+ATTRIBUTE_ENTITIES = {'"': '&quot;', '\n': '&#xA;', '\r': '&#xD;'}
+# The words of the generated texts and tag names
+WORDS = (
+    'python', 'django', 'query', 'database', 'index', 'table', 'server', 'client', 'request', 'response', 'cache',
+    'thread', 'process', 'memory', 'string', 'array', 'list', 'function', 'class', 'method', 'object', 'value',
+    'error', 'exception', 'file', 'stream', 'buffer', 'socket', 'network', 'protocol', 'json', 'xml', 'html', 'css',
+    'javascript', 'linux', 'windows', 'shell', 'script', 'compiler', 'debugger', 'test', 'build', 'deploy', 'docker',
+    'image', 'model', 'view', 'template', 'form', 'field', 'migration', 'schema', 'join', 'filter', 'sort', 'order',
+    'group', 'count', 'sum', 'loop', 'branch', 'merge', 'commit', 'version', 'package', 'module', 'import', 'export',
+    'parser', 'token', 'syntax', 'regex', 'pattern', 'event', 'handler', 'callback', 'promise', 'async', 'await',
+    'lock', 'queue', 'stack', 'heap', 'tree', 'graph', 'node', 'edge', 'key', 'hash', 'map', 'set', 'vector',
+    'matrix', 'pointer', 'reference', 'type', 'generic', 'interface', 'plugin', 'config', 'setting', 'option',
+    'argument', 'parameter', 'return', 'result', 'output', 'input', 'format', 'encoding', 'unicode', 'date', 'time',
+    'timezone', 'locale', 'session', 'cookie', 'token', 'password', 'user', 'account', 'permission', 'role', 'admin',
+)
+# The first names of the generated users
+NAMES = (
+    'Alice', 'Bob', 'Carol', 'Dave', 'Eve', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy', 'Mallory', 'Niaj', 'Olivia',
+    'Peggy', 'Rupert', 'Sybil', 'Trent', 'Victor', 'Walter', 'Yasmin',
+)
+# The locations of the users that set one
+LOCATIONS = (
+    'Athens, Greece', 'Berlin, Germany', 'London, United Kingdom', 'New York, NY', 'San Francisco, CA', 'Paris, France',
+    'Bangalore, India', 'Toronto, Canada', 'Sydney, Australia', 'Tokyo, Japan', 'São Paulo, Brazil',
+)
+# The named badges, with their class
+BADGES = (
+    ('Student', enums.BadgeClass.BRONZE), ('Teacher', enums.BadgeClass.BRONZE),
+    ('Supporter', enums.BadgeClass.BRONZE), ('Editor', enums.BadgeClass.BRONZE),
+    ('Autobiographer', enums.BadgeClass.BRONZE), ('Scholar', enums.BadgeClass.BRONZE),
+    ('Commentator', enums.BadgeClass.BRONZE), ('Nice Answer', enums.BadgeClass.BRONZE),
+    ('Popular Question', enums.BadgeClass.BRONZE), ('Yearling', enums.BadgeClass.SILVER),
+    ('Good Answer', enums.BadgeClass.SILVER), ('Notable Question', enums.BadgeClass.SILVER),
+    ('Enlightened', enums.BadgeClass.SILVER), ('Great Answer', enums.BadgeClass.GOLD),
+    ('Famous Question', enums.BadgeClass.GOLD), ('Fanatic', enums.BadgeClass.GOLD),
+)
+# The share of the badges that are tag based
+TAG_BADGE_SHARE = 0.1
+# The average number of answers of a question, so that about 45% of the posts are questions, as on most sites
+ANSWERS_PER_QUESTION = 1.2
+# The share of the questions that have an accepted answer, among the questions that have answers
+ACCEPTED_SHARE = 0.5
+# The share of the questions that were deleted. Their rows are not written, but some of their votes, comments and
+# history are, as in the dumps, and are dropped by the loaders.
+DELETED_SHARE = 0.03
+# The share of the posts and comments whose owner deleted their account
+OWNERLESS_SHARE = 0.02
+# The share of the votes of the questions that are favorites
+FAVORITE_SHARE = 0.05
+# The share of the votes that are up votes, for questions and answers
+UP_VOTE_SHARE = {enums.PostType.QUESTION: 0.8, enums.PostType.ANSWER: 0.88}
+# The share of the questions that start a bounty
+BOUNTY_SHARE = 0.005
+# The share of the links between questions that are duplicates, which close the question
+DUPLICATE_SHARE = 0.1
+# The share of the tags that have an excerpt and a wiki
+TAG_WIKI_SHARE = 0.2
+# The number of history rows of a new question and a new answer: the initial title, body and tags of a question, and
+# the initial body of an answer
+INITIAL_HISTORY = {enums.PostType.QUESTION: 3, enums.PostType.ANSWER: 1}
+# The shape of the Pareto distribution of the popularity of the posts, which drives their votes and views. Its mean is
+# shape / (shape - 1).
+POPULARITY_SHAPE = 1.5
+# The number of paragraphs and sentences that the texts are composed of
+TEXT_POOL_SIZE = 1024
+# The number of questions sampled from all the generated questions, which later questions link to
+LINK_TARGETS = 4096
+
+
+@dataclasses.dataclass(frozen=True)
+class DumpScale:
+    """The number of rows of the generated dump. The rows of the users and the posts are generated exactly, while the
+    votes, comments and history are generated for each post, with the given totals as averages, so their numbers are
+    close to them. The badges, tags and links follow the users and the posts, with the ratios of the larger sites.
+    """
+    # The number of users, including the Community user
+    users: int
+    # The number of posts, except the tag excerpts and wikis
+    posts: int
+    # The number of votes
+    votes: int
+    # The number of comments
+    comments: int
+    # The number of post history rows
+    history: int
+    # The number of badges awarded to users
+    badges: int
+    # The number of tags
+    tags: int
+    # The number of links between questions
+    links: int
+
+    @classmethod
+    def for_users(
+            cls, users: int, posts: int | None = None, votes: int | None = None, comments: int | None = None,
+            history: int | None = None
+    ) -> Self:
+        """Create the scale of a dump from its number of users. The numbers of rows that are not set follow the ratios
+        of the larger sites.
+
+        :param users: The number of users.
+        :param posts: The number of posts. Defaults to 3 per user.
+        :param votes: The number of votes. Defaults to 4 per post.
+        :param comments: The number of comments. Defaults to 1.5 per post.
+        :param history: The number of post history rows. Defaults to 2.6 per post.
+        :return: The scale.
+        :raises ValueError: If there are no users, or a number of rows is negative.
+        """
+        if users < 1:
+            raise ValueError("The dump must have at least one user")
+        posts = 3 * users if posts is None else posts
+        scale = cls(
+            users=users, posts=posts, votes=4 * posts if votes is None else votes,
+            comments=int(1.5 * posts) if comments is None else comments,
+            history=int(2.6 * posts) if history is None else history, badges=int(2.5 * users),
+            tags=max(20, posts // 1000), links=int(0.15 * posts / (1 + ANSWERS_PER_QUESTION))
+        )
+        if min(dataclasses.astuple(scale)) < 0:
+            raise ValueError("The number of rows cannot be negative")
+
+        return scale
+
+
+class DumpGenerator:
+    """Generates a synthetic data dump. The data follow the distributions of a real site: a few users write most of the
+    posts and get most of the badges, a few posts get most of the votes and views, the tags are used by a long tail of
+    questions, and the scores, answer and comment counts, accepted answers and last edits of the posts agree with
+    their votes, answers, comments and history. The dump is generated in a single pass over the users and the posts,
+    keeping a fixed size sample of the questions that later questions link to, so memory usage only grows with the
+    number of tags, and the same seed generates the same dump.
+    """
+    def __init__(self, scale: DumpScale, seed: int = 0) -> None:
+        """Create the generator.
+
+        :param scale: The number of rows of the dump.
+        :param seed: The seed of the random numbers.
+        """
+        self.scale = scale
+        self.random = random.Random(seed)
+        # The number of rows written to each file, by file name
+        self.rows = dict.fromkeys(ROOT_ELEMENTS, 0)
+        # The open files of the dump, by file name
+        self._files: dict[str, IO[str]] = {}
+        self._tag_names = self._generate_tag_names(scale.tags)
+        self._tag_counts = [0] * scale.tags
+        # The identifiers of the excerpt and wiki posts of the tags that have them, by tag index
+        self._tag_wiki_posts: dict[int, list[int]] = {}
+        self._paragraphs = [self._text(8, 60) for _ in range(TEXT_POOL_SIZE)]
+        self._sentences = [self._text(4, 20) for _ in range(TEXT_POOL_SIZE)]
+        self._post_id = 0
+        self._vote_id = 0
+        self._comment_id = 0
+        self._history_id = 0
+        self._link_id = 0
+        # A uniform sample of the identifiers of the generated questions, which later questions link to, and the number
+        # of questions it was drawn from
+        self._link_targets: list[int] = []
+        self._questions = 0
+        # The average number of votes, comments and edits of each post
+        self._votes_per_post = scale.votes / scale.posts if scale.posts else 0.0
+        self._comments_per_post = scale.comments / scale.posts if scale.posts else 0.0
+        initial_history = (
+            INITIAL_HISTORY[enums.PostType.QUESTION] + ANSWERS_PER_QUESTION * INITIAL_HISTORY[enums.PostType.ANSWER]
+        ) / (1 + ANSWERS_PER_QUESTION)
+        self._edits_per_post = max(0.0, scale.history / scale.posts - initial_history) if scale.posts else 0.0
+        self._links_per_question = scale.links * (1 + ANSWERS_PER_QUESTION) / scale.posts if scale.posts else 0.0
+
+    def write(self, directory: pathlib.Path) -> dict[str, int]:
+        """Write the files of the dump to a directory.
+
+        :param directory: The directory, which is created if it does not exist.
+        :return: The number of rows written to each file, by file name.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for filename, root in ROOT_ELEMENTS.items():
+                f = (directory / filename).open('w', encoding='utf-8', newline='\n')
+                self._files[filename] = f
+                f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{root}>\n')
+            self._generate_users()
+            self._generate_posts()
+            self._generate_tags()
+            for filename, root in ROOT_ELEMENTS.items():
+                self._files[filename].write(f'</{root}>\n')
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+        for filename, rows in self.rows.items():
+            logger.info("File %s: %d rows", filename, rows)
+
+        return self.rows
+
+    def write_archive(self, path: pathlib.Path) -> dict[str, int]:
+        """Write the dump to a 7z archive, as it is published.
+
+        :param path: The archive file.
+        :return: The number of rows written to each file, by file name.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=path.parent) as temp_dir:
+            rows = self.write(pathlib.Path(temp_dir))
+            logger.info("Compressing the dump to %s", path)
+            with py7zr.SevenZipFile(path, mode='w') as f:
+                for filename in ROOT_ELEMENTS:
+                    f.write(pathlib.Path(temp_dir) / filename, arcname=filename)
+
+        return rows
+
+    def _generate_users(self) -> None:
+        """Generate the users and their badges. The reputation of the users falls with their identifier, as the posts
+        are mostly written by the users with the lowest identifiers, who joined first.
+        """
+        self._write_row('Users.xml', {
+            'Id': -1, 'Reputation': 1, 'CreationDate': self._format_date(START_DATE), 'DisplayName': 'Community',
+            'LastAccessDate': self._format_date(START_DATE), 'AboutMe': self._paragraphs[0], 'Views': 0,
+            'UpVotes': 0, 'DownVotes': 0
+        })
+        users = self.scale.users - 1
+        badges_per_user = self.scale.badges / users if users else 0.0
+        for user_id in range(1, users + 1):
+            # The users get badges in proportion to how often they are drawn as post owners, which is a third of
+            # (user_id / users) ** (-2 / 3) times the average
+            user_badges = badges_per_user * (user_id / users) ** (-2 / 3) / 3
+            creation_date = self._date_at(user_id / (users + 1))
+            reputation = max(1, int(200000 / user_id ** 0.9 * self.random.uniform(0.5, 1.5)))
+            self._write_row('Users.xml', {
+                'Id': user_id, 'Reputation': reputation, 'CreationDate': self._format_date(creation_date),
+                'DisplayName': (
+                    f"{self.random.choice(NAMES)}{user_id}" if self.random.random() < 0.5 else f"user{user_id}"),
+                'LastAccessDate': self._format_date(self._date_after(creation_date, 365)),
+                'WebsiteUrl': f"https://example.com/{user_id}" if self.random.random() < 0.2 else None,
+                'Location': self.random.choice(LOCATIONS) if self.random.random() < 0.3 else None,
+                'AboutMe': self.random.choice(self._paragraphs) if self.random.random() < 0.2 else None,
+                'Views': int(reputation / 10 * self.random.random()),
+                'UpVotes': int(reputation / 20 * self.random.random()),
+                'DownVotes': int(reputation / 200 * self.random.random())
+            })
+            for _ in range(self._count(user_badges)):
+                if self.scale.tags and self.random.random() < TAG_BADGE_SHARE:
+                    name = self._tag_names[self._skewed(self.scale.tags, 2.0) - 1]
+                    badge_class, tag_based = self.random.choice(list(enums.BadgeClass)), 'True'
+                else:
+                    name, badge_class = self.random.choice(BADGES)
+                    tag_based = 'False'
+                self._write_row('Badges.xml', {
+                    'Id': self.rows['Badges.xml'] + 1, 'UserId': user_id, 'Name': name,
+                    'Date': self._format_date(self._date_after(creation_date, 180)), 'Class': badge_class.value,
+                    'TagBased': tag_based
+                })
+
+    def _generate_posts(self) -> None:
+        """Generate the questions, each one followed by its answers, along with the votes, comments, history and links
+        of each post. The tag excerpts and wikis are generated once all the questions are, for the most used tags.
+        """
+        while self._post_id < self.scale.posts:
+            self._generate_question()
+
+        wiki_tags = sorted(range(self.scale.tags), key=lambda index: -self._tag_counts[index])
+        for index in wiki_tags[:math.ceil(self.scale.tags * TAG_WIKI_SHARE)]:
+            for post_type in (enums.PostType.TAG_WIKI_EXPERT, enums.PostType.TAG_WIKI):
+                self._post_id += 1
+                self._tag_wiki_posts.setdefault(index, []).append(self._post_id)
+                self._write_row('Posts.xml', {
+                    'Id': self._post_id, 'PostTypeId': post_type.value, 'CreationDate': self._format_date(START_DATE),
+                    'Score': 0, 'Body': self.random.choice(self._paragraphs), 'OwnerUserId': -1,
+                    'LastActivityDate': self._format_date(START_DATE), 'CommentCount': 0,
+                    'ContentLicense': CONTENT_LICENSE
+                })
+
+    def _generate_question(self) -> None:
+        """Generate a question and its answers.
+        """
+        self._post_id += 1
+        question_id = self._post_id
+        creation_date = self._date_at(question_id / (self.scale.posts + 1))
+        deleted = self.random.random() < DELETED_SHARE
+        answer_count = 0 if deleted else min(
+            self._count(ANSWERS_PER_QUESTION), self.scale.posts - question_id)
+        answers = [
+            self._generate_post(enums.PostType.ANSWER, self._post_id + index + 1,
+                                self._date_after(creation_date, 30), question_id=question_id)
+            for index in range(answer_count)
+        ]
+        self._post_id += answer_count
+
+        title = self._title()
+        tags = self._tags()
+        question = self._generate_post(
+            enums.PostType.QUESTION, question_id, creation_date, title=title, tags=tags, deleted=deleted)
+        question.update({
+            'ViewCount': int(question.pop('popularity') * 100 * self.random.uniform(0.5, 1.5)) + 1,
+            'Title': title, 'Tags': f"|{'|'.join(tags)}|", 'AnswerCount': answer_count,
+            'FavoriteCount': question.pop('favorites') or None
+        })
+        if answers:
+            question['LastActivityDate'] = max(
+                question['LastActivityDate'], *(answer['LastActivityDate'] for answer in answers))
+            if self.random.random() < ACCEPTED_SHARE:
+                accepted = max(answers, key=lambda answer: answer['Score'])
+                question['AcceptedAnswerId'] = accepted['Id']
+                self._write_vote(accepted['Id'], enums.PostVoteType.ACCEPTED_BY_ORIGINATOR, accepted['CreationDate'])
+                if self.random.random() < BOUNTY_SHARE:
+                    user_id = self._skewed(self.scale.users - 1)
+                    amount = self.random.choice((50, 100, 200, 500))
+                    self._write_vote(
+                        question_id, enums.PostVoteType.BOUNTY_START, question['CreationDate'], user_id, amount)
+                    self._write_vote(accepted['Id'], enums.PostVoteType.BOUNTY_CLOSE, accepted['CreationDate'],
+                                     bounty_amount=amount)
+        if self._link_targets and self.random.random() < self._links_per_question:
+            related_id = self.random.choice(self._link_targets)
+            link_type = enums.PostLinkType.DUPLICATE if self.random.random() < DUPLICATE_SHARE else (
+                enums.PostLinkType.LINKED)
+            self._link_id += 1
+            self._write_row('PostLinks.xml', {
+                'Id': self._link_id, 'CreationDate': question['CreationDate'], 'PostId': question_id,
+                'RelatedPostId': related_id, 'LinkTypeId': link_type.value
+            })
+            if link_type == enums.PostLinkType.DUPLICATE:
+                closed_date = self._format_date(self._date_after(creation_date, 2))
+                question['ClosedDate'] = closed_date
+                self._write_history(
+                    question_id, enums.PostHistoryType.POST_CLOSED, closed_date, self._skewed(self.scale.users - 1))
+        if not deleted:
+            self._sample_link_target(question_id)
+            self._write_row('Posts.xml', question)
+        for answer in answers:
+            answer.pop('popularity')
+            answer.pop('favorites')
+            self._write_row('Posts.xml', answer)
+
+    def _sample_link_target(self, question_id: int) -> None:
+        """Add a question to the sample of the questions that later questions link to, with reservoir sampling, so
+        that every question generated so far is equally likely to be in the sample.
+
+        :param question_id: The question identifier.
+        """
+        self._questions += 1
+        if len(self._link_targets) < LINK_TARGETS:
+            self._link_targets.append(question_id)
+        else:
+            index = self.random.randrange(self._questions)
+            if index < LINK_TARGETS:
+                self._link_targets[index] = question_id
+
+    def _generate_post(
+            self, post_type: enums.PostType, post_id: int, creation_date: datetime.datetime,
+            question_id: int | None = None, title: str | None = None, tags: list[str] | None = None,
+            deleted: bool = False
+    ) -> dict:
+        """Generate a question or an answer, along with its votes, comments and history, which are written to their
+        files. The post row is returned, so that its attributes that depend on its answers are set before it is
+        written, along with the popularity of the post and its number of favorites.
+
+        :param post_type: The post type.
+        :param post_id: The post identifier.
+        :param creation_date: The creation date.
+        :param question_id: The identifier of the question of an answer.
+        :param title: The title of a question.
+        :param tags: The tags of a question.
+        :param deleted: If True, the post is deleted, and only some of its votes and comments are written.
+        :return: The post row.
+        """
+        owner_id = None if self.random.random() < OWNERLESS_SHARE else self._skewed(self.scale.users - 1)
+        body = self._body()
+        created = self._format_date(creation_date)
+        last_activity_date = created
+        popularity = self.random.paretovariate(POPULARITY_SHAPE)
+        mean_popularity = POPULARITY_SHAPE / (POPULARITY_SHAPE - 1)
+
+        score = favorites = 0
+        for _ in range(self._count(self._votes_per_post * popularity / mean_popularity)):
+            if deleted and self.random.random() < 0.5:
+                continue
+            vote_date = self._format_date(self._date_after(creation_date, 60).replace(hour=0, minute=0, second=0))
+            if post_type == enums.PostType.QUESTION and self.random.random() < FAVORITE_SHARE:
+                favorites += 1
+                self._write_vote(post_id, enums.PostVoteType.FAVORITE, vote_date, self._skewed(self.scale.users - 1))
+            elif self.random.random() < UP_VOTE_SHARE[post_type]:
+                score += 1
+                self._write_vote(post_id, enums.PostVoteType.UP_MOD, vote_date)
+            else:
+                score -= 1
+                self._write_vote(post_id, enums.PostVoteType.DOWN_MOD, vote_date)
+
+        comment_count = self._count(self._comments_per_post)
+        for _ in range(comment_count):
+            comment_date = self._format_date(self._date_after(creation_date, 10))
+            last_activity_date = max(last_activity_date, comment_date)
+            if deleted and self.random.random() < 0.5:
+                continue
+            self._comment_id += 1
+            user_id = None if self.random.random() < OWNERLESS_SHARE else self._skewed(self.scale.users - 1)
+            self._write_row('Comments.xml', {
+                'Id': self._comment_id, 'PostId': post_id, 'Score': self._count(0.3),
+                'Text': self.random.choice(self._sentences), 'CreationDate': comment_date, 'UserId': user_id,
+                'UserDisplayName': f"user{self.random.randrange(1, 10 ** 6)}" if user_id is None else None,
+                'ContentLicense': CONTENT_LICENSE
+            })
+
+        revision_guid = self._guid()
+        if post_type == enums.PostType.QUESTION:
+            self._write_history(post_id, enums.PostHistoryType.INITIAL_TITLE, created, owner_id, title, revision_guid)
+        self._write_history(post_id, enums.PostHistoryType.INITIAL_BODY, created, owner_id, body, revision_guid)
+        if post_type == enums.PostType.QUESTION:
+            self._write_history(
+                post_id, enums.PostHistoryType.INITIAL_TAGS, created, owner_id, f"|{'|'.join(tags)}|", revision_guid)
+        last_editor_id = last_edit_date = None
+        for _ in range(self._count(self._edits_per_post)):
+            last_edit_date = self._format_date(self._date_after(creation_date, 90))
+            last_editor_id = owner_id if self.random.random() < 0.7 else self._skewed(self.scale.users - 1)
+            if post_type == enums.PostType.QUESTION and self.random.random() < 0.2:
+                history_type, text = enums.PostHistoryType.EDIT_TITLE, self._title()
+            else:
+                history_type, text = enums.PostHistoryType.EDIT_BODY, self._body()
+            self._write_history(post_id, history_type, last_edit_date, last_editor_id, text, comment='edited')
+        if last_edit_date is not None:
+            last_activity_date = max(last_activity_date, last_edit_date)
+
+        return {
+            'Id': post_id, 'PostTypeId': post_type.value, 'ParentId': question_id, 'CreationDate': created,
+            'Score': score, 'Body': body, 'OwnerUserId': owner_id, 'LastEditorUserId': last_editor_id,
+            'LastEditDate': last_edit_date, 'LastActivityDate': last_activity_date, 'CommentCount': comment_count,
+            'ContentLicense': CONTENT_LICENSE, 'popularity': popularity, 'favorites': favorites
+        }
+
+    def _generate_tags(self) -> None:
+        """Generate the tags, with the number of questions that use each one, and their excerpt and wiki posts.
+        """
+        for index, name in enumerate(self._tag_names):
+            excerpt_id, wiki_id = self._tag_wiki_posts.get(index, (None, None))
+            self._write_row('Tags.xml', {
+                'Id': index + 1, 'TagName': name, 'Count': self._tag_counts[index], 'ExcerptPostId': excerpt_id,
+                'WikiPostId': wiki_id
+            })
+
+    def _write_vote(
+            self, post_id: int, vote_type: enums.PostVoteType, creation_date: str, user_id: int | None = None,
+            bounty_amount: int | None = None
+    ) -> None:
+        """Write a vote.
+
+        :param post_id: The post identifier.
+        :param vote_type: The vote type.
+        :param creation_date: The formatted creation date.
+        :param user_id: The identifier of the user, which is only set for favorites and bounties.
+        :param bounty_amount: The bounty amount, for bounties.
+        """
+        self._vote_id += 1
+        self._write_row('Votes.xml', {
+            'Id': self._vote_id, 'PostId': post_id, 'VoteTypeId': vote_type.value, 'UserId': user_id,
+            'CreationDate': creation_date, 'BountyAmount': bounty_amount
+        })
+
+    def _write_history(
+            self, post_id: int, history_type: enums.PostHistoryType, creation_date: str, user_id: int | None,
+            text: str | None = None, revision_guid: str | None = None, comment: str | None = None
+    ) -> None:
+        """Write a post history row.
+
+        :param post_id: The post identifier.
+        :param history_type: The history type.
+        :param creation_date: The formatted creation date.
+        :param user_id: The identifier of the user, or None if the user deleted their account.
+        :param text: The escaped text of the revision.
+        :param revision_guid: The identifier of the revision, shared by the rows of the same action. A new one is
+            generated if not set.
+        :param comment: The revision comment.
+        """
+        self._history_id += 1
+        self._write_row('PostHistory.xml', {
+            'Id': self._history_id, 'PostHistoryTypeId': history_type.value, 'PostId': post_id,
+            'RevisionGUID': revision_guid or self._guid(), 'CreationDate': creation_date, 'UserId': user_id,
+            'Comment': comment, 'Text': text, 'ContentLicense': CONTENT_LICENSE
+        })
+
+    def _write_row(self, filename: str, attributes: dict) -> None:
+        """Write a row to a file of the dump. The attributes whose value is None are left out, and the values must
+        already be escaped.
+
+        :param filename: The file name.
+        :param attributes: The row attributes.
+        """
+        self._files[filename].write(
+            f"  <row {' '.join(f'{name}="{value}"' for name, value in attributes.items() if value is not None)} />\n")
+        self.rows[filename] += 1
+
+    def _skewed(self, count: int, exponent: float = 3.0) -> int | None:
+        """Draw an identifier from 1 to a count, where the lowest identifiers are drawn far more often: with the
+        default exponent, the first 0.1% of the identifiers are drawn 10% of the time.
+
+        :param count: The number of identifiers.
+        :param exponent: The skew of the distribution.
+        :return: The identifier, or None if there are no identifiers.
+        """
+        if count < 1:
+            return None
+        return min(count, 1 + int(count * self.random.random() ** exponent))
+
+    def _count(self, mean: float) -> int:
+        """Draw a count from an exponential distribution with a mean, rounded so that the counts have the same mean.
+
+        :param mean: The mean.
+        :return: The count.
+        """
+        if mean <= 0:
+            return 0
+        return int(self.random.expovariate(1 / mean) + self.random.random())
+
+    def _date_at(self, fraction: float) -> datetime.datetime:
+        """Return the time at a fraction of the time span of the dump, with a few hours of jitter.
+
+        :param fraction: The fraction, from 0 to 1.
+        :return: The time.
+        """
+        seconds = (END_DATE - START_DATE).total_seconds() * fraction + self.random.uniform(0, 6 * 3600)
+
+        return START_DATE + datetime.timedelta(seconds=int(seconds))
+
+    def _date_after(self, date: datetime.datetime, days: float) -> datetime.datetime:
+        """Return a time after another time, by an exponentially distributed delay.
+
+        :param date: The time.
+        :param days: The mean delay, in days.
+        :return: The time.
+        """
+        return date + datetime.timedelta(seconds=int(self.random.expovariate(1 / (days * 86400))))
+
+    @staticmethod
+    def _format_date(date: datetime.datetime) -> str:
+        """Format a time as in the dump.
+
+        :param date: The time.
+        :return: The formatted time.
+        """
+        return date.isoformat(timespec='milliseconds')
+
+    def _guid(self) -> str:
+        """Generate a revision identifier.
+
+        :return: The identifier.
+        """
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def _text(self, min_words: int, max_words: int) -> str:
+        """Generate an escaped sentence.
+
+        :param min_words: The minimum number of words.
+        :param max_words: The maximum number of words.
+        :return: The escaped text.
+        """
+        words = self.random.choices(WORDS, k=self.random.randint(min_words, max_words))
+
+        return saxutils.escape(f"{' '.join(words).capitalize()}.", ATTRIBUTE_ENTITIES)
+
+    def _body(self) -> str:
+        """Generate the escaped HTML body of a post, from a few paragraphs.
+
+        :return: The escaped body.
+        """
+        paragraphs = self.random.choices(self._paragraphs, k=1 + self._count(2.0))
+
+        return '&#xA;'.join(f"&lt;p&gt;{paragraph}&lt;/p&gt;" for paragraph in paragraphs)
+
+    def _title(self) -> str:
+        """Generate the title of a question.
+
+        :return: The escaped title.
+        """
+        return f"{self.random.choice(self._sentences)[:-1]}?"
+
+    def _tags(self) -> list[str]:
+        """Draw the tags of a question, from one to five, and count them.
+
+        :return: The tag names.
+        """
+        if not self.scale.tags:
+            return []
+        indexes = {self._skewed(self.scale.tags, 2.5) - 1 for _ in range(self.random.randint(1, 5))}
+        for index in indexes:
+            self._tag_counts[index] += 1
+
+        return [self._tag_names[index] for index in sorted(indexes)]
+
+    def _generate_tag_names(self, count: int) -> list[str]:
+        """Generate unique tag names, from the words and then from pairs of words, with a number when there are more
+        tags than pairs.
+
+        :param count: The number of tags.
+        :return: The tag names.
+        """
+        names = list(dict.fromkeys(WORDS))[:count]
+        seen = set(names)
+        while len(names) < count:
+            name = '-'.join(self.random.sample(WORDS, 2))
+            if name in seen:
+                name = f"{name}{len(names)}"
+            seen.add(name)
+            names.append(name)
+
+        return names
@@ -0,0 +1,87 @@
+"""The planner statistics of the loaded tables, which are collected once the tables are loaded.
+"""
+from collections.abc import Iterable
+import logging
+import time
+
+from django.db import connection
+
+from . import bulkload
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The statistics target of the columns whose values are skewed, so that more of their most common values and a finer
+# histogram of the rest are sampled than with the default target of 100
+STATISTICS_TARGET = 1000
+# The columns whose values are skewed, by table
+SKEWED_COLUMNS = {
+    'posts': ('answer_count', 'score', 'owner_id', 'question_id'),
+    'post_tags': ('tag_id', ),
+    'post_votes': ('user_id', ),
+    'user_badges': ('badge_id', ),
+}
+# The groups of correlated columns that the API filters on, by table. The planner assumes that the conditions on
+# different columns are independent, which grossly underestimates the rows of, for example, the questions without
+# answers, as all the posts with an answer count are questions.
+CORRELATED_COLUMNS = {
+    'posts': (
+        ('type', 'answer_count', 'accepted_answer_id'),
+        ('type', 'owner_id'),
+        ('type', 'question_id'),
+    ),
+    'post_votes': (('type', 'user_id'), ),
+}
+
+
+def statistics_name(table: str, columns: Iterable[str]) -> str:
+    """Return the name of the extended statistics of a group of columns. It is the name that the database chooses for
+    them, so that they keep the same name when a table is created like another, including its statistics.
+
+    :param table: The table name.
+    :param columns: The column names.
+    :return: The statistics name.
+    """
+    return f"{table}_{'_'.join(columns)}_stat"
+
+
+def create_statistics(cursor, table: str) -> None:
+    """Raise the statistics target of the skewed columns of a table, and create the extended statistics of its groups
+    of correlated columns, if they do not exist. They are named after their columns in table order, as the database
+    names the statistics it copies to the tables of a shadow schema, and are created in the schema of the table, which
+    is the first schema of the search path.
+
+    :param cursor: The database cursor.
+    :param table: The table name.
+    """
+    bulkload.check_deferred_constraints(cursor)
+    for column in SKEWED_COLUMNS.get(table, ()):
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET STATISTICS {STATISTICS_TARGET}")
+    for columns in CORRELATED_COLUMNS.get(table, ()):
+        cursor.execute(
+            "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attname = ANY(%s) ORDER BY attnum",
+            [table, list(columns)]
+        )
+        columns = [column for column, in cursor.fetchall()]
+        cursor.execute(
+            f"CREATE STATISTICS IF NOT EXISTS {statistics_name(table, columns)} (ndistinct, dependencies, mcv) "
+            f"ON {', '.join(columns)} FROM {table}"
+        )
+
+
+def analyze(tables: Iterable[str]) -> None:
+    """Collect the statistics of the tables, along with their extended statistics.
+
+    :param tables: The table names.
+    """
+    tables = list(tables)
+    if not tables:
+        logger.info("There are no tables to analyze")
+        return
+    logger.info("Analyzing tables %s", ', '.join(tables))
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for table in tables:
+            create_statistics(cursor, table)
+        cursor.execute(f"ANALYZE {', '.join(tables)}")
+    logger.info("Analyze completed in %.1f seconds", time.perf_counter() - start)
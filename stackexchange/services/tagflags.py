@@ -0,0 +1,189 @@
+"""Sources of the tag flags (required and moderator only), which are not in the data dump.
+"""
+import abc
+import datetime
+import json
+import logging
+import pathlib
+import time
+
+from django.conf import settings
+from django.utils import timezone
+import requests
+
+from stackexchange import enums
+
+# The module logger
+logger = logging.getLogger(__name__)
+
+# The base URL of the official StackExchange API
+API_BASE_URL = 'https://api.stackexchange.com/2.3'
+
+
+class TagFlagSource(abc.ABC):
+    """A source of the names of the tags that have a flag.
+    """
+    @abc.abstractmethod
+    def key(self) -> str:
+        """Return the key of the source, which identifies the tag names that it returns in the cache.
+
+        :return: The source key.
+        """
+
+    @abc.abstractmethod
+    def get_tag_names(self, site_name: str, tag_flag: enums.TagFlag) -> list[str]:
+        """Return the names of the tags of a site that have a flag.
+
+        :param site_name: The site name.
+        :param tag_flag: The tag flag.
+        :return: The tag names.
+        """
+
+
+class ApiTagFlagSource(TagFlagSource):
+    """Gets the tag flags from the StackExchange API, or from a server that stands in for it. The pages are requested
+    over the same connection, and the requests are only delayed when the API asks for it with a backoff.
+    """
+    # The maximum number of tags in a page, as allowed by the API
+    PAGE_SIZE = 100
+    # Timeout in seconds
+    TIMEOUT = 60
+
+    def __init__(self, base_url: str = API_BASE_URL):
+        """Create the API source.
+
+        :param base_url: The base URL of the API.
+        """
+        self.base_url = base_url.rstrip('/')
+
+    def key(self) -> str:
+        """Return the key of the source, which is the base URL of the API.
+
+        :return: The source key.
+        """
+        return self.base_url
+
+    def get_tag_names(self, site_name: str, tag_flag: enums.TagFlag) -> list[str]:
+        """Return the names of the tags of a site that have a flag, requesting all the pages of the API.
+
+        :param site_name: The site name.
+        :param tag_flag: The tag flag.
+        :return: The tag names.
+        """
+        tag_names = []
+        with requests.Session() as session:
+            page = 1
+            while True:
+                response = session.get(
+                    f"{self.base_url}/tags/{tag_flag.api_path}",
+                    params={'page': page, 'pagesize': self.PAGE_SIZE, 'site': site_name}, timeout=self.TIMEOUT
+                )
+                response.raise_for_status()
+                response_data = response.json()
+                tag_names += [item['name'] for item in response_data['items']]
+                if not response_data['has_more']:
+                    break
+                page += 1
+                # The API asks the clients to wait before the next request when it throttles them
+                if 'backoff' in response_data:
+                    time.sleep(response_data['backoff'])
+
+        return tag_names
+
+
+class FileTagFlagSource(TagFlagSource):
+    """Reads the tag flags from a JSON file, which maps the API path of each flag to the names of the tags that have
+    it, so that the tags can be loaded offline.
+    """
+    def __init__(self, path: pathlib.Path):
+        """Create the file source.
+
+        :param path: The JSON file.
+        """
+        self.path = path
+
+    def key(self) -> str:
+        """Return the key of the source, which is the file path.
+
+        :return: The source key.
+        """
+        return str(self.path.resolve())
+
+    def get_tag_names(self, site_name: str, tag_flag: enums.TagFlag) -> list[str]:
+        """Return the names of the tags that have a flag in the file. The file is for a single site.
+
+        :param site_name: The site name.
+        :param tag_flag: The tag flag.
+        :return: The tag names.
+        """
+        return json.loads(self.path.read_text(encoding='utf-8')).get(tag_flag.api_path, [])
+
+
+class CachedTagFlagSource(TagFlagSource):
+    """Caches the tag names of another source in local files, so that loading the same site again does not request
+    them. The cached names are used while they are not older than the maximum age, and were cached with the same cache
+    version and from the same source.
+    """
+    # The cache version, which is changed when the cached data change
+    VERSION = 1
+    # The default maximum age of the cached tag names
+    MAX_AGE = datetime.timedelta(days=7)
+
+    def __init__(
+            self, source: TagFlagSource, cache_dir: pathlib.Path | None = None, max_age: datetime.timedelta = MAX_AGE
+    ):
+        """Create the cached source.
+
+        :param source: The source of the tag names.
+        :param cache_dir: The directory in which the tag names are cached. Defaults to the var/cache/tag-flags
+            directory.
+        :param max_age: The maximum age of the cached tag names.
+        """
+        self.source = source
+        self.cache_dir = cache_dir or pathlib.Path(settings.BASE_DIR) / 'var' / 'cache' / 'tag-flags'
+        self.max_age = max_age
+
+    def key(self) -> str:
+        """Return the key of the source, which is the key of the cached source.
+
+        :return: The source key.
+        """
+        return self.source.key()
+
+    def get_tag_names(self, site_name: str, tag_flag: enums.TagFlag) -> list[str]:
+        """Return the names of the tags of a site that have a flag, from the cache if they are cached.
+
+        :param site_name: The site name.
+        :param tag_flag: The tag flag.
+        :return: The tag names.
+        """
+        cache_file = self.cache_dir / f"{site_name}.{tag_flag.api_path}.json"
+        if cache_file.exists():
+            cached = json.loads(cache_file.read_text(encoding='utf-8'))
+            if (
+                    cached['version'] == self.VERSION and cached['source'] == self.key() and
+                    timezone.now() - datetime.datetime.fromisoformat(cached['cached_at']) <= self.max_age
+            ):
+                logger.info("Using the cached %s tags of %s", tag_flag.api_path, site_name)
+                return cached['names']
+
+        tag_names = self.source.get_tag_names(site_name, tag_flag)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({
+            'version': self.VERSION, 'source': self.key(), 'cached_at': timezone.now().isoformat(), 'names': tag_names
+        }), encoding='utf-8')
+
+        return tag_names
+
+
+def tag_flag_source() -> TagFlagSource:
+    """Create the source of the tag flags from the TAG_FLAGS_SOURCE setting, which is either the base URL of an API, or
+    the path of a JSON file. The tag names of an API are cached.
+
+    :return: The tag flag source. Defaults to the official StackExchange API.
+    """
+    source = settings.TAG_FLAGS_SOURCE or API_BASE_URL
+    if source.startswith(('http://', 'https://')):
+        return CachedTagFlagSource(ApiTagFlagSource(source))
+
+    return FileTagFlagSource(pathlib.Path(source))
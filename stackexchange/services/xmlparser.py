@@ -1,27 +1,179 @@
 """Contains functions to iterate an XML file.
 """
+import io
 import pathlib
 from collections.abc import Generator
+from xml.parsers import expat
 
-import defusedxml.ElementTree as eT
+from defusedxml import common
 
 
 class XmlFileIterator:
-    """The XML file iterator
+    """The XML file iterator. The file is read in chunks and fed to an expat parser that only collects the attributes
+    of the row elements, without building an element tree, so memory usage does not depend on the file size.
+
+    The iterator can also be restricted to a byte range of the file, so that a large file can be split in shards that
+    are parsed in parallel. The range boundaries must be aligned to the start of a row element.
     """
-    def __init__(self, xml_file: pathlib.Path):
+    # The size of the chunks in which the file is read, in bytes
+    CHUNK_SIZE = 256 * 1024
+    # The default number of rows in a batch
+    BATCH_SIZE = 10000
+    # The start of a row element
+    ROW_START = b'<row '
+
+    def __init__(self, xml_file: pathlib.Path, start: int | None = None, end: int | None = None):
         """Create the XML file iterator.
 
         :param xml_file: The XML file.
+        :param start: The offset of the first row to read. If not set, the whole file is read.
+        :param end: The offset at which reading stops. Must be set if the start offset is set.
         """
         self.xml_file = xml_file
+        self.start = start
+        self.end = end
+        # The number of bytes of the file read by the last iteration
+        self.bytes_read = 0
 
     def __iter__(self) -> Generator[dict]:
         """Iterate over the XML file data.
 
         :return: Yields the data for each row.
         """
-        tree = eT.iterparse(self.xml_file, events=("start",))
-        for _, elem in tree:
-            if elem.tag == 'row':
-                yield dict(elem.items())
+        for batch in self.batches():
+            yield from batch
+
+    def batches(self, size: int = BATCH_SIZE) -> Generator[list[dict]]:
+        """Iterate over the XML file data in batches of rows.
+
+        :param size: The maximum number of rows in each batch.
+        :return: Yields lists of rows.
+        """
+        rows = []
+        parser = self._create_parser(rows)
+        self.bytes_read = 0
+        for chunk in self._chunks():
+            parser.Parse(chunk, False)
+            while len(rows) >= size:
+                yield rows[:size]
+                del rows[:size]
+        parser.Parse(b'', True)
+        if rows:
+            yield rows
+
+    def shard(self, index: int, count: int) -> 'XmlFileIterator':
+        """Return an iterator for a shard of the file. The file is split in byte ranges of about equal size, aligned to
+        the start of the row elements. Shards can be computed independently, for example by different processes, and
+        all the shards together contain every row of the file exactly once.
+
+        :param index: The shard index, starting from zero.
+        :param count: The number of shards.
+        :return: The iterator for the shard. It can be empty, if the file is too small to be split in that many shards.
+        """
+        size = self.xml_file.stat().st_size
+        with self.xml_file.open('rb') as f:
+            end_of_rows = self._end_of_rows(f, size)
+            start = self._next_row(f, size * index // count, end_of_rows)
+            end = self._next_row(f, size * (index + 1) // count, end_of_rows) if index < count - 1 else end_of_rows
+
+        return XmlFileIterator(self.xml_file, start=start, end=end)
+
+    def shards(self, count: int) -> list['XmlFileIterator']:
+        """Split the file in shards.
+
+        :param count: The number of shards.
+        :return: The iterators for the shards.
+        """
+        return [self.shard(index, count) for index in range(count)]
+
+    def _chunks(self) -> Generator[bytes]:
+        """Read the data to parse in chunks. If the iterator is restricted to a byte range, the rows in the range are
+        wrapped in a root element, so that they form a complete XML document.
+
+        :return: Yields the chunks of data.
+        """
+        with self.xml_file.open('rb') as f:
+            if self.start is None:
+                while chunk := f.read(self.CHUNK_SIZE):
+                    self.bytes_read += len(chunk)
+                    yield chunk
+            else:
+                yield b'<rows>'
+                f.seek(self.start)
+                remaining = self.end - self.start
+                while remaining > 0 and (chunk := f.read(min(self.CHUNK_SIZE, remaining))):
+                    remaining -= len(chunk)
+                    self.bytes_read += len(chunk)
+                    yield chunk
+                yield b'</rows>'
+
+    def _next_row(self, f: io.BufferedReader, offset: int, end_of_rows: int) -> int:
+        """Find the start of the first row element at or after an offset.
+
+        :param f: The XML file.
+        :param offset: The offset.
+        :param end_of_rows: The offset at which the rows end.
+        :return: The offset of the row start, or the end of the rows if no row starts after the offset.
+        """
+        f.seek(offset)
+        while offset < end_of_rows:
+            # Overlap the chunks, in case the row start is split between them
+            chunk = f.read(self.CHUNK_SIZE + len(self.ROW_START) - 1)
+            position = chunk.find(self.ROW_START)
+            if position != -1:
+                return min(offset + position, end_of_rows)
+            if len(chunk) <= self.CHUNK_SIZE:
+                break
+            offset += self.CHUNK_SIZE
+            f.seek(offset)
+
+        return end_of_rows
+
+    def _end_of_rows(self, f: io.BufferedReader, size: int) -> int:
+        """Find the offset at which the rows end, which is the start of the closing tag of the root element. Rows are
+        empty elements, and their attribute values cannot contain a less-than sign, so that is the last closing tag in
+        the file.
+
+        :param f: The XML file.
+        :param size: The file size.
+        :return: The offset at which the rows end.
+        """
+        offset = size
+        while offset > 0:
+            offset = max(offset - self.CHUNK_SIZE, 0)
+            f.seek(offset)
+            position = f.read(self.CHUNK_SIZE + 1).rfind(b'</')
+            if position != -1:
+                return offset + position
+
+        return size
+
+    @staticmethod
+    def _create_parser(rows: list) -> expat.XMLParserType:
+        """Create the expat parser. Entity declarations and external references are forbidden, in the same way as the
+        defusedxml parsers.
+
+        :param rows: The list to which the attributes of each parsed row are appended.
+        :return: The parser.
+        """
+        def start_element(name: str, attributes: dict) -> None:
+            if name == 'row':
+                rows.append(attributes)
+
+        def entity_declaration(name, is_parameter_entity, value, base, system_id, public_id, notation_name):
+            raise common.EntitiesForbidden(name, value, base, system_id, public_id, notation_name)
+
+        def unparsed_entity_declaration(name, base, system_id, public_id, notation_name):
+            raise common.EntitiesForbidden(name, None, base, system_id, public_id, notation_name)
+
+        def external_entity_reference(context, base, system_id, public_id):
+            raise common.ExternalReferenceForbidden(context, base, system_id, public_id)
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = start_element
+        parser.EntityDeclHandler = entity_declaration
+        parser.UnparsedEntityDeclHandler = unparsed_entity_declaration
+        parser.ExternalEntityRefHandler = external_entity_reference
+
+        return parser
@@ -1,8 +1,9 @@
 """Application Celery tasks
 """
 import celery
+import celery.canvas
 
-from stackexchange import services
+from stackexchange import models, services
 
 
 @celery.shared_task
@@ -12,3 +13,41 @@ def set_site_info() -> dict:
     :return: The calculated site information.
     """
     return services.siteinfo.set_site_info()
+
+
+@celery.shared_task
+def load_site_data(site: str, **options) -> int:
+    """Schedule the load of the data of a site, as a pipeline of tasks that run on the workers.
+
+    :param site: The site name.
+    :param options: The options of the site data loader.
+    :return: The identifier of the load.
+    """
+    run = services.pipeline.create_run(site, options)
+    load_pipeline(run).delay()
+
+    return run.pk
+
+
+@celery.shared_task
+def run_load_step(run_id: int, name: str) -> None:
+    """Run a step of the pipeline of a load.
+
+    :param run_id: The load identifier.
+    :param name: The step name.
+    """
+    services.pipeline.run_step(run_id, name)
+
+
+def load_pipeline(run: models.LoadRun) -> celery.canvas.Signature:
+    """Create the canvas of the pipeline of a load. The stages run one after the other, and the steps of each stage run
+    in parallel, on any worker.
+
+    :param run: The load.
+    :return: The canvas.
+    """
+    return celery.chain(*(
+        celery.group(run_load_step.si(run.pk, name) for name in names) if len(names) > 1
+        else run_load_step.si(run.pk, names[0])
+        for names in services.pipeline.stages(run)
+    ))
@@ -0,0 +1,14 @@
+"""Service tests
+"""
+from .binarycopy import *
+from .clustering import *
+from .dowloader import *
+from .idindex import *
+from .loader import *
+from .metrics import *
+from .pipeline import *
+from .scheduler import *
+from .syntheticdump import *
+from .tablestats import *
+from .tagflags import *
+from .xmlparser import *
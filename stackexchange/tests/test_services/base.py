@@ -0,0 +1,89 @@
+"""Base classes for the service tests
+"""
+import pathlib
+import tempfile
+
+from django.test import TestCase
+
+from stackexchange.tests import factories
+
+# The contents of a small data dump, by file name
+DUMP_FILES = {
+    'Users.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<users>
+  <row Id="-1" Reputation="1" CreationDate="2020-01-01T00:00:00.000" DisplayName="Community" LastAccessDate="2020-01-01T00:00:00.000" AboutMe="&lt;p&gt;Hi&lt;/p&gt;" Views="0" UpVotes="10" DownVotes="2" />
+  <row Id="1" Reputation="101" CreationDate="2020-01-02T00:00:00.000" DisplayName="Alice" LastAccessDate="2020-02-01T00:00:00.000" WebsiteUrl="https://example.com" Location="Athens, Greece" Views="5" UpVotes="3" DownVotes="0" />
+  <row Id="2" Reputation="15" CreationDate="2020-01-03T00:00:00.000" DisplayName="Bob" LastAccessDate="2020-02-02T00:00:00.000" Views="1" UpVotes="1" DownVotes="0" />
+</users>
+''',
+    'Badges.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<badges>
+  <row Id="1" UserId="1" Name="Teacher" Date="2020-01-05T00:00:00.000" Class="3" TagBased="False" />
+  <row Id="2" UserId="2" Name="Teacher" Date="2020-01-06T00:00:00.000" Class="3" TagBased="False" />
+  <row Id="3" UserId="2" Name="python" Date="2020-01-07T00:00:00.000" Class="2" TagBased="True" />
+  <row Id="4" UserId="99" Name="Student" Date="2020-01-08T00:00:00.000" Class="3" TagBased="False" />
+</badges>
+''',
+    'Posts.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<posts>
+  <row Id="1" PostTypeId="1" AcceptedAnswerId="2" CreationDate="2020-01-04T00:00:00.000" Score="3" ViewCount="30" Body="&lt;p&gt;How, exactly?&#xA;Line \\ two&lt;/p&gt;" OwnerUserId="1" LastActivityDate="2020-01-05T00:00:00.000" Title="A question" Tags="|python|django|" AnswerCount="1" CommentCount="1" ContentLicense="CC BY-SA 4.0" />
+  <row Id="2" PostTypeId="2" ParentId="1" CreationDate="2020-01-04T01:00:00.000" Score="2" Body="&lt;p&gt;Like this&lt;/p&gt;" OwnerUserId="2" LastEditorUserId="1" LastEditDate="2020-01-04T02:00:00.000" LastActivityDate="2020-01-04T02:00:00.000" CommentCount="1" ContentLicense="CC BY-SA 4.0" />
+  <row Id="3" PostTypeId="1" AcceptedAnswerId="100" CreationDate="2020-01-05T00:00:00.000" Score="0" ViewCount="3" Body="&lt;p&gt;Another&lt;/p&gt;" OwnerUserId="99" LastActivityDate="2020-01-05T00:00:00.000" Title="Another question" Tags="|python|" AnswerCount="0" CommentCount="0" ContentLicense="CC BY-SA 4.0" />
+  <row Id="4" PostTypeId="4" CreationDate="2020-01-01T00:00:00.000" Score="0" Body="Python excerpt" OwnerUserId="-1" LastActivityDate="2020-01-01T00:00:00.000" ContentLicense="CC BY-SA 4.0" />
+  <row Id="5" PostTypeId="5" CreationDate="2020-01-01T00:00:00.000" Score="0" Body="Python wiki" OwnerUserId="-1" LastActivityDate="2020-01-01T00:00:00.000" ContentLicense="CC BY-SA 4.0" />
+</posts>
+''',
+    'Tags.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<tags>
+  <row Id="1" TagName="python" Count="2" ExcerptPostId="4" WikiPostId="5" />
+  <row Id="2" TagName="django" Count="1" />
+</tags>
+''',
+    'Votes.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<votes>
+  <row Id="1" PostId="1" VoteTypeId="2" CreationDate="2020-01-04T00:00:00.000" />
+  <row Id="2" PostId="2" VoteTypeId="2" CreationDate="2020-01-04T00:00:00.000" />
+  <row Id="3" PostId="1" VoteTypeId="5" UserId="2" CreationDate="2020-01-05T00:00:00.000" />
+  <row Id="4" PostId="100" VoteTypeId="2" CreationDate="2020-01-05T00:00:00.000" />
+  <row Id="5" PostId="1" VoteTypeId="8" UserId="1" CreationDate="2020-01-06T00:00:00.000" BountyAmount="50" />
+</votes>
+''',
+    'Comments.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<comments>
+  <row Id="1" PostId="1" Score="1" Text="Nice, but\\n what about &quot;this&quot;?&#xA;Second line" CreationDate="2020-01-04T00:30:00.000" UserId="2" ContentLicense="CC BY-SA 4.0" />
+  <row Id="2" PostId="2" Score="0" Text="Thanks" CreationDate="2020-01-04T03:00:00.000" UserDisplayName="guest" ContentLicense="CC BY-SA 4.0" />
+</comments>
+''',
+    'PostHistory.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<posthistory>
+  <row Id="1" PostHistoryTypeId="2" PostId="1" RevisionGUID="9e3c2d2c-7e1f-4cfa-8d58-2d1a3b9c1a11" CreationDate="2020-01-04T00:00:00.000" UserId="1" Text="How, exactly?" ContentLicense="CC BY-SA 4.0" />
+  <row Id="2" PostHistoryTypeId="5" PostId="2" RevisionGUID="0b0f2c7e-33b1-4b8a-a2a1-9d1c5e0c2b22" CreationDate="2020-01-04T02:00:00.000" UserId="1" Comment="fixed typo" Text="Like this" ContentLicense="CC BY-SA 4.0" />
+  <row Id="3" PostHistoryTypeId="2" PostId="100" RevisionGUID="5d8e1f3a-6c2b-4e7d-9f0a-1b2c3d4e5f33" CreationDate="2020-01-05T00:00:00.000" UserId="2" Text="Deleted" ContentLicense="CC BY-SA 4.0" />
+</posthistory>
+''',
+    'PostLinks.xml': '''<?xml version="1.0" encoding="utf-8"?>
+<postlinks>
+  <row Id="1" CreationDate="2020-01-06T00:00:00.000" PostId="3" RelatedPostId="1" LinkTypeId="1" />
+  <row Id="2" CreationDate="2020-01-06T00:00:00.000" PostId="3" RelatedPostId="100" LinkTypeId="3" />
+</postlinks>
+''',
+}
+
+
+class DumpTestCase(TestCase):
+    """Base test case for tests that need the files of a site data dump.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the test data.
+        """
+        cls.site = factories.SiteFactory.create(name='example', url='https://example.stackexchange.com')
+
+    def setUp(self):
+        """Write the dump files to a temporary directory.
+        """
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = pathlib.Path(temp_dir.name)
+        for filename, contents in DUMP_FILES.items():
+            (self.data_dir / filename).write_text(contents, encoding='utf-8')
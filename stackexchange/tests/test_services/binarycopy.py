@@ -0,0 +1,84 @@
+"""Binary COPY format tests
+"""
+import datetime
+import itertools
+import struct
+import uuid
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from stackexchange.services import binarycopy
+
+
+class BinaryRowStreamTests(SimpleTestCase):
+    """Binary row stream tests
+    """
+    def test_read(self):
+        """Test that reading the stream in chunks returns the header, the encoded rows and the trailer.
+        """
+        stream = binarycopy.BinaryRowStream([(1, 'a'), ('2', '<NULL>')], ('smallint', 'text'))
+        data = b''.join(iter(lambda: stream.read(5), b''))
+        self.assertEqual(data, (
+            binarycopy.HEADER + struct.pack('!hihi1s', 2, 2, 1, 1, b'a') + struct.pack('!hihi', 2, 2, 2, -1) +
+            binarycopy.TRAILER
+        ))
+        self.assertEqual(binarycopy.BinaryRowStream([(1, 'a'), ('2', '<NULL>')], ('smallint', 'text')).read(), data)
+
+    def test_encode(self):
+        """Test encoding the values of each column type.
+        """
+        stream = binarycopy.BinaryRowStream([], (
+            'integer', 'bigint', 'boolean', 'boolean', 'timestamptz', 'timestamptz', 'uuid', 'varchar', 'date', 'date'
+        ))
+        guid = uuid.uuid4()
+        self.assertEqual(
+            stream.encode((
+                '-1', 2 ** 40, 'True', False, '2000-01-01T00:00:01.500', datetime.datetime(1999, 12, 31, 23, 59),
+                str(guid), 'new\nline, "quoted" \\', '2000-01-03', datetime.date(1999, 12, 31)
+            )),
+            struct.pack('!hiiiqi?i?iqiq', 10, 4, -1, 8, 2 ** 40, 1, True, 1, False, 8, 1500000, 8, -60000000) +
+            struct.pack('!i', 16) + guid.bytes + struct.pack('!i', 20) + b'new\nline, "quoted" \\' +
+            struct.pack('!iiii', 4, 2, 4, -1)
+        )
+
+    def test_unknown_type(self):
+        """Test that creating a stream for a column type that cannot be encoded fails.
+        """
+        with self.assertRaisesRegex(ValueError, 'numeric'):
+            binarycopy.BinaryRowStream([], ('integer', 'numeric'))
+
+    def test_lazy(self):
+        """Test that rows are only pulled from the iterable when they are read.
+        """
+        rows = itertools.count()
+        stream = binarycopy.BinaryRowStream(((i, ) for i in rows), ('bigint', ))
+        stream.read(100)
+        self.assertLess(next(rows), 10)
+
+
+class BinaryCopyTests(TestCase):
+    """Binary COPY tests
+    """
+    def test_copy(self):
+        """Test that the database reads the rows encoded by the stream.
+        """
+        guid = uuid.uuid4()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE binary_copy "
+                "(id bigint, flag boolean, created timestamptz, guid uuid, body text, day date)"
+            )
+            cursor.copy_expert("COPY binary_copy FROM STDIN WITH (FORMAT binary)", binarycopy.BinaryRowStream(
+                [(1, 'False', '2020-01-04T00:30:00.250', str(guid), 'Nice, but\\n what?\nSecond, <b>line</b>',
+                  '2020-01-04'),
+                 (2, None, '<NULL>', None, '<NULL>', None)],
+                ('bigint', 'boolean', 'timestamptz', 'uuid', 'text', 'date')
+            ))
+            self.assertEqual(cursor.rowcount, 2)
+            cursor.execute("SELECT * FROM binary_copy ORDER BY id")
+            self.assertEqual(cursor.fetchall(), [
+                (1, False, datetime.datetime(2020, 1, 4, 0, 30, 0, 250000, tzinfo=datetime.UTC), guid,
+                 'Nice, but\\n what?\nSecond, <b>line</b>', datetime.date(2020, 1, 4)),
+                (2, None, None, None, None, None)
+            ])
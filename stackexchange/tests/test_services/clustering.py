@@ -0,0 +1,52 @@
+"""Table clustering tests
+"""
+from unittest import mock
+
+from django.db import connection
+from django.utils import timezone
+
+from stackexchange import models
+from stackexchange.services import archive, clustering, dowloader, loader, metrics
+from .base import DumpTestCase
+
+
+@mock.patch.object(loader.TagLoader, 'update_tag_flags')
+@mock.patch.object(dowloader.Downloader, 'get_file')
+class ClusteringTests(DumpTestCase):
+    """Table clustering tests
+    """
+    def test_reorganize(self, *_):
+        """Test that the tables completed by a load, and only them, are rewritten in the order of their cluster key, and
+        that the correlation of the key is recorded in their metrics.
+        """
+        data_loader = loader.SiteDataLoader(site=self.site.name, profile='metadata-only', cluster=True)
+        started_at = timezone.now()
+        data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        data_loader.analyze(started_at)
+        data_loader.reorganize(started_at)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT owner_id FROM posts ORDER BY ctid")
+            owners = [owner_id for owner_id, in cursor.fetchall()]
+            self.assertEqual(owners, sorted(owners, key=lambda owner_id: (owner_id is None, owner_id)))
+            cursor.execute(
+                "SELECT pg_index.indrelid::regclass::text FROM pg_index WHERE pg_index.indisclustered "
+                "AND pg_index.indrelid IN ('posts'::regclass, 'post_comments'::regclass, 'post_history'::regclass)"
+            )
+            self.assertEqual({table for table, in cursor.fetchall()}, {'posts'})
+
+        table_metrics = metrics.TableMetrics.from_dict(models.LoadManifest.objects.get(table_name='posts').metrics)
+        self.assertEqual(table_metrics.cluster_key, 'owner_id')
+        self.assertIsNotNone(table_metrics.correlation_before)
+        self.assertAlmostEqual(table_metrics.correlation_after, 1.0)
+        self.assertIn('cluster', table_metrics.phases)
+        self.assertIn('vacuum', table_metrics.phases)
+        self.assertEqual(data_loader.report(started_at, {})['tables']['posts']['cluster_key'], 'owner_id')
+
+    def test_cluster_index(self, *_):
+        """Test finding the index that a table is clustered with.
+        """
+        with connection.cursor() as cursor:
+            self.assertTrue(clustering.cluster_index(cursor, 'post_comments', 'post_id').startswith('post_comments_'))
+            with self.assertRaises(ValueError):
+                clustering.cluster_index(cursor, 'post_comments', 'text')
@@ -0,0 +1,123 @@
+"""Downloader tests
+"""
+import hashlib
+import http.server
+import json
+import pathlib
+import re
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from stackexchange.services import dowloader
+
+
+class DumpRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the dump file, with support for conditional and byte range requests.
+    """
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle a GET request.
+        """
+        server = self.server
+        server.requests.append(dict(self.headers))
+        etag = f'"{server.etag}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        content = server.content
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if match and self.headers.get('If-Range', etag) == etag:
+            start, end = int(match.group(1)), int(match.group(2)) + 1
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end - 1}/{len(content)}")
+            content = content[start:end]
+        else:
+            self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        """Do not log the requests.
+        """
+
+
+class DownloaderTests(SimpleTestCase):
+    """Downloader tests
+    """
+    CONTENT = bytes(range(256)) * 40
+
+    def setUp(self):
+        """Start the HTTP server, and create the cache directory.
+        """
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), DumpRequestHandler)
+        self.server.content = self.CONTENT
+        self.server.etag = hashlib.md5(self.CONTENT).hexdigest()
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = pathlib.Path(temp_dir.name)
+
+        patcher = mock.patch.object(dowloader.Downloader, 'PART_SIZE', 1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def downloader(self) -> dowloader.Downloader:
+        """Create a downloader for the test server.
+
+        :return: The downloader.
+        """
+        return dowloader.Downloader(
+            filename='site.7z', base_url=f"http://127.0.0.1:{self.server.server_port}", cache_dir=self.cache_dir)
+
+    def ranges(self) -> list[str]:
+        """Get the byte ranges that were requested.
+
+        :return: The ranges.
+        """
+        return sorted(request['Range'] for request in self.server.requests if 'Range' in request)
+
+    def test_get_file(self):
+        """Test that the file is downloaded in parts, and that it is not downloaded again if it has not changed.
+        """
+        self.assertEqual(self.downloader().get_file().read_bytes(), self.CONTENT)
+        self.assertEqual(len(self.ranges()), 11)
+        self.assertEqual((self.cache_dir / 'site.7z.etag').read_text(), self.server.etag)
+        self.assertFalse((self.cache_dir / 'site.7z.part.json').exists())
+
+        self.server.requests.clear()
+        self.assertEqual(self.downloader().get_file().read_bytes(), self.CONTENT)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0]['If-None-Match'], f'"{self.server.etag}"')
+
+    def test_get_file_resume(self):
+        """Test that an interrupted download resumes from the parts that were not completed.
+        """
+        part_file = self.cache_dir / 'site.7z.part'
+        part_file.write_bytes(self.CONTENT[:3000].ljust(len(self.CONTENT), b'\0'))
+        (self.cache_dir / 'site.7z.part.json').write_text(json.dumps({
+            'etag': self.server.etag, 'size': len(self.CONTENT), 'part_size': 1000, 'parts': [0, 1, 2]
+        }))
+
+        self.assertEqual(self.downloader().get_file().read_bytes(), self.CONTENT)
+        self.assertEqual(len(self.ranges()), 8)
+        self.assertNotIn('bytes=0-999', self.ranges())
+
+    def test_get_file_checksum_mismatch(self):
+        """Test that a download that does not match its checksum is discarded.
+        """
+        self.server.etag = hashlib.md5(b'other').hexdigest()
+
+        with self.assertRaises(ValueError):
+            self.downloader().get_file()
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
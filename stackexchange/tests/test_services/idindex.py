@@ -0,0 +1,69 @@
+"""Identifier index tests
+"""
+import pathlib
+import tempfile
+
+from django.test import SimpleTestCase
+
+from stackexchange.services import idindex
+
+
+class IdMapTests(SimpleTestCase):
+    """Identifier map tests
+    """
+    def test_get(self):
+        """Test looking up identifiers.
+        """
+        id_map = idindex.IdMap.build([(-1, 10), (1, 11), (5, 12)])
+
+        self.assertEqual(id_map.get(-1), 10)
+        self.assertEqual(id_map.get(5), 12)
+        self.assertIsNone(id_map.get(2))
+        self.assertEqual(id_map.get(6, '<NULL>'), '<NULL>')
+        self.assertIn(1, id_map)
+        self.assertNotIn(0, id_map)
+        self.assertEqual(len(id_map), 3)
+        self.assertEqual(id_map.nbytes, 48)
+        self.assertEqual(id_map.get_many([5, None, 2, -1], default=0), [12, 0, 0, 10])
+
+    def test_cached(self):
+        """Test that the map is built once, and then read from its file.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / 'users.idx'
+            idindex.IdMap.cached(path, lambda: idindex.IdMap.build([(1, 2), (3, 4)]))
+            id_map = idindex.IdMap.cached(path, lambda: self.fail("The map should not be built again"))
+
+        self.assertEqual(list(id_map.keys), [1, 3])
+        self.assertEqual(list(id_map.values), [2, 4])
+
+
+class IdSetTests(SimpleTestCase):
+    """Identifier set tests
+    """
+    def test_contains(self):
+        """Test checking if identifiers exist.
+        """
+        id_set = idindex.IdSet.build([1, 8, 20], max_id=20)
+
+        self.assertIn(1, id_set)
+        self.assertIn(8, id_set)
+        self.assertIn(20, id_set)
+        self.assertNotIn(0, id_set)
+        self.assertNotIn(21, id_set)
+        self.assertNotIn(1000, id_set)
+        self.assertNotIn(-1, id_set)
+        self.assertEqual(len(id_set), 3)
+        self.assertEqual(id_set.nbytes, 3)
+        self.assertEqual(id_set.contains_many([20, 21, 1000, -1, 0, 1]), [True, False, False, False, False, True])
+
+    def test_cached(self):
+        """Test that the set is built once, and then read from its file.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / 'posts.idx'
+            idindex.IdSet.cached(path, lambda: idindex.IdSet.build([3, 9], max_id=9))
+            id_set = idindex.IdSet.cached(path, lambda: self.fail("The set should not be built again"))
+
+        self.assertEqual(len(id_set), 2)
+        self.assertEqual([identifier for identifier in range(16) if identifier in id_set], [3, 9])
@@ -0,0 +1,640 @@
+"""Site data loader tests
+"""
+from collections.abc import Iterable
+import datetime
+import itertools
+import pathlib
+import re
+import tempfile
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase
+from django.utils import timezone
+import py7zr
+
+from stackexchange import enums, models
+from stackexchange.services import archive, bulkload, dowloader, idindex, loader, shadow, xmlparser
+from .base import DUMP_FILES, DumpTestCase
+
+
+@mock.patch.object(loader.TagLoader, 'update_tag_flags')
+@mock.patch.object(dowloader.Downloader, 'get_file')
+class SiteDataLoaderTests(DumpTestCase):
+    """Site data loader tests
+    """
+    # The names of the column types in the database catalog
+    COLUMN_TYPE_NAMES = {
+        'smallint': 'smallint', 'integer': 'integer', 'bigint': 'bigint', 'boolean': 'boolean', 'text': 'text',
+        'varchar': 'character varying', 'timestamptz': 'timestamp with time zone', 'uuid': 'uuid',
+        'date': 'date'
+    }
+
+    def test_load_tables(self, *_):
+        """Test loading all the tables from the dump files, streaming the rows to the database.
+        """
+        loader.SiteDataLoader(site=self.site.name).load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertFalse((self.data_dir / 'posts.csv').exists())
+
+    def test_load_tables_shards(self, *_):
+        """Test loading all the tables from the dump files, splitting the input files in shards.
+        """
+        loader.SiteDataLoader(site=self.site.name, shards=3).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+
+    def test_load_tables_csv_files(self, *_):
+        """Test loading all the tables from the dump files, through CSV files.
+        """
+        loader.SiteDataLoader(site=self.site.name, csv_files=True).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertTrue((self.data_dir / 'posts.csv').exists())
+
+    def test_load_tables_staging(self, *_):
+        """Test loading all the tables from the dump files through staging tables.
+        """
+        loader.SiteDataLoader(site=self.site.name, staging=True).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertFalse((self.data_dir / 'site_users.idx').exists())
+
+    def test_load_tables_staging_shards(self, *_):
+        """Test loading all the tables from the dump files through staging tables, splitting the input files in shards.
+        """
+        loader.SiteDataLoader(site=self.site.name, staging=True, shards=3).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+
+    def test_load_tables_binary(self, *_):
+        """Test loading all the tables from the dump files, streaming the rows in the binary format.
+        """
+        loader.SiteDataLoader(site=self.site.name, binary=True, shards=3).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+
+    def test_load_tables_binary_staging(self, *_):
+        """Test loading all the tables from the dump files through staging tables, streaming the rows in the binary
+        format.
+        """
+        loader.SiteDataLoader(site=self.site.name, binary=True, staging=True).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+
+    def test_load_tables_profiles(self, *_):
+        """Test loading the tables with load profiles that thin out the rows and clear the columns of the tables, or do
+        not load some of the tables.
+        """
+        loader.SiteDataLoader(site=self.site.name, shards=2, profile='api-core').load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assertEqual(list(models.PostVote.objects.values_list('pk', flat=True)), [3])
+        self.assertEqual(models.PostVoteRollup.objects.count(), 4)
+        self.assertEqual(models.PostHistory.objects.count(), 2)
+        self.assertFalse(models.PostHistory.objects.filter(text__isnull=False).exists())
+        self.assertEqual(models.Post.objects.get(pk=1).body, "<p>How, exactly?\nLine \\ two</p>")
+
+        loader.SiteDataLoader(site=self.site.name, staging=True, profile='metadata-only').load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assertEqual(models.SiteUser.objects.count(), 3)
+        self.assertFalse(models.SiteUser.objects.filter(about__isnull=False).exists())
+        self.assertEqual(set(models.Post.objects.values_list('body', flat=True)), {''})
+        self.assertEqual(set(models.Post.objects.filter(title_search='question').values_list('pk', flat=True)), {1, 3})
+        self.assertEqual(models.PostTag.objects.count(), 3)
+        self.assertEqual(models.PostVoteRollup.objects.count(), 4)
+        for model in (models.PostVote, models.PostComment, models.PostHistory, models.PostLink):
+            self.assertFalse(model.objects.exists())
+
+    def test_load_tables_vote_rollups(self, *_):
+        """Test loading only the daily rollups of the votes, flushing partial rollups that are summed when they are
+        merged.
+        """
+        with (
+            mock.patch.object(loader.PostVoteRollupLoader, 'MAX_ROLLUPS', 1),
+            mock.patch.object(loader.FileScanner, 'CHUNK_SIZE', 1)
+        ):
+            loader.SiteDataLoader(site=self.site.name, shards=2, binary=True, profile='vote-rollups').load_tables(
+                dump=archive.DumpArchive({}, self.data_dir))
+        self.assertFalse(models.PostVote.objects.exists())
+        self.assert_vote_rollups_loaded()
+        self.assertEqual(models.PostComment.objects.count(), 2)
+
+        # Votes of the same post, type and day that are flushed apart are summed
+        self.edit_dump_file('Votes.xml', '</votes>', (
+            '<row Id="6" PostId="1" VoteTypeId="2" CreationDate="2020-01-04T12:00:00.000" />'
+            '<row Id="7" PostId="1" VoteTypeId="3" CreationDate="2020-01-04T13:00:00.000" /></votes>'
+        ))
+        with (
+            mock.patch.object(loader.PostVoteRollupLoader, 'MAX_ROLLUPS', 1),
+            mock.patch.object(loader.FileScanner, 'CHUNK_SIZE', 1)
+        ):
+            loader.SiteDataLoader(site=self.site.name, staging=True, profile='vote-rollups').load_tables(
+                dump=archive.DumpArchive({}, self.data_dir))
+        self.assertEqual(
+            models.PostVoteRollup.objects.get(post_id=1, type=enums.PostVoteType.UP_MOD, day='2020-01-04').count, 2)
+        self.assertEqual(models.Post.objects.values_list('up_vote_count', 'down_vote_count').get(pk=1), (2, 1))
+
+    def test_profiles(self, *_):
+        """Test that the load profiles load the tables that the loaded tables depend on, and only clear the columns
+        that can be null to null.
+        """
+        for profile in loader.LOAD_PROFILES.values():
+            with self.subTest(profile=profile.name):
+                tables = {
+                    loader_class.TABLE_NAME: loader_class for loader_class in loader.SiteDataLoader.LOADERS
+                    if profile.includes(loader_class.TABLE_NAME)
+                }
+                for loader_class in tables.values():
+                    self.assertLessEqual(set(loader_class.DEPENDENCIES), set(tables))
+                for table, columns in profile.cleared_columns.items():
+                    model = next(model for model in apps.get_models() if model._meta.db_table == table)
+                    for column, value in columns.items():
+                        self.assertIn(column, tables[table].TABLE_COLUMNS)
+                        self.assertEqual(value == '<NULL>', model._meta.get_field(column).null)
+                self.assertLessEqual(set(profile.rows), set(tables))
+
+    def test_column_types(self, *_):
+        """Test that the column types of the loaders match the types of the columns to which the rows are copied.
+        """
+        with connection.cursor() as cursor:
+            for loader_class, delta in itertools.product(loader.SiteDataLoader.LOADERS, (False, True)):
+                with self.subTest(table=loader_class.TABLE_NAME, delta=delta):
+                    data_loader = loader_class(site_id=self.site.pk, data_dir=self.data_dir, delta=delta)
+                    table = loader_class.TABLE_NAME
+                    if data_loader.staging:
+                        loader_class.create_staging_table(cursor, delta)
+                        table = loader_class.staging_table_name()
+                    cursor.execute(
+                        "SELECT attname, format_type(atttypid, NULL) FROM pg_attribute "
+                        "WHERE attrelid = %s::regclass AND attnum > 0", [table]
+                    )
+                    table_types = dict(cursor.fetchall())
+                    columns = (*loader_class.TABLE_COLUMNS, 'fingerprint') if delta else loader_class.TABLE_COLUMNS
+                    self.assertEqual(
+                        [self.COLUMN_TYPE_NAMES[column_type] for column_type in data_loader.column_types()],
+                        [table_types[column] for column in columns]
+                    )
+
+    def test_load_tables_bulk(self, *_):
+        """Test bulk loading all the tables from the dump files, and that the indexes, constraints and triggers are
+        created again.
+        """
+        schema_objects = self.schema_objects()
+        loader.SiteDataLoader(site=self.site.name, bulk=True).load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertEqual(self.schema_objects(), schema_objects)
+
+    def test_load_tables_bulk_staging_shards(self, *_):
+        """Test bulk loading all the tables from the dump files through staging tables, splitting the input files in
+        shards.
+        """
+        schema_objects = self.schema_objects()
+        loader.SiteDataLoader(site=self.site.name, shards=3, staging=True, bulk=True).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertEqual(self.schema_objects(), schema_objects)
+
+    def test_resume_bulk(self, *_):
+        """Test that resuming a bulk load that was interrupted before it created the dropped indexes, constraints and
+        triggers again creates them from the definitions saved to the load manifest.
+        """
+        schema_objects = self.schema_objects()
+        with mock.patch.object(bulkload.TableObjects, 'restore', side_effect=ValueError("Interrupted")):
+            with self.assertRaisesRegex(Exception, "Interrupted"):
+                loader.SiteDataLoader(site=self.site.name, bulk=True).load_tables(
+                    dump=archive.DumpArchive({}, self.data_dir))
+        manifest = models.LoadManifest.objects.get(table_name='site_users')
+        self.assertEqual(manifest.status, enums.LoadStatus.STARTED)
+        self.assertTrue(manifest.table_objects['indexes'])
+        self.assertNotEqual(self.schema_objects(), schema_objects)
+
+        loader.SiteDataLoader(site=self.site.name, bulk=True, resume=True).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        self.assertEqual(self.schema_objects(), schema_objects)
+
+    def test_load_tables_shadow(self, *_):
+        """Test loading all the tables to a shadow schema, swapping it with the live tables, and rolling back.
+        """
+        schema_objects = self.schema_objects()
+        models.SiteUser.objects.create(
+            site=self.site, unique_id=100, display_name='Live', last_access_date=datetime.datetime.now(datetime.UTC))
+        data_loader = loader.SiteDataLoader(site=self.site.name, shards=3, staging=True, bulk=True)
+        schema = shadow.ShadowSchema(data_loader.table_names())
+        with schema.loading():
+            data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+            self.assertEqual(models.SiteUser.objects.count(), 3)
+        self.assertEqual(list(models.SiteUser.objects.values_list('unique_id', flat=True)), [100])
+
+        schema.swap()
+        self.assert_tables_loaded()
+        self.assertEqual(self.schema_objects(), schema_objects)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT unique_id FROM {shadow.PREVIOUS_SCHEMA}.site_users")
+            self.assertEqual(cursor.fetchall(), [(100, )])
+
+        schema.rollback()
+        self.assertEqual(list(models.SiteUser.objects.values_list('unique_id', flat=True)), [100])
+        self.assertEqual(self.schema_objects(), schema_objects)
+        schema.rollback()
+        self.assert_tables_loaded()
+
+    def test_load_tables_delta(self, *_):
+        """Test loading the differences of a dump from the previous load.
+        """
+        loader.SiteDataLoader(site=self.site.name, delta=True).load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        last_modified_date = models.SiteUser.objects.get(unique_id=1).last_modified_date
+
+        # Bob is deleted, along with a vote, and the title of a question changes
+        self.edit_dump_file('Users.xml', r'\s*<row Id="2" .*/>', '')
+        self.edit_dump_file('Votes.xml', r'\s*<row Id="1" .*/>', '')
+        self.edit_dump_file('Posts.xml', 'Title="A question"', 'Title="A better question"')
+        loader.SiteDataLoader(site=self.site.name, delta=True, shards=3).load_tables(
+            dump=archive.DumpArchive({}, self.data_dir))
+        self.assertEqual(set(models.SiteUser.objects.values_list('unique_id', flat=True)), {-1, 1})
+        self.assertEqual(models.SiteUser.objects.get(unique_id=1).last_modified_date, last_modified_date)
+        self.assertEqual(set(models.UserBadge.objects.values_list('user__unique_id', 'badge__name')), {(1, 'Teacher')})
+        self.assertEqual(models.Post.objects.get(pk=1).title, 'A better question')
+        self.assertEqual(set(models.Post.objects.filter(title_search='better').values_list('pk', flat=True)), {1})
+        self.assertIsNone(models.Post.objects.get(pk=2).owner_id)
+        self.assertEqual(models.Post.objects.get(pk=2).last_editor.unique_id, 1)
+        self.assertEqual(set(models.PostVote.objects.values_list('pk', flat=True)), {2, 3, 5})
+        self.assertIsNone(models.PostVote.objects.get(pk=3).user_id)
+        self.assertFalse(models.PostVoteRollup.objects.filter(post_id=1, type=enums.PostVoteType.UP_MOD).exists())
+        self.assertEqual(models.PostVoteRollup.objects.count(), 3)
+        self.assertEqual(
+            dict(models.Post.objects.filter(pk__in=(1, 2)).values_list('pk', 'up_vote_count')), {1: 0, 2: 1})
+        self.assertIsNone(models.PostComment.objects.get(pk=1).user_id)
+        self.assertEqual(
+            set(models.PostTag.objects.values_list('post_id', 'tag__name')),
+            {(1, 'python'), (1, 'django'), (3, 'python')}
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM post_votes_fingerprints")
+            self.assertEqual({vote_id for vote_id, in cursor.fetchall()}, {2, 3, 4, 5})
+
+    def edit_dump_file(self, filename: str, pattern: str, replacement: str):
+        """Replace the text of a dump file that matches a pattern.
+
+        :param filename: The dump file name.
+        :param pattern: The regular expression.
+        :param replacement: The replacement text.
+        """
+        path = self.data_dir / filename
+        path.write_text(re.sub(pattern, replacement, path.read_text(encoding='utf-8')), encoding='utf-8')
+
+    def test_rollback_without_previous_tables(self, *_):
+        """Test that rolling back fails when no load was swapped with the live tables.
+        """
+        with self.assertRaises(ValueError):
+            shadow.ShadowSchema(loader.SiteDataLoader.table_names()).rollback()
+
+    @staticmethod
+    def schema_objects() -> set[str]:
+        """Get the definitions of the indexes, constraints and triggers of the tables.
+
+        :return: The definitions.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_indexdef(indexrelid) FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indrelid "
+                "WHERE pg_class.relnamespace = 'public'::regnamespace UNION ALL "
+                "SELECT conrelid::regclass || ' ' || pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE connamespace = 'public'::regnamespace UNION ALL "
+                "SELECT pg_get_triggerdef(pg_trigger.oid) FROM pg_trigger JOIN pg_class ON pg_class.oid = tgrelid "
+                "WHERE pg_class.relnamespace = 'public'::regnamespace AND NOT tgisinternal"
+            )
+            return {definition for definition, in cursor.fetchall()}
+
+    def test_load_tables_archive(self, get_file, _):
+        """Test loading all the tables from a dump archive, extracting each file when it is needed.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_file = pathlib.Path(temp_dir) / 'example.stackexchange.com.7z'
+            self.write_archive(archive_file, DUMP_FILES)
+            extract_dir = pathlib.Path(temp_dir) / 'data'
+            extract_dir.mkdir()
+
+            timings = loader.SiteDataLoader(site=self.site.name, shards=2).load_tables(
+                dump=archive.DumpArchive({filename: archive_file for filename in DUMP_FILES}, extract_dir))
+            self.assert_tables_loaded()
+            self.assertEqual(list(extract_dir.glob('*.xml')), [])
+            self.assertIn('example.stackexchange.com.7z', timings)
+            get_file.assert_called_once()
+
+    def test_load_tables_snapshots(self, *_):
+        """Test loading all the tables from a dump archive with snapshots, and loading the same archive again from the
+        snapshots.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_file = pathlib.Path(temp_dir) / 'example.stackexchange.com.7z'
+            self.write_archive(archive_file, DUMP_FILES)
+            (pathlib.Path(temp_dir) / 'example.stackexchange.com.7z.etag').write_text('1a2b3c')
+            extract_dir = pathlib.Path(temp_dir) / 'data'
+            extract_dir.mkdir()
+            dump = archive.DumpArchive({filename: archive_file for filename in DUMP_FILES}, extract_dir)
+
+            loader.SiteDataLoader(site=self.site.name, shards=2, snapshots=True).load_tables(dump=dump)
+            self.assert_tables_loaded()
+            snapshot_files = sorted(path.name for path in (pathlib.Path(temp_dir) / 'snapshots').iterdir())
+            self.assertEqual(len(snapshot_files), len(loader.SiteDataLoader.LOADERS))
+
+            # The tables that were loaded from the same snapshots are skipped
+            with mock.patch.object(xmlparser.XmlFileIterator, 'batches') as iterator:
+                loader.SiteDataLoader(site=self.site.name, snapshots=True).load_tables(dump=dump)
+                iterator.assert_not_called()
+            self.assert_tables_loaded()
+
+            # A new database is loaded from the snapshots, without parsing the input files
+            models.LoadManifest.objects.all().delete()
+            with mock.patch.object(xmlparser.XmlFileIterator, 'batches') as iterator:
+                loader.SiteDataLoader(site=self.site.name, shards=2, snapshots=True).load_tables(dump=dump)
+                iterator.assert_not_called()
+            self.assert_tables_loaded()
+
+            # A new loader version parses its input file again, and replaces the previous snapshot
+            with (
+                mock.patch.object(loader.PostLinkLoader, 'VERSION', 2),
+                mock.patch.object(
+                    xmlparser.XmlFileIterator, 'batches', autospec=True,
+                    side_effect=xmlparser.XmlFileIterator.batches
+                ) as iterator
+            ):
+                loader.SiteDataLoader(site=self.site.name, snapshots=True).load_tables(dump=dump)
+            self.assertEqual([call.args[0].xml_file.name for call in iterator.call_args_list], ['PostLinks.xml'])
+            self.assert_tables_loaded()
+            self.assertNotEqual(
+                sorted(path.name for path in (pathlib.Path(temp_dir) / 'snapshots').iterdir()), snapshot_files)
+            self.assertEqual(len(list((pathlib.Path(temp_dir) / 'snapshots').iterdir())), len(snapshot_files))
+
+    def test_load_tables_resume(self, *_):
+        """Test resuming a load that failed while loading a shard, reloading only the failed shard and the tables that
+        were not completed.
+        """
+        transform_batch = loader.PostVoteLoader.transform_batch
+
+        def fail_last_vote(post_vote_loader: loader.PostVoteLoader, chunk: loader.Chunk):
+            if '5' in chunk.column('Id'):
+                raise ValueError("Interrupted")
+            return transform_batch(post_vote_loader, chunk)
+
+        with mock.patch.object(loader.PostVoteLoader, 'transform_batch', autospec=True, side_effect=fail_last_vote):
+            with self.assertRaisesRegex(Exception, "Interrupted"):
+                loader.SiteDataLoader(site=self.site.name, shards=2).load_tables(
+                    dump=archive.DumpArchive({}, self.data_dir))
+        manifest = models.LoadManifest.objects.get(table_name='post_votes')
+        self.assertEqual(manifest.status, enums.LoadStatus.STARTED)
+        self.assertEqual(list(manifest.checkpoints.values_list('shard', flat=True)), [0])
+
+        with mock.patch.object(
+                xmlparser.XmlFileIterator, 'batches', autospec=True, side_effect=xmlparser.XmlFileIterator.batches
+        ) as iterator:
+            loader.SiteDataLoader(site=self.site.name, shards=2, resume=True).load_tables(
+                dump=archive.DumpArchive({}, self.data_dir))
+        self.assert_tables_loaded()
+        parsed_files = [call.args[0].xml_file.name for call in iterator.call_args_list]
+        self.assertEqual(parsed_files.count('Votes.xml'), 1)
+        self.assertNotIn('Users.xml', parsed_files)
+        self.assertNotIn('Posts.xml', parsed_files)
+        self.assertIn('Comments.xml', parsed_files)
+        self.assertEqual(
+            dict(models.LoadManifest.objects.values_list('table_name', 'rows')),
+            {
+                'site_users': 3, 'badges': 3, 'user_badges': 3, 'posts': 5, 'tags': 2, 'post_tags': 3,
+                'post_votes': 4, 'post_vote_rollups': 4, 'post_comments': 2, 'post_history': 2, 'post_links': 1
+            }
+        )
+        self.assertFalse(models.LoadCheckpoint.objects.exists())
+
+    def test_report(self, *_):
+        """Test that the report of a load has the metrics of each table, added up from all its shards, and that the
+        tables that were not loaded again by a resumed load are skipped.
+        """
+        started_at = timezone.now()
+        data_loader = loader.SiteDataLoader(site=self.site.name, shards=2, staging=True)
+        timings = data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        report = data_loader.report(started_at, timings)
+        self.assertEqual((report['site'], report['shards'], report['profile']), (self.site.name, 2, 'full'))
+        self.assertTrue(report['options']['staging'])
+        self.assertEqual(report['tasks'], timings)
+        votes = report['tables']['post_votes']
+        self.assertFalse(votes['skipped'])
+        self.assertEqual(
+            (votes['rows_read'], votes['rows_copied'], votes['rows_written'], votes['rows_dropped']), (5, 5, 4, 1))
+        # The shards only read the rows of the file
+        self.assertLess(0, votes['bytes_read'])
+        self.assertLess(votes['bytes_read'], (self.data_dir / 'Votes.xml').stat().st_size)
+        self.assertEqual([phase['name'] for phase in votes['phases']], ['copy', 'merge', 'finalize'])
+        self.assertGreater(votes['phases'][0]['peak_rss'], 0)
+        self.assertIsNone(votes['phases'][0]['peak_traced'])
+        rollups = report['tables']['post_vote_rollups']
+        self.assertEqual((rollups['rows_read'], rollups['rows_written'], rollups['bytes_read']), (5, 4, 0))
+        links = report['tables']['post_links']
+        self.assertEqual((links['rows_read'], links['rows_written'], links['rows_dropped']), (2, 1, 1))
+
+        started_at = timezone.now()
+        data_loader = loader.SiteDataLoader(site=self.site.name, resume=True)
+        report = data_loader.report(started_at, data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir)))
+        self.assertTrue(all(table['skipped'] for table in report['tables'].values()))
+
+    def test_resume_delta(self, *_):
+        """Test that deltas cannot be resumed.
+        """
+        with self.assertRaises(ValueError):
+            loader.SiteDataLoader(site=self.site.name, delta=True, resume=True)
+
+    def test_delta_profile(self, *_):
+        """Test that deltas cannot be loaded with a profile that does not load all the rows of all the tables, as the
+        rows of the tables that are not loaded would keep referencing the rows that the delta deletes.
+        """
+        for profile in loader.LOAD_PROFILES:
+            with self.subTest(profile=profile):
+                if profile == 'full':
+                    loader.SiteDataLoader(site=self.site.name, delta=True, profile=profile)
+                else:
+                    with self.assertRaises(ValueError):
+                        loader.SiteDataLoader(site=self.site.name, delta=True, profile=profile)
+
+    def test_load_tables_split_archives(self, get_file, _):
+        """Test loading all the tables from a dump that is split in one archive per file.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_files = {
+                filename: pathlib.Path(temp_dir) / loader.SiteDataLoader.archive_name('stackoverflow.com', filename)
+                for filename in DUMP_FILES
+            }
+            for filename, archive_file in archive_files.items():
+                self.write_archive(archive_file, [filename])
+            extract_dir = pathlib.Path(temp_dir) / 'data'
+            extract_dir.mkdir()
+
+            timings = loader.SiteDataLoader(site=self.site.name).load_tables(
+                dump=archive.DumpArchive(archive_files, extract_dir))
+            self.assert_tables_loaded()
+            self.assertIn('stackoverflow.com-Posts.7z', timings)
+            self.assertEqual(get_file.call_count, len(DUMP_FILES))
+
+    def write_archive(self, archive_file: pathlib.Path, filenames: Iterable[str]):
+        """Write dump files to an archive.
+
+        :param archive_file: The archive file.
+        :param filenames: The names of the dump files to write.
+        """
+        with py7zr.SevenZipFile(archive_file, mode='w') as f:
+            for filename in filenames:
+                f.write(self.data_dir / filename, arcname=filename)
+
+    def assert_tables_loaded(self):
+        """Assert that the tables contain the data of the dump files.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_name LIKE '%_staging'")
+            self.assertEqual(cursor.fetchall(), [])
+
+        self.assertEqual(models.SiteUser.objects.filter(site=self.site).count(), 3)
+        self.assertEqual(
+            dict(models.Badge.objects.values_list('name', 'pk')), {'Teacher': 1, 'python': 3, 'Student': 4})
+        self.assertEqual(
+            set(models.UserBadge.objects.values_list('user__unique_id', 'badge__name')),
+            {(1, 'Teacher'), (2, 'Teacher'), (2, 'python')}
+        )
+        self.assertEqual(models.Post.objects.count(), 5)
+        self.assertEqual(models.Post.objects.get(pk=1).accepted_answer_id, 2)
+        self.assertEqual(models.Post.objects.get(pk=1).body, "<p>How, exactly?\nLine \\ two</p>")
+        self.assertEqual(models.Post.objects.get(pk=1).owner.display_name, 'Alice')
+        self.assertEqual(set(models.Post.objects.filter(title_search='question').values_list('pk', flat=True)), {1, 3})
+        self.assertEqual(models.Post.objects.get(pk=2).last_editor.display_name, 'Alice')
+        self.assertIsNone(models.Post.objects.get(pk=3).accepted_answer_id)
+        self.assertIsNone(models.Post.objects.get(pk=3).owner_id)
+        self.assertEqual(models.Tag.objects.get(name='python').wiki_id, 5)
+        self.assertEqual(
+            set(models.PostTag.objects.values_list('post_id', 'tag__name')),
+            {(1, 'python'), (1, 'django'), (3, 'python')}
+        )
+        self.assertEqual(set(models.PostVote.objects.values_list('pk', flat=True)), {1, 2, 3, 5})
+        self.assertEqual(models.PostVote.objects.get(pk=3).user.unique_id, 2)
+        self.assert_vote_rollups_loaded()
+        self.assertEqual(models.PostComment.objects.get(pk=1).user.unique_id, 2)
+        self.assertIsNone(models.PostComment.objects.get(pk=2).user_id)
+        self.assertEqual(
+            models.PostComment.objects.get(pk=1).text, 'Nice, but\\n what about "this"?\nSecond line')
+        self.assertEqual(set(models.PostHistory.objects.values_list('pk', flat=True)), {1, 2})
+        self.assertEqual(models.PostHistory.objects.get(pk=1).user.unique_id, 1)
+        self.assertEqual(list(models.PostLink.objects.values_list('pk', flat=True)), [1])
+
+    def assert_vote_rollups_loaded(self):
+        """Assert that the vote rollups and the vote counts of the posts match the votes of the dump file.
+        """
+        self.assertEqual(
+            set(models.PostVoteRollup.objects.values_list('post_id', 'type', 'day', 'count', 'bounty_sum')),
+            {
+                (1, enums.PostVoteType.UP_MOD, datetime.date(2020, 1, 4), 1, 0),
+                (2, enums.PostVoteType.UP_MOD, datetime.date(2020, 1, 4), 1, 0),
+                (1, enums.PostVoteType.FAVORITE, datetime.date(2020, 1, 5), 1, 0),
+                (1, enums.PostVoteType.BOUNTY_START, datetime.date(2020, 1, 6), 1, 50)
+            }
+        )
+        self.assertEqual(
+            set(models.Post.objects.values_list('pk', 'up_vote_count', 'down_vote_count')),
+            {(1, 1, 0), (2, 1, 0), (3, 0, 0), (4, 0, 0), (5, 0, 0)}
+        )
+
+    def test_single_pass(self, *_):
+        """Test that each input file is parsed only once.
+        """
+        with mock.patch.object(
+                xmlparser.XmlFileIterator, 'batches', autospec=True, side_effect=xmlparser.XmlFileIterator.batches
+        ) as iterator:
+            loader.SiteDataLoader(site=self.site.name).load_tables(dump=archive.DumpArchive({}, self.data_dir))
+
+        parsed_files = [call.args[0].xml_file.name for call in iterator.call_args_list]
+        self.assertEqual(parsed_files.count('Posts.xml'), 1)
+        self.assertEqual(parsed_files.count('Badges.xml'), 1)
+        self.assertEqual(parsed_files.count('Votes.xml'), 1)
+
+
+class ChunkTests(SimpleTestCase):
+    """Chunk tests
+    """
+    def test_column(self):
+        """Test getting the values of the attributes of the rows.
+        """
+        chunk = loader.Chunk([{'Id': '1', 'UserId': '5'}, {'Id': '2'}])
+        self.assertEqual(len(chunk), 2)
+        self.assertEqual(chunk.column('Id'), ['1', '2'])
+        self.assertEqual(chunk.column('UserId', '<NULL>'), ['5', '<NULL>'])
+        self.assertIs(chunk.column('UserId', '<NULL>'), chunk.column('UserId', '<NULL>'))
+        self.assertEqual(chunk.column('UserId', None), ['5', None])
+        with self.assertRaises(KeyError):
+            chunk.column('UserId')
+
+    def test_transform_batch(self):
+        """Test that the rows of loaders that transform each row on their own are transformed in columnar form.
+        """
+        tag_loader = loader.TagLoader(site_id=1, data_dir=pathlib.Path(), staging=True)
+        chunk = loader.Chunk([
+            {'Id': '1', 'TagName': 'python', 'Count': '2'}, {'Id': '2', 'TagName': 'django', 'Count': '1'}
+        ])
+        self.assertEqual(tag_loader.transform_batch(chunk), [
+            ('1', '2'), ('python', 'django'), ('2', '1'), ('<NULL>', '<NULL>'), ('<NULL>', '<NULL>'), (False, False),
+            (False, False)
+        ])
+        self.assertEqual(
+            list(tag_loader.transformed_batch(chunk))[1], ('2', 'django', '1', '<NULL>', '<NULL>', False, False))
+
+    def test_transform_required(self):
+        """Test that loaders must implement either transform or transform_batch.
+        """
+        with self.assertRaisesRegex(TypeError, "NoTransformLoader"):
+            type('NoTransformLoader', (loader.BaseFileLoader, ), {})
+
+    def test_select(self):
+        """Test that the rows of the posts that do not exist are not selected.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+                loader.BaseFileLoader, 'post_index', return_value=idindex.IdSet.build([1, 3], 3)
+        ), mock.patch.object(loader.BaseFileLoader, 'user_index', return_value=idindex.IdMap.build([(7, 70)])):
+            link_loader = loader.PostLinkLoader(site_id=1, data_dir=pathlib.Path(temp_dir))
+            vote_loader = loader.PostVoteLoader(site_id=1, data_dir=pathlib.Path(temp_dir))
+        chunk = loader.Chunk([
+            {'Id': '1', 'PostId': '1', 'RelatedPostId': '3', 'LinkTypeId': '1', 'VoteTypeId': '2', 'CreationDate': 'd'},
+            {'Id': '2', 'PostId': '2', 'RelatedPostId': '3', 'LinkTypeId': '1', 'VoteTypeId': '2', 'CreationDate': 'd'},
+            {'Id': '3', 'PostId': '3', 'RelatedPostId': '2', 'LinkTypeId': '3', 'VoteTypeId': '2', 'CreationDate': 'd',
+             'UserId': '7'},
+        ])
+        self.assertEqual(list(link_loader.transformed_batch(chunk)), [('1', '1', '3', '1')])
+        self.assertEqual(list(vote_loader.transformed_batch(chunk)), [
+            ('1', '1', '2', 'd', '<NULL>', '<NULL>'), ('3', '3', '2', 'd', 70, '<NULL>')
+        ])
+        self.assertEqual((link_loader.metrics.rows_dropped, vote_loader.metrics.rows_dropped), (2, 1))
+
+
+class RowStreamTests(SimpleTestCase):
+    """Row stream tests
+    """
+    ROWS = [(1, 'plain', '<NULL>'), (2, 'comma, "quote"', 'back\\slash'), (3, 'new\nline', 'end')]
+
+    def test_read(self):
+        """Test that reading the stream in chunks returns the rows in the COPY text format.
+        """
+        stream = loader.RowStream(self.ROWS)
+        data = ''.join(iter(lambda: stream.read(5), ''))
+        self.assertEqual(data, '1,plain,<NULL>\n2,comma\\, \\"quote\\",back\\\\slash\n3,new\\\nline,end\n')
+        self.assertEqual(loader.RowStream(self.ROWS).read(), data)
+
+    def test_readline(self):
+        """Test reading the stream one line at a time.
+        """
+        stream = loader.RowStream(self.ROWS)
+        self.assertEqual(stream.readline(), '1,plain,<NULL>\n')
+        self.assertEqual(stream.readline(), '2,comma\\, \\"quote\\",back\\\\slash\n')
+
+    def test_lazy(self):
+        """Test that rows are only pulled from the iterable when they are read.
+        """
+        rows = itertools.count()
+        stream = loader.RowStream((i, ) for i in rows)
+        stream.read(10)
+        self.assertLess(next(rows), 10)
@@ -0,0 +1,122 @@
+"""Load metrics tests
+"""
+import io
+import os
+import pathlib
+import tempfile
+import tracemalloc
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from stackexchange.services import metrics
+
+
+class TableMetricsTests(SimpleTestCase):
+    """Table metrics tests
+    """
+    def test_phase(self):
+        """Test that the time and the peak memory of each phase are recorded, and that the memory blocks are only
+        traced when tracemalloc is started.
+        """
+        table_metrics = metrics.TableMetrics('posts')
+        with table_metrics.phase('copy'):
+            pass
+        tracemalloc.start()
+        try:
+            with table_metrics.phase('merge'):
+                data = bytearray(1024 * 1024)
+        finally:
+            tracemalloc.stop()
+        del data
+
+        self.assertEqual(list(table_metrics.phases), ['copy', 'merge'])
+        self.assertGreater(table_metrics.phases['copy'].peak_rss, 0)
+        self.assertIsNone(table_metrics.phases['copy'].peak_traced)
+        self.assertGreaterEqual(table_metrics.phases['merge'].peak_traced, 1024 * 1024)
+        self.assertEqual(table_metrics.seconds, sum(phase.seconds for phase in table_metrics.phases.values()))
+
+    def test_add(self):
+        """Test adding the metrics of the shards of a table, and converting them from and to a dictionary.
+        """
+        first = metrics.TableMetrics(
+            'posts', rows_read=3, rows_copied=2, rows_dropped=1, bytes_read=100, parse_seconds=1.0,
+            phases={'copy': metrics.PhaseMetrics(seconds=2.0, peak_rss=10)}
+        )
+        second = metrics.TableMetrics(
+            'posts', rows_read=2, rows_copied=2, parse_seconds=0.5, transform_seconds=0.5,
+            phases={
+                'copy': metrics.PhaseMetrics(seconds=1.0, peak_rss=20, peak_traced=5),
+                'merge': metrics.PhaseMetrics(seconds=1.0, peak_rss=5)
+            }
+        )
+        first.add(metrics.TableMetrics.from_dict(second.to_dict()))
+        first.rows_written = 4
+
+        self.assertEqual((first.rows_read, first.rows_copied, first.rows_dropped, first.bytes_read), (5, 4, 1, 100))
+        self.assertEqual((first.parse_seconds, first.transform_seconds), (1.5, 0.5))
+        self.assertEqual(first.phases, {
+            'copy': metrics.PhaseMetrics(seconds=3.0, peak_rss=20, peak_traced=5),
+            'merge': metrics.PhaseMetrics(seconds=1.0, peak_rss=5)
+        })
+        self.assertEqual(first.rows_per_second, 1.0)
+        self.assertEqual(metrics.TableMetrics.from_dict(first.to_dict()), first)
+        self.assertEqual(first.report()['seconds'], 4.0)
+        self.assertIsNone(metrics.TableMetrics('posts').rows_per_second)
+
+
+class ReportTests(SimpleTestCase):
+    """Load report tests
+    """
+    REPORT = {
+        'site': 'example.stackexchange.com', 'started_at': '2024-01-01T00:00:00+00:00',
+        'completed_at': '2024-01-01T00:01:00+00:00', 'workers': 2, 'shards': 3, 'profile': 'full',
+        'options': {'staging': True, 'bulk': False}, 'tasks': {'posts': 1.5},
+        'tables': {
+            'posts': {
+                'skipped': False,
+                **metrics.TableMetrics(
+                    'posts', rows_read=5, rows_copied=5, rows_written=4, rows_dropped=1, bytes_read=1024,
+                    cluster_key='owner_id', correlation_before=0.25, correlation_after=1.0,
+                    phases={'copy': metrics.PhaseMetrics(seconds=1.0, peak_rss=2 * 1024 * 1024)}
+                ).report()
+            },
+            'post_links': {'skipped': True}
+        }
+    }
+
+    def test_write_read(self):
+        """Test that the last written report is read, unless a report file is given.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            directory = pathlib.Path(temp_dir) / 'reports'
+            with self.assertRaises(FileNotFoundError):
+                metrics.read_report(directory=directory)
+            first = metrics.write_report({'site': 'first'}, 'first', directory)
+            second = metrics.write_report({'site': 'second'}, 'second', directory)
+            os.utime(first, (0, 0))
+
+            self.assertEqual(metrics.read_report(directory=directory), {'site': 'second'})
+            self.assertEqual(metrics.read_report(first), {'site': 'first'})
+            self.assertEqual(second.name, 'second.json')
+
+    def test_command(self):
+        """Test showing a report with the load report command.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = metrics.write_report(self.REPORT, 'load', pathlib.Path(temp_dir))
+            stdout = io.StringIO()
+            call_command('load_report', str(path), stdout=stdout)
+            self.assertIn("posts: 4 rows written in 1.0 seconds (4 rows/s)", stdout.getvalue())
+            self.assertIn("dropped: 1", stdout.getvalue())
+            self.assertIn("copy: 1.0 s, peak RSS: 2.0 MiB", stdout.getvalue())
+            self.assertIn("post_links: skipped", stdout.getvalue())
+            self.assertIn("clustered on owner_id, correlation: 0.25 before, 1.00 after", stdout.getvalue())
+            self.assertIn("options: staging", stdout.getvalue())
+
+            stdout = io.StringIO()
+            call_command('load_report', str(path), json=True, stdout=stdout)
+            self.assertIn('"rows_per_second": 4.0', stdout.getvalue())
+
+            with self.assertRaises(CommandError):
+                call_command('load_report', str(pathlib.Path(temp_dir) / 'missing.json'))
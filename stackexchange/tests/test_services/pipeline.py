@@ -0,0 +1,107 @@
+"""Load pipeline tests
+"""
+import io
+import pathlib
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+import py7zr
+
+from stackexchange import celery_app, enums, models, tasks
+from stackexchange.services import dowloader, loader, pipeline
+from .base import DUMP_FILES, DumpTestCase
+
+
+@mock.patch.object(loader.TagLoader, 'update_tag_flags')
+@mock.patch.object(dowloader.Downloader, 'get_file')
+class PipelineTests(DumpTestCase):
+    """Load pipeline tests
+    """
+    def setUp(self):
+        """Write the dump archive to the cache directory of a temporary base directory, and run the tasks eagerly.
+        """
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.base_dir = pathlib.Path(temp_dir.name)
+        (self.base_dir / 'var' / 'cache').mkdir(parents=True)
+        with py7zr.SevenZipFile(self.base_dir / 'var' / 'cache' / 'example.stackexchange.com.7z', mode='w') as f:
+            for filename in DUMP_FILES:
+                f.write(self.data_dir / filename, arcname=filename)
+
+        settings = override_settings(
+            BASE_DIR=self.base_dir, TEMP_DIR=None,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        celery_app.conf.update(task_always_eager=True, task_eager_propagates=True)
+        self.addCleanup(celery_app.conf.update, task_always_eager=False, task_eager_propagates=False)
+
+    def test_create_run(self, *_):
+        """Test that the steps of a load are planned in stages, after the steps they depend on.
+        """
+        run = pipeline.create_run(self.site.name, {'shards': 2, 'staging': True})
+        stages = pipeline.stages(run)
+        self.assertEqual(stages[:2], [['prepare'], ['example.stackexchange.com.7z']])
+        self.assertEqual(stages[-3:], [['analyze'], ['site_info'], ['report']])
+        stage = {name: index for index, names in enumerate(stages) for name in names}
+        self.assertLess(stage['posts'], stage['tags'])
+        self.assertLess(stage['post_votes.truncate'], stage['post_votes.0'])
+        self.assertEqual(stage['post_votes.0'], stage['post_votes.1'])
+
+        with self.assertRaises(ValueError):
+            pipeline.create_run(self.site.name, {'delta': True, 'bulk': True})
+
+    def test_load_pipeline(self, *_):
+        """Test running the pipeline of a load, and showing its progress.
+        """
+        run = pipeline.create_run(self.site.name, {'shards': 2, 'binary': True})
+        tasks.load_pipeline(run).delay()
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, enums.StepStatus.COMPLETED)
+        self.assertFalse(run.steps.exclude(status=enums.StepStatus.COMPLETED).exists())
+        self.assertEqual(models.Post.objects.count(), 5)
+        self.assertEqual(models.PostVoteRollup.objects.count(), 4)
+        self.assertEqual(cache.get('site_info')['total_questions'], 2)
+        self.assertEqual(len(list((self.base_dir / 'var' / 'reports').glob('load-example-*.json'))), 1)
+        self.assertFalse(pipeline.data_dir(run).exists())
+
+        stdout = io.StringIO()
+        call_command('load_status', stdout=stdout)
+        self.assertIn(f"Load {run.pk} of example: completed", stdout.getvalue())
+        self.assertIn("post_votes.1: completed in", stdout.getvalue())
+
+    def test_failed_step(self, *_):
+        """Test that the load fails when a step fails, and that the completed steps are not run again.
+        """
+        run = pipeline.create_run(self.site.name, {})
+        with mock.patch.object(loader.SiteDataLoader, 'analyze', side_effect=ValueError("Analyze failed")):
+            with self.assertRaisesRegex(ValueError, "Analyze failed"):
+                tasks.load_pipeline(run).delay()
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, enums.StepStatus.FAILED)
+        step = run.steps.get(name='analyze')
+        self.assertEqual(step.status, enums.StepStatus.FAILED)
+        self.assertIn("Analyze failed", step.error)
+        self.assertEqual(run.steps.get(name='site_info').status, enums.StepStatus.PENDING)
+
+        stdout = io.StringIO()
+        call_command('load_status', str(run.pk), stdout=stdout)
+        self.assertIn("ValueError: Analyze failed", stdout.getvalue())
+
+        with mock.patch.object(loader.PostLoader, 'load') as load:
+            tasks.run_load_step(run.pk, 'posts')
+            load.assert_not_called()
+
+    def test_background_workers(self, *_):
+        """Test that the number of workers cannot be set for a background load, which runs on the Celery workers.
+        """
+        with self.assertRaisesRegex(CommandError, "--workers"):
+            call_command('load_data', self.site.name, background=True, workers=4)
+        self.assertFalse(models.LoadRun.objects.exists())
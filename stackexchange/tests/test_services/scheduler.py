@@ -0,0 +1,42 @@
+"""Scheduler tests
+"""
+import time
+
+from django.test import SimpleTestCase
+
+from stackexchange.services import scheduler
+
+
+class SchedulerTests(SimpleTestCase):
+    """Scheduler tests
+    """
+    def test_run(self):
+        """Test that the tasks run in the order in which they were added, when running with a single worker.
+        """
+        completed = []
+        task_scheduler = scheduler.Scheduler()
+        task_scheduler.add('first', completed.append, 'first')
+        task_scheduler.add('second', completed.append, 'second', dependencies=('first', ))
+        task_scheduler.add('third', completed.append, 'third', dependencies=('first', ))
+
+        timings = task_scheduler.run()
+        self.assertEqual(completed, ['first', 'second', 'third'])
+        self.assertEqual(set(timings), {'first', 'second', 'third'})
+
+    def test_run_concurrently(self):
+        """Test that independent tasks run concurrently, when running with more than one worker.
+        """
+        task_scheduler = scheduler.Scheduler(workers=2)
+        task_scheduler.add('first', time.sleep, 0.1)
+        task_scheduler.add('second', time.sleep, 1)
+        task_scheduler.add('third', time.sleep, 1, dependencies=('first', ))
+
+        timings = task_scheduler.run()
+        self.assertEqual(set(timings), {'first', 'second', 'third'})
+        self.assertGreaterEqual(timings['second'], 1)
+
+    def test_unknown_dependency(self):
+        """Test that adding a task that depends on a task that was not added fails.
+        """
+        with self.assertRaises(ValueError):
+            scheduler.Scheduler().add('first', time.sleep, 0, dependencies=('second', ))
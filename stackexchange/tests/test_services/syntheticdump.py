@@ -0,0 +1,134 @@
+"""Synthetic dump tests
+"""
+import pathlib
+import tempfile
+from unittest import mock
+
+import py7zr
+from django.test import SimpleTestCase, TestCase
+
+from stackexchange import enums, models
+from stackexchange.services import archive, dowloader, loader, syntheticdump, xmlparser
+from stackexchange.tests import factories
+
+
+class DumpScaleTests(SimpleTestCase):
+    """Dump scale tests
+    """
+    def test_for_users(self):
+        """Test that the numbers of rows that are not set follow the number of users and posts.
+        """
+        scale = syntheticdump.DumpScale.for_users(1000, votes=10)
+        self.assertEqual(scale.posts, 3000)
+        self.assertEqual(scale.votes, 10)
+        self.assertEqual(scale.comments, 4500)
+        self.assertEqual(scale.badges, 2500)
+        self.assertEqual(scale.tags, 20)
+
+    def test_invalid(self):
+        """Test that a dump without users, or with a negative number of rows, is rejected.
+        """
+        with self.assertRaises(ValueError):
+            syntheticdump.DumpScale.for_users(0)
+        with self.assertRaises(ValueError):
+            syntheticdump.DumpScale.for_users(10, posts=-1)
+
+
+class DumpGeneratorTests(SimpleTestCase):
+    """Dump generator tests
+    """
+    def setUp(self):
+        """Set up the temporary directory that holds the dump.
+        """
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = pathlib.Path(temp_dir.name)
+
+    def test_write(self):
+        """Test that all the files of the dump are written, that they can be parsed, and that their numbers of rows
+        are close to the scale.
+        """
+        scale = syntheticdump.DumpScale.for_users(200)
+        rows = syntheticdump.DumpGenerator(scale).write(self.data_dir / 'dump')
+
+        self.assertEqual(set(rows), set(syntheticdump.ROOT_ELEMENTS))
+        for filename, count in rows.items():
+            self.assertEqual(len(list(xmlparser.XmlFileIterator(self.data_dir / 'dump' / filename))), count)
+        self.assertEqual(rows['Users.xml'], scale.users)
+        self.assertEqual(rows['Tags.xml'], scale.tags)
+        self.assertGreaterEqual(rows['Posts.xml'], scale.posts * (1 - syntheticdump.DELETED_SHARE) * 0.9)
+        self.assertAlmostEqual(rows['Votes.xml'] / scale.votes, 1, delta=0.25)
+        posts = list(xmlparser.XmlFileIterator(self.data_dir / 'dump' / 'Posts.xml'))
+        post_types = {int(post['PostTypeId']) for post in posts}
+        self.assertTrue({enums.PostType.QUESTION.value, enums.PostType.ANSWER.value} <= post_types)
+
+    def test_seed(self):
+        """Test that the same seed generates the same dump, and another seed another dump.
+        """
+        scale = syntheticdump.DumpScale.for_users(50)
+        for directory, seed in (('first', 1), ('second', 1), ('third', 2)):
+            syntheticdump.DumpGenerator(scale, seed=seed).write(self.data_dir / directory)
+
+        posts = {
+            directory: (self.data_dir / directory / 'Posts.xml').read_bytes()
+            for directory in ('first', 'second', 'third')
+        }
+        self.assertEqual(posts['first'], posts['second'])
+        self.assertNotEqual(posts['first'], posts['third'])
+
+    def test_write_archive(self):
+        """Test that the dump is written to a 7z archive with all its files.
+        """
+        archive_file = self.data_dir / 'example.stackexchange.com.7z'
+        rows = syntheticdump.DumpGenerator(syntheticdump.DumpScale.for_users(20)).write_archive(archive_file)
+
+        with py7zr.SevenZipFile(archive_file) as f:
+            self.assertEqual(set(f.getnames()), set(rows))
+        self.assertEqual(list(self.data_dir.iterdir()), [archive_file])
+
+
+@mock.patch.object(loader.TagLoader, 'update_tag_flags')
+@mock.patch.object(dowloader.Downloader, 'get_file')
+class DumpDirectoryTests(TestCase):
+    """Dump directory load tests
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """Set up the test data.
+        """
+        cls.site = factories.SiteFactory.create(name='example', url='https://example.stackexchange.com')
+
+    def setUp(self):
+        """Generate a dump to a temporary directory.
+        """
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.dump_dir = pathlib.Path(temp_dir.name) / 'dump'
+        self.rows = syntheticdump.DumpGenerator(syntheticdump.DumpScale.for_users(100)).write(self.dump_dir)
+        self.data_dir = pathlib.Path(temp_dir.name) / 'data'
+        self.data_dir.mkdir()
+
+    def test_load(self, get_file, _):
+        """Test that the files of a dump directory are loaded without downloading the archives of the site, and that
+        the files the loaders write are not written to the dump directory.
+        """
+        data_loader = loader.SiteDataLoader(site=self.site.name, dump_dir=str(self.dump_dir))
+        self.assertEqual(data_loader.archive_files, {})
+        data_loader.link_dump_files(self.data_dir)
+        data_loader.load_tables(dump=archive.DumpArchive(data_loader.archive_files, self.data_dir))
+
+        get_file.assert_not_called()
+        self.assertEqual(models.SiteUser.objects.count(), self.rows['Users.xml'])
+        self.assertEqual(models.Post.objects.count(), self.rows['Posts.xml'])
+        self.assertEqual(models.Tag.objects.count(), self.rows['Tags.xml'])
+        self.assertTrue(models.PostComment.objects.exists())
+        self.assertEqual(sorted(path.name for path in self.dump_dir.iterdir()), sorted(self.rows))
+        self.assertTrue((self.data_dir / 'Posts.xml').is_symlink())
+
+    def test_missing_file(self, *_):
+        """Test that a dump directory without the files of the loaded tables is rejected.
+        """
+        (self.dump_dir / 'PostLinks.xml').unlink()
+        with self.assertRaises(ValueError):
+            loader.SiteDataLoader(site=self.site.name, dump_dir=str(self.dump_dir))
+        loader.SiteDataLoader(site=self.site.name, profile='metadata-only', dump_dir=str(self.dump_dir))
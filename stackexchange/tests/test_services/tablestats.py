@@ -0,0 +1,106 @@
+"""Table statistics tests
+"""
+from unittest import mock
+
+from django.db import connection
+from django.utils import timezone
+
+from stackexchange import enums, models
+from stackexchange.services import archive, dowloader, loader, shadow, tablestats
+from .base import DumpTestCase
+
+
+@mock.patch.object(loader.TagLoader, 'update_tag_flags')
+@mock.patch.object(dowloader.Downloader, 'get_file')
+class TableStatisticsTests(DumpTestCase):
+    """Table statistics tests
+    """
+    def test_analyze(self, *_):
+        """Test that the skewed columns get a higher statistics target, and that the extended statistics of the
+        correlated columns are created and collected.
+        """
+        loader.SiteDataLoader(site=self.site.name).load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        tablestats.analyze(['posts', 'post_votes', 'tags'])
+        # Analyzing again keeps the same statistics
+        tablestats.analyze(['posts', 'post_votes', 'tags'])
+
+        self.assertEqual(self.statistics_targets('posts'), {
+            column: tablestats.STATISTICS_TARGET for column in tablestats.SKEWED_COLUMNS['posts']})
+        self.assertEqual(self.statistics_targets('tags'), {})
+        self.assertEqual(self.extended_statistics(), {
+            'posts_type_answer_count_accepted_answer_id_stat', 'posts_type_owner_id_stat',
+            'posts_type_question_id_stat', 'post_votes_type_user_id_stat'
+        })
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT most_common_vals FROM pg_stats_ext WHERE tablename = 'posts' AND statistics_name = %s",
+                ['posts_type_answer_count_accepted_answer_id_stat']
+            )
+            self.assertIn([str(enums.PostType.QUESTION.value), '0', None], cursor.fetchone()[0])
+
+    def test_analyze_completed_tables(self, *_):
+        """Test that only the tables completed by a load are analyzed.
+        """
+        data_loader = loader.SiteDataLoader(site=self.site.name, profile='api-core')
+        started_at = timezone.now()
+        data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        with mock.patch.object(tablestats, 'analyze') as analyze:
+            data_loader.analyze(started_at)
+        analyze.assert_called_once_with([loader_class.TABLE_NAME for loader_class in data_loader.loaders])
+
+        # The tables are skipped when the load is resumed
+        data_loader = loader.SiteDataLoader(site=self.site.name, profile='api-core', resume=True)
+        started_at = timezone.now()
+        data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+        with mock.patch.object(tablestats, 'analyze') as analyze:
+            data_loader.analyze(started_at)
+        analyze.assert_called_once_with([])
+
+    def test_analyze_shadow(self, *_):
+        """Test that the extended statistics are kept when a shadow schema is swapped with the live tables.
+        """
+        tablestats.analyze(loader.SiteDataLoader.table_names())
+        statistics = self.extended_statistics()
+        data_loader = loader.SiteDataLoader(site=self.site.name, staging=True, shadow_schema=True)
+        schema = shadow.ShadowSchema(data_loader.table_names())
+        started_at = timezone.now()
+        with schema.loading():
+            data_loader.load_tables(dump=archive.DumpArchive({}, self.data_dir))
+            data_loader.analyze(started_at)
+            self.assertEqual(self.extended_statistics(shadow.SHADOW_SCHEMA), statistics)
+        schema.swap()
+
+        self.assertEqual(models.Post.objects.count(), 5)
+        self.assertEqual(self.extended_statistics(), statistics)
+        self.assertEqual(self.extended_statistics(shadow.PREVIOUS_SCHEMA), statistics)
+        self.assertEqual(self.statistics_targets('post_tags'), {'tag_id': tablestats.STATISTICS_TARGET})
+        schema.rollback()
+        self.assertEqual(self.extended_statistics(), statistics)
+
+    @staticmethod
+    def statistics_targets(table: str) -> dict[str, int]:
+        """Get the columns of a live table that have a statistics target.
+
+        :param table: The table name.
+        :return: The statistics target, by column name.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT attname, attstattarget FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 "
+                "AND attstattarget > 0", [f"{shadow.LIVE_SCHEMA}.{table}"]
+            )
+            return dict(cursor.fetchall())
+
+    @staticmethod
+    def extended_statistics(schema: str = shadow.LIVE_SCHEMA) -> set[str]:
+        """Get the names of the extended statistics of the tables of a schema.
+
+        :param schema: The schema.
+        :return: The statistics names.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT stxname FROM pg_statistic_ext JOIN pg_class ON pg_class.oid = stxrelid "
+                "WHERE stxnamespace = %s::regnamespace AND relnamespace = %s::regnamespace", [schema, schema]
+            )
+            return {name for name, in cursor.fetchall()}
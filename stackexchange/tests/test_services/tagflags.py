@@ -0,0 +1,143 @@
+"""Tag flag source tests
+"""
+import datetime
+import http.server
+import json
+import pathlib
+import tempfile
+import threading
+import urllib.parse
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from stackexchange import enums, models
+from stackexchange.services import loader, tagflags
+from stackexchange.tests import factories
+
+
+class TagsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the pages of the tags that have a flag, in the same way as the StackExchange API.
+    """
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle a GET request.
+        """
+        url = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        self.server.requests.append((url.path, params))
+        tags = self.server.tags[url.path.rsplit('/', 1)[-1]]
+        page, page_size = int(params['page'][0]), int(params['pagesize'][0])
+        content = json.dumps({
+            'items': [{'name': name} for name in tags[(page - 1) * page_size:page * page_size]],
+            'has_more': page * page_size < len(tags), 'backoff': 2
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        """Do not log the requests.
+        """
+
+
+class TagFlagSourceTests(SimpleTestCase):
+    """Tag flag source tests
+    """
+    TAGS = {'required': ['python', 'java', 'rust'], 'moderator-only': ['status-completed']}
+
+    def setUp(self):
+        """Start the HTTP server that stands in for the API, and create the cache directory.
+        """
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), TagsRequestHandler)
+        self.server.tags = self.TAGS
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/2.3"
+
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = pathlib.Path(temp_dir.name)
+
+    @mock.patch.object(tagflags.ApiTagFlagSource, 'PAGE_SIZE', 2)
+    @mock.patch.object(tagflags.time, 'sleep')
+    def test_api(self, sleep):
+        """Test that all the pages of the tags are requested, waiting for the backoff of the API between them.
+        """
+        source = tagflags.ApiTagFlagSource(self.base_url)
+        self.assertEqual(source.get_tag_names('example', enums.TagFlag.REQUIRED), ['python', 'java', 'rust'])
+        self.assertEqual(
+            [(path, params['page'], params['site']) for path, params in self.server.requests],
+            [('/2.3/tags/required', ['1'], ['example']), ('/2.3/tags/required', ['2'], ['example'])]
+        )
+        sleep.assert_called_once_with(2)
+
+    def test_file(self):
+        """Test reading the tags from a file.
+        """
+        path = self.cache_dir / 'tags.json'
+        path.write_text(json.dumps({'required': ['python']}))
+        source = tagflags.FileTagFlagSource(path)
+        self.assertEqual(source.get_tag_names('example', enums.TagFlag.REQUIRED), ['python'])
+        self.assertEqual(source.get_tag_names('example', enums.TagFlag.MODERATOR_ONLY), [])
+
+    def test_cached(self):
+        """Test that the tags are requested once, until the cache expires, or its version or source change.
+        """
+        source = tagflags.CachedTagFlagSource(tagflags.ApiTagFlagSource(self.base_url), self.cache_dir)
+        for _ in range(2):
+            self.assertEqual(source.get_tag_names('example', enums.TagFlag.MODERATOR_ONLY), ['status-completed'])
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(source.get_tag_names('other', enums.TagFlag.MODERATOR_ONLY), ['status-completed'])
+        self.assertEqual(len(self.server.requests), 2)
+
+        with mock.patch.object(tagflags.CachedTagFlagSource, 'VERSION', 2):
+            source.get_tag_names('example', enums.TagFlag.MODERATOR_ONLY)
+        self.assertEqual(len(self.server.requests), 3)
+        source.max_age = datetime.timedelta(0)
+        source.get_tag_names('example', enums.TagFlag.MODERATOR_ONLY)
+        self.assertEqual(len(self.server.requests), 4)
+
+        path = self.cache_dir / 'tags.json'
+        path.write_text(json.dumps({'moderator-only': ['featured']}))
+        source = tagflags.CachedTagFlagSource(tagflags.FileTagFlagSource(path), self.cache_dir)
+        self.assertEqual(source.get_tag_names('example', enums.TagFlag.MODERATOR_ONLY), ['featured'])
+
+    def test_tag_flag_source(self):
+        """Test creating the tag flag source from the settings.
+        """
+        with override_settings(TAG_FLAGS_SOURCE=None):
+            source = tagflags.tag_flag_source()
+            self.assertIsInstance(source, tagflags.CachedTagFlagSource)
+            self.assertEqual(source.key(), tagflags.API_BASE_URL)
+        with override_settings(TAG_FLAGS_SOURCE=self.base_url):
+            self.assertEqual(tagflags.tag_flag_source().key(), self.base_url)
+        with override_settings(TAG_FLAGS_SOURCE='tags.json'):
+            self.assertIsInstance(tagflags.tag_flag_source(), tagflags.FileTagFlagSource)
+
+
+class UpdateTagFlagsTests(TestCase):
+    """Tag flag update tests
+    """
+    def test_update_tag_flags(self):
+        """Test that the flags of the tags of the source are set, and that the flags of the other tags are cleared, with
+        two queries for each flag.
+        """
+        site = factories.SiteFactory.create()
+        factories.TagFactory.create(name='python', required=False, moderator_only=False)
+        factories.TagFactory.create(name='java', required=True, moderator_only=False)
+        factories.TagFactory.create(name='featured', required=False, moderator_only=False)
+        factories.TagFactory.create(name='retired', required=True, moderator_only=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / 'tags.json'
+            path.write_text(json.dumps({'required': ['python', 'java', 'missing'], 'moderator-only': ['featured']}))
+            with override_settings(TAG_FLAGS_SOURCE=str(path)), self.assertNumQueries(5):
+                loader.TagLoader(site_id=site.pk, data_dir=pathlib.Path(temp_dir)).update_tag_flags()
+
+        self.assertEqual(
+            set(models.Tag.objects.values_list('name', 'required', 'moderator_only')),
+            {('python', True, False), ('java', True, False), ('featured', False, True), ('retired', False, False)}
+        )
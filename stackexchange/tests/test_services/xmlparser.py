@@ -0,0 +1,92 @@
+"""XML file iterator tests
+"""
+import pathlib
+import tempfile
+import tracemalloc
+
+from defusedxml import common
+from django.test import SimpleTestCase
+
+from stackexchange.services import xmlparser
+
+
+class XmlFileIteratorTests(SimpleTestCase):
+    """XML file iterator tests
+    """
+    def setUp(self):
+        """Set up the temporary directory that holds the XML files.
+        """
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = pathlib.Path(temp_dir.name)
+
+    def write_xml_file(self, rows: int) -> pathlib.Path:
+        """Write an XML file in the format of the data dump.
+
+        :param rows: The number of rows to write.
+        :return: The path to the XML file.
+        """
+        xml_file = self.data_dir / 'Tags.xml'
+        with xml_file.open('wt', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n<tags>\n')
+            for i in range(1, rows + 1):
+                f.write(f'  <row Id="{i}" TagName="tag-&lt;{i}&gt;" Count="{i * 10}" />\n')
+            f.write('</tags>\n')
+
+        return xml_file
+
+    def test_iterate(self):
+        """Test that all the rows are returned, with their attributes unescaped.
+        """
+        rows = list(xmlparser.XmlFileIterator(self.write_xml_file(rows=1000)))
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[0], {'Id': '1', 'TagName': 'tag-<1>', 'Count': '10'})
+        self.assertEqual(rows[-1], {'Id': '1000', 'TagName': 'tag-<1000>', 'Count': '10000'})
+
+    def test_batches(self):
+        """Test that the rows are returned in batches of the requested size.
+        """
+        batches = list(xmlparser.XmlFileIterator(self.write_xml_file(rows=1050)).batches(size=100))
+        self.assertEqual([len(batch) for batch in batches], [100] * 10 + [50])
+        self.assertEqual([row['Id'] for batch in batches for row in batch], [str(i) for i in range(1, 1051)])
+
+    def test_shards(self):
+        """Test that the shards of a file contain all of its rows exactly once.
+        """
+        xml_file = self.write_xml_file(rows=5000)
+        for count in (1, 2, 3, 7, 64):
+            with self.subTest(count=count):
+                iterator = xmlparser.XmlFileIterator(xml_file)
+                iterator.CHUNK_SIZE = 1024
+                rows = [row['Id'] for shard in iterator.shards(count) for row in shard]
+                self.assertEqual(rows, [str(i) for i in range(1, 5001)])
+
+    def test_shards_small_file(self):
+        """Test splitting a file in more shards than its rows.
+        """
+        shards = xmlparser.XmlFileIterator(self.write_xml_file(rows=3)).shards(10)
+        self.assertEqual([row['Id'] for shard in shards for row in shard], ['1', '2', '3'])
+
+    def test_memory(self):
+        """Test that the memory used while iterating does not grow with the size of the file.
+        """
+        peaks = []
+        for rows in (50000, 200000):
+            xml_file = self.write_xml_file(rows=rows)
+            tracemalloc.start()
+            try:
+                for _ in xmlparser.XmlFileIterator(xml_file):
+                    pass
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    def test_entities_forbidden(self):
+        """Test that entity declarations are rejected.
+        """
+        xml_file = self.data_dir / 'Tags.xml'
+        xml_file.write_text(
+            '<?xml version="1.0"?>\n<!DOCTYPE tags [<!ENTITY a "aaaaaaaaaa">]>\n<tags><row Id="&a;" /></tags>\n')
+        with self.assertRaises(common.EntitiesForbidden):
+            list(xmlparser.XmlFileIterator(xml_file))